@@ -0,0 +1,114 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, "true" if default else "false").strip().lower() in ("1", "true", "yes", "on")
+
+PORT = int(os.getenv("PORT", 8000))
+
+FACE_MESH_POOL_SIZE = max(1, int(os.getenv("FACE_MESH_POOL_SIZE", os.cpu_count() or 4)))
+PIPELINE_CHECKOUT_TIMEOUT = float(os.getenv("PIPELINE_CHECKOUT_TIMEOUT", 2.0))
+PIPELINE_MAX_CONSECUTIVE_FAILURES = int(os.getenv("PIPELINE_MAX_CONSECUTIVE_FAILURES", 3))
+
+LANDMARK_BACKEND = os.getenv("LANDMARK_BACKEND", "mediapipe").strip().lower()
+LANDMARK_MODEL_DIR = os.getenv("LANDMARK_MODEL_DIR", "")
+LANDMARK_NUM_THREADS = max(1, int(os.getenv("LANDMARK_NUM_THREADS", 1)))
+LANDMARK_MAX_BATCH = max(1, int(os.getenv("LANDMARK_MAX_BATCH", 16)))
+
+# A tracking session's EAR history and ROI crop are a few KiB, but a tracking graph is about
+# 28 MiB RSS. Graphs are capped separately; students without one run on the static pool with
+# their own session state, and graphs idle for TRACKING_GRAPH_TTL go to the next student.
+TRACKING_MAX_SESSIONS = max(1, int(os.getenv("TRACKING_MAX_SESSIONS", 4096)))
+TRACKING_SESSION_TTL = float(os.getenv("TRACKING_SESSION_TTL", 300.0))
+TRACKING_GRAPHS_PER_PIPELINE = max(0, int(os.getenv("TRACKING_GRAPHS_PER_PIPELINE", 4)))
+TRACKING_MAX_GRAPHS = max(0, int(os.getenv("TRACKING_MAX_GRAPHS", FACE_MESH_POOL_SIZE * TRACKING_GRAPHS_PER_PIPELINE)))
+TRACKING_GRAPH_TTL = float(os.getenv("TRACKING_GRAPH_TTL", 30.0))
+EAR_SMOOTHING_WINDOW = max(1, int(os.getenv("EAR_SMOOTHING_WINDOW", 5)))
+
+BATCH_MAX_FRAMES = max(1, int(os.getenv("BATCH_MAX_FRAMES", 64)))
+
+STREAM_QUEUE_SIZE = max(1, int(os.getenv("STREAM_QUEUE_SIZE", 64)))
+STREAM_MAX_IN_FLIGHT = max(1, int(os.getenv("STREAM_MAX_IN_FLIGHT", 4)))
+
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "thread").strip().lower()
+STAGE_DECODE_WORKERS = max(1, int(os.getenv("STAGE_DECODE_WORKERS", max(1, FACE_MESH_POOL_SIZE // 4))))
+STAGE_INFERENCE_WORKERS = max(1, int(os.getenv("STAGE_INFERENCE_WORKERS", FACE_MESH_POOL_SIZE)))
+STAGE_QUEUE_SIZE = max(1, int(os.getenv("STAGE_QUEUE_SIZE", 4)))
+EXECUTOR_WORKERS = max(1, int(os.getenv(
+    "EXECUTOR_WORKERS",
+    STAGE_DECODE_WORKERS + STAGE_INFERENCE_WORKERS + STAGE_QUEUE_SIZE if INFERENCE_BACKEND == "staged" else FACE_MESH_POOL_SIZE
+)))
+PROCESS_POOL_WORKERS = max(1, int(os.getenv("PROCESS_POOL_WORKERS", os.cpu_count() or 4)))
+PROCESS_POOL_SLOTS_PER_WORKER = max(1, int(os.getenv("PROCESS_POOL_SLOTS_PER_WORKER", 2)))
+PROCESS_POOL_SLOT_BYTES = max(1024, int(os.getenv("PROCESS_POOL_SLOT_BYTES", 8 * 1024 * 1024)))
+PROCESS_POOL_TASK_TIMEOUT = float(os.getenv("PROCESS_POOL_TASK_TIMEOUT", 10.0))
+
+INFERENCE_MAX_DIMENSION = max(0, int(os.getenv("INFERENCE_MAX_DIMENSION", 640)))
+ROI_CROP_ENABLED = _env_flag("ROI_CROP_ENABLED", True)
+ROI_MARGIN = float(os.getenv("ROI_MARGIN", 0.6))
+
+FRAME_CACHE_ENABLED = _env_flag("FRAME_CACHE_ENABLED", True)
+FRAME_CACHE_TTL = float(os.getenv("FRAME_CACHE_TTL", 3.0))
+FRAME_CACHE_MAX_STUDENTS = max(1, int(os.getenv("FRAME_CACHE_MAX_STUDENTS", 1024)))
+# Near-duplicate matching hashes only the eye band of the last detected face, and is
+# opt-in (>= 0) because small gaze shifts can still fall under the distance threshold.
+FRAME_CACHE_PHASH_DISTANCE = int(os.getenv("FRAME_CACHE_PHASH_DISTANCE", -1))
+FRAME_CACHE_PHASH_TTL = float(os.getenv("FRAME_CACHE_PHASH_TTL", 0.5))
+
+CALIBRATION_DB_PATH = os.getenv(
+    "CALIBRATION_DB_PATH", os.path.join(APP_DIR, "data", "calibrations.sqlite3")
+).strip()
+CALIBRATION_FLUSH_INTERVAL = max(0.01, float(os.getenv("CALIBRATION_FLUSH_INTERVAL", 1.0)))
+CALIBRATION_MAX_RETRY_DELAY = max(CALIBRATION_FLUSH_INTERVAL, float(os.getenv("CALIBRATION_MAX_RETRY_DELAY", 30.0)))
+
+ROUTER_PORT = int(os.getenv("ROUTER_PORT", 8080))
+ROUTER_REPLICAS = [url.strip() for url in os.getenv("ROUTER_REPLICAS", "").split(",") if url.strip()]
+ROUTER_VIRTUAL_NODES = max(1, int(os.getenv("ROUTER_VIRTUAL_NODES", 128)))
+ROUTER_REQUEST_TIMEOUT = float(os.getenv("ROUTER_REQUEST_TIMEOUT", 10.0))
+ROUTER_HEALTH_INTERVAL = float(os.getenv("ROUTER_HEALTH_INTERVAL", 5.0))
+
+AGGREGATE_WINDOWS = [float(seconds) for seconds in os.getenv("AGGREGATE_WINDOWS", "60,300").split(",") if seconds.strip()]
+AGGREGATE_BUCKETS = max(1, int(os.getenv("AGGREGATE_BUCKETS", 60)))
+AGGREGATE_IDLE_TTL = float(os.getenv("AGGREGATE_IDLE_TTL", 3600.0))
+AGGREGATE_MAX_STUDENTS = max(1, int(os.getenv("AGGREGATE_MAX_STUDENTS", 10000)))
+
+CAPTURE_INTERVAL_BASE = float(os.getenv("CAPTURE_INTERVAL_BASE", 1.0))
+CAPTURE_INTERVAL_MIN = float(os.getenv("CAPTURE_INTERVAL_MIN", 0.25))
+CAPTURE_INTERVAL_MAX = float(os.getenv("CAPTURE_INTERVAL_MAX", 5.0))
+CAPTURE_STABLE_FRAMES = max(1, int(os.getenv("CAPTURE_STABLE_FRAMES", 5)))
+CAPTURE_MOTION_THRESHOLD = float(os.getenv("CAPTURE_MOTION_THRESHOLD", 0.05))
+CAPTURE_TARGET_LOAD = float(os.getenv("CAPTURE_TARGET_LOAD", 0.75))
+
+ADMISSION_DEADLINE = float(os.getenv("ADMISSION_DEADLINE", 2.0))
+ADMISSION_MAX_PENDING = max(1, int(os.getenv("ADMISSION_MAX_PENDING", 256)))
+ADMISSION_TRUST_CLIENT_TIMESTAMPS = _env_flag("ADMISSION_TRUST_CLIENT_TIMESTAMPS", False)
+ADMISSION_MAX_CLOCK_SKEW = max(0.0, float(os.getenv("ADMISSION_MAX_CLOCK_SKEW", 1.0)))
+
+WARMUP_ENABLED = _env_flag("WARMUP_ENABLED", True)
+WARMUP_FRAMES = max(1, int(os.getenv("WARMUP_FRAMES", 3)))
+WARMUP_IMAGE_PATH = os.getenv("WARMUP_IMAGE_PATH", "")
+
+FLIGHT_RECORDER_ENABLED = _env_flag("FLIGHT_RECORDER_ENABLED", True)
+FLIGHT_RECORDER_CAPACITY = max(1, int(os.getenv("FLIGHT_RECORDER_CAPACITY", 32)))
+FLIGHT_RECORDER_WINDOW = float(os.getenv("FLIGHT_RECORDER_WINDOW", 300.0))
+FLIGHT_RECORDER_MIN_DURATION = float(os.getenv("FLIGHT_RECORDER_MIN_DURATION", 0.0))
+FLIGHT_RECORDER_CAPTURE_FRAMES = _env_flag("FLIGHT_RECORDER_CAPTURE_FRAMES", False)
+FLIGHT_RECORDER_MAX_FRAME_BYTES = max(0, int(os.getenv("FLIGHT_RECORDER_MAX_FRAME_BYTES", 2 * 1024 * 1024)))
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "").strip()
+PROFILER_MAX_SECONDS = max(0.1, float(os.getenv("PROFILER_MAX_SECONDS", 60.0)))
+PROFILER_DEFAULT_INTERVAL = max(0.001, float(os.getenv("PROFILER_DEFAULT_INTERVAL", 0.005)))
+
+CLASSROOM_MODE_ENABLED = _env_flag("CLASSROOM_MODE_ENABLED", False)
+CLASSROOM_LANDMARK_BACKEND = os.getenv("CLASSROOM_LANDMARK_BACKEND", "tflite").strip().lower()
+CLASSROOM_DETECTION_RANGE = os.getenv("CLASSROOM_DETECTION_RANGE", "full").strip().lower()
+CLASSROOM_MAX_FACES = max(1, int(os.getenv("CLASSROOM_MAX_FACES", 32)))
+CLASSROOM_MAX_CAMERAS = max(1, int(os.getenv("CLASSROOM_MAX_CAMERAS", 8)))
+CLASSROOM_CAMERA_TTL = float(os.getenv("CLASSROOM_CAMERA_TTL", 600.0))
+CLASSROOM_MAX_DIMENSION = max(0, int(os.getenv("CLASSROOM_MAX_DIMENSION", 1920)))
+CLASSROOM_TRACK_MIN_IOU = float(os.getenv("CLASSROOM_TRACK_MIN_IOU", 0.3))
+CLASSROOM_TRACK_MAX_MISSES = max(0, int(os.getenv("CLASSROOM_TRACK_MAX_MISSES", 15)))
@@ -1,32 +1,218 @@
 import logging
 import asyncio
 import inspect
-from typing import Optional
+import time
+from typing import Dict, Optional
 from fastapi import FastAPI
+from core import config, metrics
 from services.attention_analysis import AttentionAnalysisService
 from services.frame_processor import FrameProcessingService
+from services.process_pool_frame_service import ProcessPoolFrameService
+from services.staged_frame_service import StagedFrameService
 from services.calibration_storage import CalibrationStorageService
+from services.frame_cache import FrameResultCache
+from services.attention_aggregates import AttentionAggregator
+from services.capture_hints import CaptureIntervalAdvisor
+from services.flight_recorder import SlowFrameRecorder
+from services.classroom_sessions import ClassroomSessionManager, create_classroom_pipeline
 from ml_logic.attention_classifier import AttentionClassifier
+from utils.warmup_frames import encode_frames, synthetic_frames
 
 logger = logging.getLogger(__name__)
 
+class StartupStatus:
+    def __init__(self):
+        self.phase = "starting"
+        self.error: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.durations: Dict[str, float] = {}
+        self.warm_up: Optional[Dict] = None
+        self._phase_started = self.started_at
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == "ready"
+
+    @property
+    def failed(self) -> bool:
+        return self.phase == "failed"
+
+    def advance(self, phase: str) -> None:
+        now = time.monotonic()
+        self.durations[self.phase] = now - self._phase_started
+        self.phase = phase
+        self._phase_started = now
+
+    def fail(self, error: Exception) -> None:
+        self.error = str(error)
+        self.advance("failed")
+
+    def to_dict(self) -> Dict:
+        return {
+            "phase": self.phase,
+            "error": self.error,
+            "uptime": time.monotonic() - self.started_at,
+            "durations": dict(self.durations),
+            "warm_up": self.warm_up,
+        }
+
 class ServiceInitializer:
+    @staticmethod
+    def create_frame_service():
+        if config.INFERENCE_BACKEND == "process":
+            logger.info("Using process-pool inference backend with %d workers", config.PROCESS_POOL_WORKERS)
+            return ProcessPoolFrameService(
+                workers=config.PROCESS_POOL_WORKERS,
+                slots_per_worker=config.PROCESS_POOL_SLOTS_PER_WORKER,
+                slot_bytes=config.PROCESS_POOL_SLOT_BYTES,
+                task_timeout=config.PROCESS_POOL_TASK_TIMEOUT,
+                checkout_timeout=config.PIPELINE_CHECKOUT_TIMEOUT,
+                worker_settings={
+                    "checkout_timeout": config.PIPELINE_CHECKOUT_TIMEOUT,
+                    "max_sessions": -(-config.TRACKING_MAX_SESSIONS // config.PROCESS_POOL_WORKERS),
+                    "session_ttl": config.TRACKING_SESSION_TTL,
+                    "max_graphs": -(-config.TRACKING_MAX_GRAPHS // config.PROCESS_POOL_WORKERS),
+                    "graph_ttl": config.TRACKING_GRAPH_TTL,
+                    "smoothing_window": config.EAR_SMOOTHING_WINDOW,
+                }
+            )
+        if config.INFERENCE_BACKEND == "staged":
+            logger.info(
+                "Using staged inference backend with %d decode and %d inference workers",
+                config.STAGE_DECODE_WORKERS, config.STAGE_INFERENCE_WORKERS
+            )
+            return StagedFrameService(
+                decode_workers=config.STAGE_DECODE_WORKERS,
+                inference_workers=config.STAGE_INFERENCE_WORKERS,
+                queue_size=config.STAGE_QUEUE_SIZE,
+                submit_timeout=config.PIPELINE_CHECKOUT_TIMEOUT
+            )
+        if config.INFERENCE_BACKEND != "thread":
+            raise ValueError(f"Unknown INFERENCE_BACKEND: {config.INFERENCE_BACKEND}")
+        return FrameProcessingService()
+
+    @staticmethod
+    def create_frame_cache() -> Optional[FrameResultCache]:
+        if not config.FRAME_CACHE_ENABLED:
+            return None
+        return FrameResultCache(
+            ttl=config.FRAME_CACHE_TTL,
+            max_students=config.FRAME_CACHE_MAX_STUDENTS,
+            phash_max_distance=config.FRAME_CACHE_PHASH_DISTANCE,
+            phash_ttl=config.FRAME_CACHE_PHASH_TTL
+        )
+
+    @staticmethod
+    def create_flight_recorder() -> Optional[SlowFrameRecorder]:
+        if not config.FLIGHT_RECORDER_ENABLED:
+            return None
+        return SlowFrameRecorder(
+            capacity=config.FLIGHT_RECORDER_CAPACITY,
+            window=config.FLIGHT_RECORDER_WINDOW,
+            min_duration=config.FLIGHT_RECORDER_MIN_DURATION,
+            capture_frames=config.FLIGHT_RECORDER_CAPTURE_FRAMES,
+            max_frame_bytes=config.FLIGHT_RECORDER_MAX_FRAME_BYTES
+        )
+
+    @staticmethod
+    def create_classroom_sessions() -> Optional[ClassroomSessionManager]:
+        if not config.CLASSROOM_MODE_ENABLED:
+            return None
+        create_classroom_pipeline().close()
+        logger.info(
+            "Classroom mode enabled with the %s landmark backend for up to %d cameras",
+            config.CLASSROOM_LANDMARK_BACKEND, config.CLASSROOM_MAX_CAMERAS
+        )
+        return ClassroomSessionManager(
+            max_cameras=config.CLASSROOM_MAX_CAMERAS,
+            idle_ttl=config.CLASSROOM_CAMERA_TTL,
+            min_iou=config.CLASSROOM_TRACK_MIN_IOU,
+            max_misses=config.CLASSROOM_TRACK_MAX_MISSES,
+            smoothing_window=config.EAR_SMOOTHING_WINDOW
+        )
+
     @staticmethod
     def create_attention_service() -> AttentionAnalysisService:
-        frame_service = FrameProcessingService()
+        classroom_sessions = ServiceInitializer.create_classroom_sessions()
+        frame_service = ServiceInitializer.create_frame_service()
         attention_classifier = AttentionClassifier()
-        calibration_storage = CalibrationStorageService()
-        
+        calibration_storage = CalibrationStorageService(
+            db_path=config.CALIBRATION_DB_PATH or None,
+            flush_interval=config.CALIBRATION_FLUSH_INTERVAL,
+            max_retry_delay=config.CALIBRATION_MAX_RETRY_DELAY
+        )
+        frame_cache = ServiceInitializer.create_frame_cache()
+        aggregator = AttentionAggregator(
+            windows=config.AGGREGATE_WINDOWS,
+            buckets=config.AGGREGATE_BUCKETS,
+            idle_ttl=config.AGGREGATE_IDLE_TTL,
+            max_students=config.AGGREGATE_MAX_STUDENTS
+        )
+
+        capture_advisor = CaptureIntervalAdvisor(
+            base_interval=config.CAPTURE_INTERVAL_BASE,
+            min_interval=config.CAPTURE_INTERVAL_MIN,
+            max_interval=config.CAPTURE_INTERVAL_MAX,
+            stable_frames_per_step=config.CAPTURE_STABLE_FRAMES,
+            motion_threshold=config.CAPTURE_MOTION_THRESHOLD,
+            target_load=config.CAPTURE_TARGET_LOAD,
+            load_fn=lambda: max(0.0, metrics.IN_FLIGHT.value() - 1) / config.EXECUTOR_WORKERS
+        )
+
         return AttentionAnalysisService(
             frame_service=frame_service,
             attention_classifier=attention_classifier,
-            calibration_storage=calibration_storage
+            calibration_storage=calibration_storage,
+            frame_cache=frame_cache,
+            aggregator=aggregator,
+            capture_advisor=capture_advisor,
+            flight_recorder=ServiceInitializer.create_flight_recorder(),
+            classroom_sessions=classroom_sessions
+        )
+
+    @staticmethod
+    def warm_up(service: AttentionAnalysisService) -> Dict:
+        frames = synthetic_frames(
+            config.WARMUP_FRAMES,
+            image_path=config.WARMUP_IMAGE_PATH or None
         )
+        return service.warm_up(encode_frames(frames))
+
+def get_startup_status(app: FastAPI) -> StartupStatus:
+    status = getattr(app.state, "startup", None)
+    if status is None:
+        status = app.state.startup = StartupStatus()
+    return status
 
 def init_app(app: FastAPI) -> None:
-    logger.info("Initializing services...")
-    app.state.attention_service = ServiceInitializer.create_attention_service()
-    logger.info("Services attached to app.state")
+    status = get_startup_status(app)
+    try:
+        logger.info("Initializing services...")
+        status.advance("initializing")
+        svc = ServiceInitializer.create_attention_service()
+        if config.WARMUP_ENABLED:
+            status.advance("warming")
+            try:
+                status.warm_up = ServiceInitializer.warm_up(svc)
+            except Exception:
+                svc.close()
+                raise
+            logger.info(
+                "Warmed %d pipelines with %d frames in %.2fs",
+                status.warm_up["pipelines"], status.warm_up["frames"], status.warm_up["seconds"]
+            )
+        app.state.attention_service = svc
+        status.advance("ready")
+        logger.info("Services attached to app.state")
+    except Exception as e:
+        status.fail(e)
+        raise
+
+async def start_app(app: FastAPI) -> None:
+    try:
+        await asyncio.to_thread(init_app, app)
+    except Exception as e:
+        logger.exception("Startup failed: %s", e)
 
 async def shutdown_app(app: FastAPI) -> None:
     logger.info("Shutting down services...")
@@ -34,6 +220,7 @@ async def shutdown_app(app: FastAPI) -> None:
     if not svc:
         logger.info("No attention service found")
         return
+    app.state.attention_service = None
 
     try:
         if hasattr(svc, "aclose") and inspect.iscoroutinefunction(getattr(svc, "aclose")):
@@ -0,0 +1,239 @@
+import bisect
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, labelvalues: Tuple[str, ...]) -> Dict[str, str]:
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return dict(zip(self.labelnames, labelvalues))
+
+    def samples(self) -> Iterable[Sample]:
+        return []
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        if not name.endswith("_total"):
+            raise ValueError(f"Counter name must end in _total: {name}")
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [("", self._labels(key), value) for key, value in items]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], float]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function = function
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def value(self, *labelvalues: str) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(labelvalues, 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        if self._function is not None:
+            return [("", {}, self._function())]
+        with self._lock:
+            items = list(self._values.items())
+        return [("", self._labels(key), value) for key, value in items]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        samples: List[Sample] = []
+        for key, series in items:
+            labels = self._labels(key)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(("_sum", labels, series[-2]))
+            samples.append(("_count", labels, series[-1]))
+        return samples
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]) -> None:
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            collector()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.register(Histogram(
+    "eyecue_stage_duration_seconds",
+    "Time spent in each frame processing stage",
+    ("stage",)
+))
+FRAMES = registry.register(Counter(
+    "eyecue_frames_total",
+    "Frames analyzed, by face detection outcome",
+    ("face_detected",)
+))
+CACHED_FRAMES = registry.register(Counter(
+    "eyecue_cached_frames_total",
+    "Frames answered from the duplicate frame cache"
+))
+ERRORS = registry.register(Counter(
+    "eyecue_errors_total",
+    "Frame analysis errors by exception type",
+    ("type",)
+))
+EXECUTOR_QUEUE_DEPTH = registry.register(Gauge(
+    "eyecue_executor_queue_depth",
+    "Frames waiting in the admission queue for an executor thread"
+))
+SHED_FRAMES = registry.register(Counter(
+    "eyecue_shed_frames_total",
+    "Frames rejected by admission control, by reason",
+    ("reason",)
+))
+PIPELINE_STAGE_UTILIZATION = registry.register(Gauge(
+    "eyecue_pipeline_stage_utilization",
+    "Share of worker time each staged pipeline stage spent busy over the recent window",
+    ("stage",)
+))
+PIPELINE_STAGE_QUEUE_DEPTH = registry.register(Gauge(
+    "eyecue_pipeline_stage_queue_depth",
+    "Frames waiting in front of each staged pipeline stage",
+    ("stage",)
+))
+CLASSROOM_FACES = registry.register(Counter(
+    "eyecue_classroom_faces_total",
+    "Faces analyzed in classroom camera frames, by whether they matched a seat",
+    ("seated",)
+))
+IN_FLIGHT = registry.register(Gauge(
+    "eyecue_requests_in_flight",
+    "Analysis calls queued or running"
+))
+
+def _face_detected_ratio() -> float:
+    detected = FRAMES.value("true")
+    total = detected + FRAMES.value("false")
+    return detected / total if total else 0.0
+
+FACE_DETECTED_RATIO = registry.register(Gauge(
+    "eyecue_face_detected_ratio",
+    "Share of analyzed frames in which a face was detected",
+    function=_face_detected_ratio
+))
+
+def observe_stages(timings: Dict[str, float]) -> None:
+    for stage, seconds in timings.items():
+        STAGE_DURATION.observe(seconds, stage)
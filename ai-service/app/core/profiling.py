@@ -0,0 +1,118 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType
+from typing import Dict, List, Optional, Tuple
+
+Stack = Tuple[str, ...]
+
+class ProfilerBusyError(RuntimeError):
+    pass
+
+def _thread_cpu_time(ident: int) -> Optional[float]:
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError):
+        return None
+
+def _code_label(code: CodeType) -> str:
+    path = code.co_filename.split(os.sep)
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+class StackProfile:
+    def __init__(self, stacks: Dict[Stack, int], samples: int, seconds: float, interval: float, mode: str):
+        self.stacks = stacks
+        self.samples = samples
+        self.seconds = seconds
+        self.interval = interval
+        self.mode = mode
+
+    def collapsed(self) -> str:
+        lines = [f"{';'.join(stack)} {count}" for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def to_dict(self, limit: int = 50) -> Dict:
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack[1:]):
+                total[label] += count
+        thread_samples: Counter = Counter()
+        for stack, count in self.stacks.items():
+            thread_samples[stack[0]] += count
+        top_stacks = sorted(self.stacks.items(), key=lambda item: -item[1])[:limit]
+        return {
+            "mode": self.mode,
+            "seconds": self.seconds,
+            "interval": self.interval,
+            "samples": self.samples,
+            "threads": dict(thread_samples.most_common()),
+            "stacks": [{"frames": list(stack), "count": count} for stack, count in top_stacks],
+            "self": [{"function": label, "count": count} for label, count in own.most_common(limit)],
+            "total": [{"function": label, "count": count} for label, count in total.most_common(limit)],
+        }
+
+class SamplingProfiler:
+    def __init__(self, max_seconds: float = 60.0, min_interval: float = 0.001):
+        self.max_seconds = max_seconds
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, seconds: float, interval: float = 0.005, mode: str = "cpu") -> StackProfile:
+        if mode not in ("cpu", "wall"):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            return self._sample(min(max(seconds, 0.0), self.max_seconds), max(interval, self.min_interval), mode)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval: float, mode: str) -> StackProfile:
+        own_thread = threading.get_ident()
+        labels: Dict[CodeType, str] = {}
+        stacks: Counter = Counter()
+        cpu_times: Dict[int, Optional[float]] = {}
+        samples = 0
+        started = next_sample = time.perf_counter()
+        deadline = started + seconds
+        while True:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_thread:
+                    continue
+                if mode == "cpu":
+                    cpu_time = _thread_cpu_time(ident)
+                    previous = cpu_times.get(ident)
+                    cpu_times[ident] = cpu_time
+                    if cpu_time is not None and (previous is None or cpu_time <= previous):
+                        continue
+                stack: List[str] = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _code_label(code)
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stack.reverse()
+                stacks[tuple(stack)] += 1
+            samples += 1
+            next_sample += interval
+            now = time.perf_counter()
+            if next_sample >= deadline:
+                break
+            if next_sample > now:
+                time.sleep(next_sample - now)
+            else:
+                next_sample = now
+        return StackProfile(dict(stacks), samples, time.perf_counter() - started, interval, mode)
@@ -0,0 +1,104 @@
+import asyncio
+import hmac
+from typing import Dict, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+
+from core import config
+from core.profiling import ProfilerBusyError, SamplingProfiler
+from endpoints.attention import get_attention_service
+from services.attention_analysis import AttentionAnalysisService
+from services.flight_recorder import SlowFrameRecorder
+
+_profiler = SamplingProfiler(max_seconds=config.PROFILER_MAX_SECONDS)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them"
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), config.ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
+        )
+
+def get_flight_recorder(
+    attention_service: AttentionAnalysisService = Depends(get_attention_service)
+) -> SlowFrameRecorder:
+    if attention_service.flight_recorder is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slow-frame recorder is disabled"
+        )
+    return attention_service.flight_recorder
+
+def image_media_type(data: bytes) -> str:
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"RIFF") and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data.startswith(b"BM"):
+        return "image/bmp"
+    return "application/octet-stream"
+
+def create_admin_router() -> APIRouter:
+    router = APIRouter(dependencies=[Depends(require_admin)])
+
+    @router.get("/slow-frames")
+    async def slow_frames_endpoint(recorder: SlowFrameRecorder = Depends(get_flight_recorder)) -> Dict:
+        return {
+            **recorder.stats(),
+            "frames": [entry.to_dict() for entry in recorder.frames()],
+        }
+
+    @router.get("/slow-frames/{entry_id}/frame")
+    async def slow_frame_image_endpoint(
+        entry_id: int,
+        recorder: SlowFrameRecorder = Depends(get_flight_recorder)
+    ) -> Response:
+        entry = recorder.get(entry_id)
+        if entry is None or entry.frame_bytes is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No captured frame for slow-frame entry {entry_id}"
+            )
+        return Response(
+            content=entry.frame_bytes,
+            media_type=image_media_type(entry.frame_bytes),
+            headers={"X-Student-Id": entry.student_id, "X-Frame-Id": entry.frame_id}
+        )
+
+    @router.delete("/slow-frames")
+    async def clear_slow_frames_endpoint(recorder: SlowFrameRecorder = Depends(get_flight_recorder)) -> Dict:
+        return {"cleared": recorder.clear()}
+
+    @router.post("/profile")
+    async def profile_endpoint(
+        seconds: float = Query(10.0, gt=0),
+        interval: float = Query(config.PROFILER_DEFAULT_INTERVAL, gt=0),
+        limit: int = Query(50, ge=1),
+        mode: Literal["cpu", "wall"] = Query("cpu"),
+        output: Literal["json", "collapsed"] = Query("json", alias="format")
+    ):
+        if seconds > _profiler.max_seconds:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Profiles are limited to {_profiler.max_seconds:g} seconds"
+            )
+        try:
+            profile = await asyncio.to_thread(_profiler.profile, seconds, interval, mode)
+        except ProfilerBusyError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
+            )
+        if output == "collapsed":
+            return PlainTextResponse(profile.collapsed())
+        return profile.to_dict(limit)
+
+    return router
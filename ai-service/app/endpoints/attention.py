@@ -1,19 +1,52 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response, Header, Query
 from pydantic import BaseModel
-from typing import Dict, Literal
+from typing import Callable, Dict, List, Literal, Optional, Union
+from datetime import datetime, timezone
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
+from core import config, metrics
 from ml_logic.face_mesh_pipeline import FaceMeshError
+from ml_logic.pipeline_pool import PipelineUnavailableError
+from services.admission import (
+    AdmissionOverflowError,
+    AdmissionScheduler,
+    FrameExpiredError,
+    FrameSupersededError,
+)
+from endpoints.wire_format import (
+    MSGPACK_FRAME_SCHEMA,
+    FrameMessage,
+    decode_msgpack,
+    frame_from_message,
+    is_msgpack_request,
+    parse_json_model,
+    render,
+    request_body_schema,
+)
 from services.attention_analysis import AttentionAnalysisService
 
-_executor = ThreadPoolExecutor(max_workers=4)
+_executor = ThreadPoolExecutor(max_workers=config.EXECUTOR_WORKERS)
+_scheduler = AdmissionScheduler(
+    _executor,
+    max_concurrency=config.EXECUTOR_WORKERS,
+    deadline=config.ADMISSION_DEADLINE,
+    max_pending=config.ADMISSION_MAX_PENDING,
+    trust_client_timestamps=config.ADMISSION_TRUST_CLIENT_TIMESTAMPS,
+    max_clock_skew=config.ADMISSION_MAX_CLOCK_SKEW
+)
+
+def admission_stats() -> Dict:
+    return _scheduler.stats()
+
+RAW_FRAME_CONTENT_TYPES = {"image/jpeg", "image/jpg", "image/png", "application/octet-stream"}
 
 class FrameRequest(BaseModel):
     studentId: str
     frameId: str
     frameBase64: str
     timestamp: str
+    classId: Optional[str] = None
 
 class AttentionResponse(BaseModel):
     studentId: str
@@ -22,33 +55,134 @@ class AttentionResponse(BaseModel):
     faceDetected: bool
     status: str
     processingTimestamp: Dict = {}
+    cached: bool = False
+    nextCaptureMs: Optional[int] = None
+
+class CalibrationEntry(BaseModel):
+    studentId: str
+    leftGazeDeviation: Optional[float] = None
+    rightGazeDeviation: Optional[float] = None
+
+class CalibrationTransfer(BaseModel):
+    calibrations: List[CalibrationEntry]
+
+class WindowSummary(BaseModel):
+    seconds: float
+    frames: int
+    attentive: int
+    attentiveRatio: Optional[float] = None
+    noFace: int
+    eyesClosed: int
+
+class StreakSummary(BaseModel):
+    label: Optional[Literal["attentive", "inattentive"]] = None
+    frames: int
+    seconds: float
+
+class StudentSummaryResponse(BaseModel):
+    studentId: str
+    classId: Optional[str] = None
+    frames: int
+    attentiveRatio: Optional[float] = None
+    noFace: int
+    eyesClosed: int
+    durationSeconds: float
+    idleSeconds: float
+    windows: List[WindowSummary]
+    streak: StreakSummary
+    longestAttentiveStreak: int
+    longestInattentiveStreak: int
+
+class ClassSummaryResponse(BaseModel):
+    classId: str
+    students: int
+    attentiveStudents: int
+    frames: int
+    attentiveRatio: Optional[float] = None
+    noFace: int
+    eyesClosed: int
+    durationSeconds: float
+    idleSeconds: float
+    windows: List[WindowSummary]
+
+class BatchFrameRequest(BaseModel):
+    frames: List[FrameRequest]
+
+class BatchItemResponse(BaseModel):
+    studentId: str
+    frameId: str
+    statusCode: int
+    attentionLabel: Optional[Literal["attentive", "inattentive"]] = None
+    faceDetected: Optional[bool] = None
+    status: str
+    processingTimestamp: Dict = {}
+    cached: bool = False
+    nextCaptureMs: Optional[int] = None
+    error: Optional[str] = None
+
+class BatchAttentionResponse(BaseModel):
+    results: List[BatchItemResponse]
+    succeeded: int
+    failed: int
 
 def get_attention_service(request: Request) -> AttentionAnalysisService:
     svc = getattr(request.app.state, "attention_service", None)
     if svc is None:
-        raise RuntimeError("Attention service not initialized")
+        raise HTTPException(
+            status_code=503,
+            detail="Attention service is starting",
+            headers={"Retry-After": "1"}
+        )
     return svc
 
-async def analyze_frame(
-    request: FrameRequest,
-    attention_service: AttentionAnalysisService
-) -> AttentionResponse:
-
-    loop = asyncio.get_running_loop()
+async def run_analysis(
+    analyze: Callable[..., Dict],
+    student_id: str,
+    frame_id: str,
+    frame,
+    timestamp: str,
+    class_id: Optional[str] = None,
+    key: Optional[str] = None
+) -> Dict:
+    metrics.IN_FLIGHT.inc()
     try:
-        result = await loop.run_in_executor(
-            _executor,
-            attention_service.analyze_frame_from_base64,
-            request.studentId,
-            request.frameId,
-            request.frameBase64,
-            request.timestamp
+        return await _scheduler.submit(
+            key or student_id.strip(),
+            timestamp,
+            analyze,
+            student_id,
+            frame_id,
+            frame,
+            timestamp,
+            class_id
+        )
+    except FrameExpiredError as e:
+        raise HTTPException(
+            status_code=status.HTTP_408_REQUEST_TIMEOUT,
+            detail=str(e)
+        )
+    except FrameSupersededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except AdmissionOverflowError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
         )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except PipelineUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except FaceMeshError as e:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -59,24 +193,295 @@ async def analyze_frame(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
+    finally:
+        metrics.IN_FLIGHT.dec()
+
+def capture_interval_ms(result: Dict) -> Optional[int]:
+    interval = result.get("next_capture_interval")
+    return round(interval * 1000) if interval is not None else None
+
+def attention_payload(student_id: str, frame_id: str, result: Dict) -> Dict:
+    return {
+        "studentId": student_id,
+        "frameId": frame_id,
+        "attentionLabel": result.get("attention_label", "inattentive"),
+        "faceDetected": result.get("face_detected", False),
+        "status": result.get("status", "unknown"),
+        "processingTimestamp": result.get("processing_timestamp", {}),
+        "cached": result.get("cached", False),
+        "nextCaptureMs": capture_interval_ms(result),
+    }
+
+def to_attention_response(student_id: str, frame_id: str, result: Dict) -> AttentionResponse:
+    return AttentionResponse(**attention_payload(student_id, frame_id, result))
+
+def frame_from_request(request: FrameRequest) -> FrameMessage:
+    return FrameMessage(
+        student_id=request.studentId,
+        frame_id=request.frameId,
+        timestamp=request.timestamp,
+        frame_base64=request.frameBase64,
+        class_id=request.classId
+    )
+
+async def analyze_message(
+    frame: FrameMessage,
+    attention_service: AttentionAnalysisService
+) -> Dict:
+    if frame.frame_bytes is not None:
+        analyze, data = attention_service.analyze_frame, frame.frame_bytes
+    else:
+        analyze, data = attention_service.analyze_frame_from_base64, frame.frame_base64
+    return await run_analysis(analyze, frame.student_id, frame.frame_id, data, frame.timestamp, frame.class_id)
+
+async def analyze_frame(
+    frame: FrameMessage,
+    attention_service: AttentionAnalysisService
+) -> Dict:
+    result = await analyze_message(frame, attention_service)
+    return attention_payload(frame.student_id, frame.frame_id, result)
+
+async def analyze_batch_item(
+    frame: FrameMessage,
+    attention_service: AttentionAnalysisService
+) -> Dict:
+    try:
+        payload = await analyze_frame(frame, attention_service)
+    except HTTPException as e:
+        return {
+            "studentId": frame.student_id,
+            "frameId": frame.frame_id,
+            "statusCode": e.status_code,
+            "attentionLabel": None,
+            "faceDetected": None,
+            "status": "error",
+            "processingTimestamp": {},
+            "cached": False,
+            "nextCaptureMs": None,
+            "error": str(e.detail),
+        }
+    return {**payload, "statusCode": status.HTTP_200_OK, "error": None}
+
+async def analyze_student_frames(
+    frames: List[FrameMessage],
+    attention_service: AttentionAnalysisService
+) -> List[Dict]:
+    return [await analyze_batch_item(frame, attention_service) for frame in frames]
+
+async def analyze_batch(
+    frames: List[FrameMessage],
+    attention_service: AttentionAnalysisService
+) -> Dict:
+    if len(frames) > config.BATCH_MAX_FRAMES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {config.BATCH_MAX_FRAMES} frames"
+        )
+
+    by_student: Dict[str, List[int]] = {}
+    for index, frame in enumerate(frames):
+        by_student.setdefault(frame.student_id.strip(), []).append(index)
+
+    grouped = await asyncio.gather(*(
+        analyze_student_frames([frames[i] for i in indices], attention_service)
+        for indices in by_student.values()
+    ))
+
+    results: List[Optional[Dict]] = [None] * len(frames)
+    for indices, items in zip(by_student.values(), grouped):
+        for index, item in zip(indices, items):
+            results[index] = item
+
+    succeeded = sum(1 for item in results if item["error"] is None)
+    return {
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+    }
+
+async def read_frame_request(request: Request) -> FrameMessage:
+    body = await request.body()
+    if not is_msgpack_request(request):
+        return frame_from_request(parse_json_model(body, FrameRequest))
+    try:
+        return frame_from_message(decode_msgpack(body))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
-    return AttentionResponse(
-        studentId=request.studentId,
-        frameId=request.frameId,
-        attentionLabel=result.get("attention_label", "inattentive"),
-        faceDetected=result.get("face_detected", False),
-        status=result.get("status", "unknown"),
-        processingTimestamp=result.get("processing_timestamp", {})
+async def read_batch_request(request: Request) -> List[FrameMessage]:
+    body = await request.body()
+    if not is_msgpack_request(request):
+        return [frame_from_request(frame) for frame in parse_json_model(body, BatchFrameRequest).frames]
+    frames = decode_msgpack(body).get("frames")
+    if not isinstance(frames, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch body must contain a 'frames' list"
+        )
+    try:
+        return [frame_from_message(frame) for frame in frames]
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+async def read_raw_frame(request: Request):
+    content_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    if content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("frame") or form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Multipart upload must include a 'frame' file part"
+            )
+        return await upload.read(), form
+    if content_type and content_type not in RAW_FRAME_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported content type: {content_type}"
+        )
+    return await request.body(), {}
+
+async def analyze_raw_frame(
+    request: Request,
+    attention_service: AttentionAnalysisService,
+    student_id: Optional[str],
+    frame_id: Optional[str],
+    timestamp: Optional[str],
+    class_id: Optional[str] = None
+) -> Dict:
+    image_data, form = await read_raw_frame(request)
+    student_id = student_id or form.get("studentId")
+    frame_id = frame_id or form.get("frameId")
+    timestamp = timestamp or form.get("timestamp") or datetime.now(timezone.utc).isoformat()
+    class_id = class_id or form.get("classId")
+    if not student_id or not frame_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="studentId and frameId are required as query parameters or X-Student-Id/X-Frame-Id headers"
+        )
+    if not image_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Empty frame body"
+        )
+    return await analyze_frame(
+        FrameMessage(student_id, frame_id, timestamp, frame_bytes=image_data, class_id=class_id),
+        attention_service
     )
 
 def create_attention_router() -> APIRouter:
     router = APIRouter()
 
-    @router.post("/analyze", response_model=AttentionResponse)
+    @router.post(
+        "/analyze",
+        response_model=AttentionResponse,
+        openapi_extra=request_body_schema(FrameRequest, MSGPACK_FRAME_SCHEMA)
+    )
     async def analyze_frame_endpoint(
-        frame_request: FrameRequest,
+        request: Request,
+        attention_service: AttentionAnalysisService = Depends(get_attention_service)
+    ) -> Union[Dict, Response]:
+        frame = await read_frame_request(request)
+        return render(request, await analyze_frame(frame, attention_service))
+
+    @router.post(
+        "/analyze-batch",
+        response_model=BatchAttentionResponse,
+        openapi_extra=request_body_schema(
+            BatchFrameRequest,
+            {"type": "object", "required": ["frames"], "properties": {"frames": {"type": "array", "items": MSGPACK_FRAME_SCHEMA}}}
+        )
+    )
+    async def analyze_batch_endpoint(
+        request: Request,
+        attention_service: AttentionAnalysisService = Depends(get_attention_service)
+    ) -> Union[Dict, Response]:
+        frames = await read_batch_request(request)
+        return render(request, await analyze_batch(frames, attention_service))
+
+    @router.post("/analyze-raw", response_model=AttentionResponse)
+    async def analyze_raw_frame_endpoint(
+        request: Request,
+        student_id: Optional[str] = Query(None, alias="studentId"),
+        frame_id: Optional[str] = Query(None, alias="frameId"),
+        timestamp: Optional[str] = Query(None),
+        class_id: Optional[str] = Query(None, alias="classId"),
+        x_student_id: Optional[str] = Header(None),
+        x_frame_id: Optional[str] = Header(None),
+        x_frame_timestamp: Optional[str] = Header(None),
+        x_class_id: Optional[str] = Header(None),
+        attention_service: AttentionAnalysisService = Depends(get_attention_service)
+    ) -> Union[Dict, Response]:
+        return render(request, await analyze_raw_frame(
+            request,
+            attention_service,
+            student_id or x_student_id,
+            frame_id or x_frame_id,
+            timestamp or x_frame_timestamp,
+            class_id or x_class_id
+        ))
+
+    @router.get("/summary/students/{student_id}", response_model=StudentSummaryResponse)
+    async def student_summary_endpoint(
+        student_id: str,
+        attention_service: AttentionAnalysisService = Depends(get_attention_service)
+    ) -> StudentSummaryResponse:
+        summary = attention_service.get_student_summary(student_id)
+        if summary is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No attention data for student {student_id}"
+            )
+        return StudentSummaryResponse(**summary)
+
+    @router.get("/summary/classes/{class_id}", response_model=ClassSummaryResponse)
+    async def class_summary_endpoint(
+        class_id: str,
+        attention_service: AttentionAnalysisService = Depends(get_attention_service)
+    ) -> ClassSummaryResponse:
+        summary = attention_service.get_class_summary(class_id)
+        if summary is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No attention data for class {class_id}"
+            )
+        return ClassSummaryResponse(**summary)
+
+    @router.delete("/sessions/{student_id}")
+    async def end_student_session_endpoint(
+        student_id: str,
+        attention_service: AttentionAnalysisService = Depends(get_attention_service)
+    ) -> Dict:
+        return {
+            "studentId": student_id,
+            "ended": attention_service.end_student_session(student_id)
+        }
+
+    @router.get("/calibrations", response_model=CalibrationTransfer)
+    async def export_calibrations_endpoint(
+        student_id: Optional[List[str]] = Query(None, alias="studentId"),
+        attention_service: AttentionAnalysisService = Depends(get_attention_service)
+    ) -> CalibrationTransfer:
+        return CalibrationTransfer(calibrations=[
+            CalibrationEntry(studentId=sid, leftGazeDeviation=left, rightGazeDeviation=right)
+            for sid, left, right in attention_service.export_calibrations(student_id)
+        ])
+
+    @router.post("/calibrations")
+    async def import_calibrations_endpoint(
+        transfer: CalibrationTransfer,
         attention_service: AttentionAnalysisService = Depends(get_attention_service)
-    ) -> AttentionResponse:
-        return await analyze_frame(frame_request, attention_service)
+    ) -> Dict:
+        imported = attention_service.import_calibrations([
+            (entry.studentId.strip(), entry.leftGazeDeviation, entry.rightGazeDeviation)
+            for entry in transfer.calibrations
+        ])
+        return {"received": len(transfer.calibrations), "imported": imported}
 
-    return router
\ No newline at end of file
+    return router
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+
+from core import config
+from endpoints.attention import FrameRequest, analyze_message, frame_from_request, to_attention_response
+from endpoints.wire_format import FrameMessage
+from services.attention_analysis import AttentionAnalysisService
+
+logger = logging.getLogger(__name__)
+
+class LatestFrameQueue:
+    def __init__(self, maxsize: int):
+        self.maxsize = max(1, maxsize)
+        self.dropped = 0
+        self._frames: "OrderedDict[str, FrameMessage]" = OrderedDict()
+        self._in_flight: Set[str] = set()
+        self._ready = asyncio.Condition()
+
+    async def put(self, frame: FrameMessage) -> None:
+        async with self._ready:
+            if frame.student_id in self._frames:
+                del self._frames[frame.student_id]
+                self.dropped += 1
+            elif len(self._frames) >= self.maxsize:
+                self._frames.popitem(last=False)
+                self.dropped += 1
+            self._frames[frame.student_id] = frame
+            self._ready.notify()
+
+    async def get(self) -> FrameMessage:
+        async with self._ready:
+            while True:
+                for student_id, frame in self._frames.items():
+                    if student_id not in self._in_flight:
+                        del self._frames[student_id]
+                        self._in_flight.add(student_id)
+                        return frame
+                await self._ready.wait()
+
+    async def done(self, frame: FrameMessage) -> None:
+        async with self._ready:
+            self._in_flight.discard(frame.student_id)
+            self._ready.notify()
+
+    def depth(self) -> int:
+        return len(self._frames)
+
+def parse_stream_message(
+    message: Dict,
+    default_student_id: Optional[str],
+    sequence: int,
+    default_class_id: Optional[str] = None
+) -> FrameMessage:
+    if message.get("bytes") is not None:
+        if not default_student_id:
+            raise ValueError("Binary frames require a studentId query parameter")
+        return FrameMessage(
+            student_id=default_student_id,
+            frame_id=str(sequence),
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            frame_bytes=message["bytes"],
+            class_id=default_class_id
+        )
+    payload = json.loads(message.get("text") or "{}")
+    if not isinstance(payload, dict):
+        raise ValueError("Frame message must be a JSON object")
+    payload.setdefault("studentId", default_student_id)
+    payload.setdefault("frameId", str(sequence))
+    payload.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
+    payload.setdefault("classId", default_class_id)
+    return frame_from_request(FrameRequest(**payload))
+
+async def stream_worker(
+    websocket: WebSocket,
+    frames: LatestFrameQueue,
+    attention_service: AttentionAnalysisService,
+    send_lock: asyncio.Lock
+) -> None:
+    while True:
+        frame = await frames.get()
+        try:
+            result = await analyze_message(frame, attention_service)
+            message = {
+                "type": "result",
+                **to_attention_response(frame.student_id, frame.frame_id, result).model_dump(),
+                "dropped": frames.dropped,
+            }
+        except HTTPException as e:
+            message = {
+                "type": "error",
+                "studentId": frame.student_id,
+                "frameId": frame.frame_id,
+                "statusCode": e.status_code,
+                "detail": e.detail,
+            }
+        finally:
+            await frames.done(frame)
+        async with send_lock:
+            await websocket.send_json(message)
+
+def create_attention_stream_router() -> APIRouter:
+    router = APIRouter()
+
+    @router.websocket("/stream")
+    async def attention_stream_endpoint(websocket: WebSocket):
+        attention_service = getattr(websocket.app.state, "attention_service", None)
+        if attention_service is None:
+            await websocket.close(code=1013)
+            return
+
+        await websocket.accept()
+        default_student_id = websocket.query_params.get("studentId")
+        default_class_id = websocket.query_params.get("classId")
+        frames = LatestFrameQueue(config.STREAM_QUEUE_SIZE)
+        send_lock = asyncio.Lock()
+        workers = [
+            asyncio.create_task(stream_worker(websocket, frames, attention_service, send_lock))
+            for _ in range(config.STREAM_MAX_IN_FLIGHT)
+        ]
+        sequence = 0
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                sequence += 1
+                try:
+                    frame = parse_stream_message(message, default_student_id, sequence, default_class_id)
+                except (ValueError, ValidationError) as e:
+                    async with send_lock:
+                        await websocket.send_json({
+                            "type": "error",
+                            "statusCode": 400,
+                            "detail": str(e),
+                        })
+                    continue
+                await frames.put(frame)
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            logger.exception("Attention stream failed: %s", e)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    return router
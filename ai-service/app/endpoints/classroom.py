@@ -0,0 +1,195 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional, Union
+
+from endpoints.attention import get_attention_service, run_analysis
+from endpoints.wire_format import (
+    MSGPACK_FRAME_SCHEMA,
+    FrameMessage,
+    decode_msgpack,
+    frame_from_message,
+    is_msgpack_request,
+    parse_json_model,
+    render,
+    request_body_schema,
+)
+from ml_logic.face_tracker import Seat, SeatMap
+from services.attention_analysis import AttentionAnalysisService
+
+CLASSROOM_MSGPACK_SCHEMA = {
+    **MSGPACK_FRAME_SCHEMA,
+    "required": ["frameId", "frame"],
+    "properties": {
+        name: schema for name, schema in MSGPACK_FRAME_SCHEMA["properties"].items() if name != "studentId"
+    },
+}
+
+class SeatEntry(BaseModel):
+    seatId: str
+    studentId: str
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+class SeatMapRequest(BaseModel):
+    seats: List[SeatEntry]
+
+class SeatMapResponse(BaseModel):
+    cameraId: str
+    seats: List[SeatEntry]
+
+class ClassroomFrameRequest(BaseModel):
+    frameId: str
+    frameBase64: str
+    timestamp: str
+    classId: Optional[str] = None
+
+class ClassroomFace(BaseModel):
+    trackId: int
+    studentId: Optional[str] = None
+    seatId: Optional[str] = None
+    attentionLabel: Literal["attentive", "inattentive"]
+    faceDetected: bool
+    eyesClosed: bool = False
+    usingCalibration: bool = False
+    bbox: Optional[List[float]] = None
+
+class ClassroomResponse(BaseModel):
+    cameraId: str
+    frameId: str
+    status: str
+    faces: List[ClassroomFace]
+    absentStudents: List[str]
+    processingTimestamp: Dict = {}
+
+def get_classroom_service(
+    attention_service: AttentionAnalysisService = Depends(get_attention_service)
+) -> AttentionAnalysisService:
+    if attention_service.classroom_sessions is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Classroom mode is disabled"
+        )
+    return attention_service
+
+def seat_map_payload(camera_id: str, seat_map: SeatMap) -> Dict:
+    return {
+        "cameraId": camera_id,
+        "seats": [
+            {
+                "seatId": seat.seat_id,
+                "studentId": seat.student_id,
+                "x0": seat.bbox[0],
+                "y0": seat.bbox[1],
+                "x1": seat.bbox[2],
+                "y1": seat.bbox[3],
+            }
+            for seat in seat_map.seats
+        ],
+    }
+
+def classroom_payload(camera_id: str, frame_id: str, result: Dict) -> Dict:
+    return {
+        "cameraId": camera_id,
+        "frameId": frame_id,
+        "status": result.get("status", "unknown"),
+        "faces": [
+            {
+                "trackId": face["track_id"],
+                "studentId": face.get("student_id"),
+                "seatId": face.get("seat_id"),
+                "attentionLabel": face.get("attention_label", "inattentive"),
+                "faceDetected": face.get("face_detected", False),
+                "eyesClosed": face.get("eyes_closed", False),
+                "usingCalibration": face.get("using_calibration", False),
+                "bbox": list(face["face_bbox"]) if face.get("face_bbox") else None,
+            }
+            for face in result.get("faces", [])
+        ],
+        "absentStudents": result.get("absent_students", []),
+        "processingTimestamp": result.get("processing_timestamp", {}),
+    }
+
+async def read_classroom_request(request: Request, camera_id: str) -> FrameMessage:
+    body = await request.body()
+    if not is_msgpack_request(request):
+        frame = parse_json_model(body, ClassroomFrameRequest)
+        return FrameMessage(
+            student_id=camera_id,
+            frame_id=frame.frameId,
+            timestamp=frame.timestamp,
+            frame_base64=frame.frameBase64,
+            class_id=frame.classId
+        )
+    try:
+        return frame_from_message({**decode_msgpack(body), "studentId": camera_id})
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+def create_classroom_router() -> APIRouter:
+    router = APIRouter()
+
+    @router.put("/{camera_id}/seats", response_model=SeatMapResponse)
+    async def set_seat_map_endpoint(
+        camera_id: str,
+        seat_map: SeatMapRequest,
+        attention_service: AttentionAnalysisService = Depends(get_classroom_service)
+    ) -> Dict:
+        try:
+            seats = SeatMap([
+                Seat(entry.seatId.strip(), entry.studentId.strip(), (entry.x0, entry.y0, entry.x1, entry.y1))
+                for entry in seat_map.seats
+            ])
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        attention_service.set_seat_map(camera_id, seats)
+        return seat_map_payload(camera_id, seats)
+
+    @router.get("/{camera_id}/seats", response_model=SeatMapResponse)
+    async def get_seat_map_endpoint(
+        camera_id: str,
+        attention_service: AttentionAnalysisService = Depends(get_classroom_service)
+    ) -> Dict:
+        return seat_map_payload(camera_id, attention_service.get_seat_map(camera_id))
+
+    @router.delete("/{camera_id}")
+    async def end_camera_session_endpoint(
+        camera_id: str,
+        attention_service: AttentionAnalysisService = Depends(get_classroom_service)
+    ) -> Dict:
+        return {
+            "cameraId": camera_id,
+            "ended": attention_service.end_classroom_session(camera_id)
+        }
+
+    @router.post(
+        "/{camera_id}/analyze",
+        response_model=ClassroomResponse,
+        openapi_extra=request_body_schema(ClassroomFrameRequest, CLASSROOM_MSGPACK_SCHEMA)
+    )
+    async def analyze_classroom_endpoint(
+        camera_id: str,
+        request: Request,
+        attention_service: AttentionAnalysisService = Depends(get_classroom_service)
+    ) -> Union[Dict, Response]:
+        frame = await read_classroom_request(request, camera_id)
+        data = frame.frame_bytes if frame.frame_bytes is not None else frame.frame_base64
+        result = await run_analysis(
+            attention_service.analyze_classroom_frame,
+            camera_id,
+            frame.frame_id,
+            data,
+            frame.timestamp,
+            frame.class_id,
+            key=f"classroom:{camera_id.strip()}"
+        )
+        return render(request, classroom_payload(camera_id, frame.frame_id, result))
+
+    return router
@@ -0,0 +1,271 @@
+import asyncio
+import json
+from typing import Dict, List, Optional, Union
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel
+
+from core import config
+from endpoints.wire_format import MSGPACK_MEDIA_TYPE, decode_msgpack, is_msgpack_request, packb, render, unpackb
+from services.replica_router import ReplicaRouter, ReplicaUnavailableError
+
+FORWARDED_REQUEST_HEADERS = ("content-type", "accept", "x-student-id", "x-frame-id", "x-frame-timestamp", "x-class-id")
+FORWARDED_RESPONSE_HEADERS = ("content-type", "retry-after")
+
+class ReplicaRequest(BaseModel):
+    url: str
+
+def get_replica_router(request: Request) -> ReplicaRouter:
+    router = getattr(request.app.state, "replica_router", None)
+    if router is None:
+        raise RuntimeError("Replica router not initialized")
+    return router
+
+def to_response(upstream: httpx.Response) -> Response:
+    return Response(
+        content=upstream.content,
+        status_code=upstream.status_code,
+        headers={name: upstream.headers[name] for name in FORWARDED_RESPONSE_HEADERS if name in upstream.headers}
+    )
+
+async def forward_request(
+    replica_router: ReplicaRouter,
+    student_id: str,
+    request: Request,
+    path: str,
+    content: Optional[bytes] = None
+) -> Response:
+    headers = {name: request.headers[name] for name in FORWARDED_REQUEST_HEADERS if name in request.headers}
+    try:
+        upstream = await replica_router.forward(
+            student_id,
+            request.method,
+            path,
+            content=content,
+            headers=headers,
+            params=request.query_params
+        )
+    except ReplicaUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+    return to_response(upstream)
+
+def read_json(body: bytes) -> Dict:
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be valid JSON"
+        )
+    if not isinstance(payload, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be a JSON object"
+        )
+    return payload
+
+def read_payload(request: Request, body: bytes) -> Dict:
+    return decode_msgpack(body) if is_msgpack_request(request) else read_json(body)
+
+async def forward_batch_group(replica_router: ReplicaRouter, frames: List[Dict], binary: bool = False) -> List[Dict]:
+    if binary:
+        encoded = {
+            "content": packb({"frames": frames}),
+            "headers": {"content-type": MSGPACK_MEDIA_TYPE, "accept": MSGPACK_MEDIA_TYPE},
+        }
+    else:
+        encoded = {"json": {"frames": frames}}
+    try:
+        upstream = await replica_router.forward(
+            str(frames[0].get("studentId", "")),
+            "POST",
+            "/api/attention/analyze-batch",
+            **encoded
+        )
+    except ReplicaUnavailableError as e:
+        return [batch_error(frame, status.HTTP_503_SERVICE_UNAVAILABLE, str(e)) for frame in frames]
+    if upstream.status_code != status.HTTP_200_OK:
+        return [batch_error(frame, upstream.status_code, upstream.text) for frame in frames]
+    return (unpackb(upstream.content) if binary else upstream.json())["results"]
+
+def batch_error(frame: Dict, status_code: int, error: str) -> Dict:
+    return {
+        "studentId": str(frame.get("studentId", "")),
+        "frameId": str(frame.get("frameId", "")),
+        "statusCode": status_code,
+        "attentionLabel": None,
+        "faceDetected": None,
+        "status": "error",
+        "processingTimestamp": {},
+        "cached": False,
+        "nextCaptureMs": None,
+        "error": error,
+    }
+
+async def route_batch(replica_router: ReplicaRouter, request: Request) -> Dict:
+    binary = is_msgpack_request(request)
+    frames = read_payload(request, await request.body()).get("frames")
+    if not isinstance(frames, list) or not all(isinstance(frame, dict) for frame in frames):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch body must contain a 'frames' list"
+        )
+    if len(frames) > config.BATCH_MAX_FRAMES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {config.BATCH_MAX_FRAMES} frames"
+        )
+
+    by_replica: Dict[str, List[int]] = {}
+    try:
+        for index, frame in enumerate(frames):
+            by_replica.setdefault(replica_router.owner(str(frame.get("studentId", ""))), []).append(index)
+    except ReplicaUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+
+    grouped = await asyncio.gather(*(
+        forward_batch_group(replica_router, [frames[i] for i in indices], binary)
+        for indices in by_replica.values()
+    ))
+
+    results: List[Optional[Dict]] = [None] * len(frames)
+    for indices, items in zip(by_replica.values(), grouped):
+        for index, item in zip(indices, items):
+            results[index] = item
+
+    succeeded = sum(1 for item in results if item.get("error") is None)
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
+async def raw_frame_student_id(request: Request) -> str:
+    student_id = request.query_params.get("studentId") or request.headers.get("x-student-id")
+    if student_id:
+        return student_id
+    content_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    if content_type == "multipart/form-data":
+        form = await request.form()
+        student_id = form.get("studentId")
+        if isinstance(student_id, str):
+            return student_id
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="studentId is required as a query parameter, X-Student-Id header or form field"
+    )
+
+def merge_class_summaries(class_id: str, summaries: List[Dict]) -> Dict:
+    counted = ("students", "attentiveStudents", "frames", "noFace", "eyesClosed")
+    merged = {"classId": class_id, **{key: sum(summary[key] for summary in summaries) for key in counted}}
+    merged["durationSeconds"] = max(summary["durationSeconds"] for summary in summaries)
+    merged["idleSeconds"] = min(summary["idleSeconds"] for summary in summaries)
+    attentive = sum((summary["attentiveRatio"] or 0.0) * summary["frames"] for summary in summaries)
+    merged["attentiveRatio"] = attentive / merged["frames"] if merged["frames"] else None
+    windows = []
+    for parts in zip(*(summary["windows"] for summary in summaries)):
+        window = {key: sum(part[key] for part in parts) for key in ("frames", "attentive", "noFace", "eyesClosed")}
+        window["seconds"] = parts[0]["seconds"]
+        window["attentiveRatio"] = window["attentive"] / window["frames"] if window["frames"] else None
+        windows.append(window)
+    merged["windows"] = windows
+    return merged
+
+async def route_class_summary(replica_router: ReplicaRouter, class_id: str) -> Dict:
+    summaries = []
+    responses = await replica_router.broadcast("GET", f"/api/attention/summary/classes/{class_id}")
+    for response in responses:
+        if response.status_code == status.HTTP_200_OK:
+            summaries.append(response.json())
+    if not summaries:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No attention data for class {class_id}"
+        )
+    return merge_class_summaries(class_id, summaries)
+
+def create_replica_routing_router() -> APIRouter:
+    router = APIRouter()
+
+    @router.post("/api/attention/analyze")
+    async def analyze_frame_endpoint(
+        request: Request,
+        replica_router: ReplicaRouter = Depends(get_replica_router)
+    ) -> Response:
+        body = await request.body()
+        student_id = str(read_payload(request, body).get("studentId", ""))
+        return await forward_request(replica_router, student_id, request, "/api/attention/analyze", body)
+
+    @router.post("/api/attention/analyze-batch", response_model=None)
+    async def analyze_batch_endpoint(
+        request: Request,
+        replica_router: ReplicaRouter = Depends(get_replica_router)
+    ) -> Union[Dict, Response]:
+        return render(request, await route_batch(replica_router, request))
+
+    @router.post("/api/attention/analyze-raw")
+    async def analyze_raw_frame_endpoint(
+        request: Request,
+        replica_router: ReplicaRouter = Depends(get_replica_router)
+    ) -> Response:
+        body = await request.body()
+        student_id = await raw_frame_student_id(request)
+        return await forward_request(replica_router, student_id, request, "/api/attention/analyze-raw", body)
+
+    @router.delete("/api/attention/sessions/{student_id}")
+    async def end_student_session_endpoint(
+        student_id: str,
+        request: Request,
+        replica_router: ReplicaRouter = Depends(get_replica_router)
+    ) -> Response:
+        return await forward_request(replica_router, student_id, request, f"/api/attention/sessions/{student_id}")
+
+    @router.get("/api/attention/summary/students/{student_id}")
+    async def student_summary_endpoint(
+        student_id: str,
+        request: Request,
+        replica_router: ReplicaRouter = Depends(get_replica_router)
+    ) -> Response:
+        return await forward_request(replica_router, student_id, request, f"/api/attention/summary/students/{student_id}")
+
+    @router.get("/api/attention/summary/classes/{class_id}")
+    async def class_summary_endpoint(
+        class_id: str,
+        replica_router: ReplicaRouter = Depends(get_replica_router)
+    ) -> Dict:
+        return await route_class_summary(replica_router, class_id)
+
+    @router.get("/router/owner/{student_id}")
+    async def owner_endpoint(
+        student_id: str,
+        replica_router: ReplicaRouter = Depends(get_replica_router)
+    ) -> Dict:
+        try:
+            return {"studentId": student_id, "replica": replica_router.owner(student_id)}
+        except ReplicaUnavailableError as e:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    @router.get("/router/replicas")
+    async def list_replicas_endpoint(replica_router: ReplicaRouter = Depends(get_replica_router)) -> Dict:
+        return {"members": list(replica_router.members), **replica_router.stats()}
+
+    @router.post("/router/replicas")
+    async def add_replica_endpoint(
+        replica: ReplicaRequest,
+        replica_router: ReplicaRouter = Depends(get_replica_router)
+    ) -> Dict:
+        return {"url": replica.url, "added": await replica_router.add_replica(replica.url)}
+
+    @router.delete("/router/replicas")
+    async def remove_replica_endpoint(
+        url: str = Query(...),
+        replica_router: ReplicaRouter = Depends(get_replica_router)
+    ) -> Dict:
+        return {"url": url, "removed": await replica_router.remove_replica(url)}
+
+    return router
@@ -0,0 +1,157 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Type
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = {"application/msgpack", "application/x-msgpack", "application/vnd.msgpack"}
+
+class FrameMessage:
+    def __init__(
+        self,
+        student_id: str,
+        frame_id: str,
+        timestamp: str,
+        frame_base64: Optional[str] = None,
+        frame_bytes: Optional[bytes] = None,
+        class_id: Optional[str] = None
+    ):
+        self.student_id = student_id
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.frame_base64 = frame_base64
+        self.frame_bytes = frame_bytes
+        self.class_id = class_id
+
+def media_type(value: Optional[str]) -> str:
+    return (value or "").split(";", 1)[0].strip().lower()
+
+def is_msgpack_request(request: Request) -> bool:
+    return media_type(request.headers.get("content-type")) in MSGPACK_MEDIA_TYPES
+
+def accepted_media_types(accept: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for part in accept.split(","):
+        name, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            weights[name.lower()] = max(quality, weights.get(name.lower(), 0.0))
+    return weights
+
+def wants_msgpack(request: Request) -> bool:
+    if msgpack is None:
+        return False
+    weights = accepted_media_types(request.headers.get("accept", ""))
+    binary = max((weights[name] for name in MSGPACK_MEDIA_TYPES if name in weights), default=None)
+    text = weights.get(JSON_MEDIA_TYPE)
+    if binary is None and text is None:
+        return is_msgpack_request(request)
+    return bool(binary) and binary >= (text or 0.0)
+
+def packb(payload: Any) -> bytes:
+    return msgpack.packb(payload, use_bin_type=True)
+
+def unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False)
+
+def msgpack_response(payload: Any, status_code: int = status.HTTP_200_OK) -> Response:
+    return Response(content=packb(payload), status_code=status_code, media_type=MSGPACK_MEDIA_TYPE)
+
+def render(request: Request, payload: Dict) -> Any:
+    if wants_msgpack(request):
+        return msgpack_response(payload)
+    return payload
+
+def decode_msgpack(body: bytes) -> Dict:
+    if msgpack is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="MessagePack support is not installed on this server"
+        )
+    try:
+        payload = unpackb(body)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be valid MessagePack"
+        )
+    if not isinstance(payload, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be a MessagePack map"
+        )
+    return payload
+
+def parse_json_model(body: bytes, model: Type[BaseModel]) -> BaseModel:
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="There was an error parsing the body"
+        )
+    try:
+        return model.model_validate_json(text)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)
+        ])
+
+def frame_from_message(message: Any) -> FrameMessage:
+    if not isinstance(message, dict):
+        raise ValueError("Frame must be a map")
+    student_id = message.get("studentId")
+    frame_id = message.get("frameId")
+    if isinstance(frame_id, int) and not isinstance(frame_id, bool):
+        frame_id = str(frame_id)
+    if not isinstance(student_id, str) or not isinstance(frame_id, str):
+        raise ValueError("studentId and frameId must be strings")
+    timestamp = message.get("timestamp") or datetime.now(timezone.utc).isoformat()
+    class_id = message.get("classId")
+    if not isinstance(timestamp, str) or not (class_id is None or isinstance(class_id, str)):
+        raise ValueError("timestamp and classId must be strings")
+    frame_bytes = message.get("frame")
+    frame_base64 = message.get("frameBase64")
+    if isinstance(frame_bytes, (bytes, bytearray)):
+        return FrameMessage(student_id, frame_id, timestamp, frame_bytes=bytes(frame_bytes), class_id=class_id)
+    if isinstance(frame_base64, str):
+        return FrameMessage(student_id, frame_id, timestamp, frame_base64=frame_base64, class_id=class_id)
+    raise ValueError("Frame must include 'frame' bytes or a 'frameBase64' string")
+
+def request_body_schema(model: Type[BaseModel], binary_schema: Dict) -> Dict:
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                JSON_MEDIA_TYPE: {"schema": model.model_json_schema()},
+                MSGPACK_MEDIA_TYPE: {"schema": binary_schema},
+            },
+        }
+    }
+
+MSGPACK_FRAME_SCHEMA = {
+    "type": "object",
+    "required": ["studentId", "frameId", "frame"],
+    "properties": {
+        "studentId": {"type": "string"},
+        "frameId": {"type": "string"},
+        "frame": {"type": "string", "format": "binary", "description": "Encoded image bytes"},
+        "timestamp": {"type": "string"},
+        "classId": {"type": "string"},
+    },
+}
@@ -1,28 +1,28 @@
+import asyncio
 import logging
-import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from core.initialization import init_app, shutdown_app
-from endpoints.attention import create_attention_router
+from core.config import PORT
+from core.metrics import registry
+from core.initialization import StartupStatus, get_startup_status, shutdown_app, start_app
+from endpoints.admin import create_admin_router
+from endpoints.attention import admission_stats, create_attention_router
+from endpoints.attention_stream import create_attention_stream_router
+from endpoints.classroom import create_classroom_router
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-load_dotenv()
-PORT = int(os.getenv("PORT", 8000))
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    app.state.startup = StartupStatus()
+    startup = asyncio.create_task(start_app(app))
     try:
-        init_app(app)
-        logger.info("Services initialized and attached to app.state")
         yield
-    except Exception as e:
-        logger.exception("Startup failed: %s", e)
-        raise
     finally:
+        await startup
         await shutdown_app(app)
         logger.info("Shutdown complete")
 
@@ -35,11 +35,37 @@ def create_application() -> FastAPI:
     )
 
     app.include_router(create_attention_router(), prefix="/api/attention", tags=["attention"])
+    app.include_router(create_attention_stream_router(), prefix="/api/attention", tags=["attention"])
+    app.include_router(create_classroom_router(), prefix="/api/attention/classrooms", tags=["attention"])
+    app.include_router(create_admin_router(), prefix="/admin", tags=["admin"])
 
     @app.get("/health")
     def health(request: Request):
+        status = get_startup_status(request.app)
         svc = getattr(request.app.state, "attention_service", None)
-        return {"ready": svc is not None}
+        if svc is None or not status.ready:
+            return {"ready": False, "startup": status.to_dict()}
+        return {"ready": True, **svc.health(), "admission": admission_stats(), "startup": status.to_dict()}
+
+    @app.get("/health/live")
+    def liveness(request: Request):
+        status = get_startup_status(request.app)
+        return JSONResponse(
+            {"alive": not status.failed, "phase": status.phase},
+            status_code=503 if status.failed else 200
+        )
+
+    @app.get("/health/ready")
+    def readiness(request: Request):
+        status = get_startup_status(request.app)
+        return JSONResponse(
+            {"ready": status.ready, "phase": status.phase},
+            status_code=200 if status.ready else 503
+        )
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
     return app
 
@@ -1,6 +1,95 @@
-from typing import Dict, Literal, Optional, Tuple
+from typing import Dict, Literal, Optional, Sequence, Tuple
 import math
 
+import numpy as np
+
+IRIS_FEATURE_KEYS = (
+    'left_iris_x_normalized',
+    'left_iris_y_normalized',
+    'right_iris_x_normalized',
+    'right_iris_y_normalized',
+)
+ATTENTION_LABELS = np.array(["inattentive", "attentive"])
+
+def _optional_floats(values: Sequence[Optional[float]]) -> np.ndarray:
+    return np.array(values, dtype=np.float64).reshape(-1)
+
+class FeatureBatch:
+    def __init__(
+        self,
+        left_iris_x: np.ndarray,
+        left_iris_y: np.ndarray,
+        right_iris_x: np.ndarray,
+        right_iris_y: np.ndarray,
+        eyes_open: Optional[np.ndarray] = None,
+        face_detected: Optional[np.ndarray] = None
+    ):
+        self.left_iris_x = np.asarray(left_iris_x, dtype=np.float64)
+        self.left_iris_y = np.asarray(left_iris_y, dtype=np.float64)
+        self.right_iris_x = np.asarray(right_iris_x, dtype=np.float64)
+        self.right_iris_y = np.asarray(right_iris_y, dtype=np.float64)
+        size = len(self.left_iris_x)
+        self.eyes_open = np.ones(size, dtype=bool) if eyes_open is None else np.asarray(eyes_open, dtype=bool)
+        self.face_detected = np.ones(size, dtype=bool) if face_detected is None else np.asarray(face_detected, dtype=bool)
+        if any(len(column) != size for column in (
+            self.left_iris_y, self.right_iris_x, self.right_iris_y, self.eyes_open, self.face_detected
+        )):
+            raise ValueError("All feature columns must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.left_iris_x)
+
+    @classmethod
+    def from_features(
+        cls,
+        features: Sequence[Optional[Dict]],
+        face_detected: Optional[Sequence[bool]] = None
+    ) -> "FeatureBatch":
+        features = [feature or {} for feature in features]
+        detected = [bool(feature) for feature in features]
+        if face_detected is not None:
+            detected = [bool(flag) and has_features for flag, has_features in zip(face_detected, detected)]
+        columns = np.array(
+            [[feature.get(key) for key in IRIS_FEATURE_KEYS] for feature in features],
+            dtype=np.float64
+        ).reshape(-1, len(IRIS_FEATURE_KEYS))
+        return cls(
+            *columns.T,
+            eyes_open=np.array([feature.get('eyes_open') is not False for feature in features], dtype=bool),
+            face_detected=np.array(detected, dtype=bool)
+        )
+
+class CalibrationTable:
+    def __init__(
+        self,
+        left_deviation: np.ndarray,
+        right_deviation: np.ndarray,
+        calibrated: Optional[np.ndarray] = None
+    ):
+        self.left_deviation = np.asarray(left_deviation, dtype=np.float64)
+        self.right_deviation = np.asarray(right_deviation, dtype=np.float64)
+        if calibrated is None:
+            calibrated = ~(np.isnan(self.left_deviation) & np.isnan(self.right_deviation))
+        self.calibrated = np.asarray(calibrated, dtype=bool)
+        if not len(self.left_deviation) == len(self.right_deviation) == len(self.calibrated):
+            raise ValueError("All calibration columns must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.calibrated)
+
+    @classmethod
+    def from_calibrations(
+        cls,
+        calibrations: Sequence[Optional[Tuple[Optional[float], Optional[float]]]]
+    ) -> "CalibrationTable":
+        calibrated = [bool(calibration) for calibration in calibrations]
+        pairs = [calibration if calibration else (None, None) for calibration in calibrations]
+        return cls(
+            _optional_floats([left for left, _ in pairs]),
+            _optional_floats([right for _, right in pairs]),
+            np.array(calibrated, dtype=bool)
+        )
+
 class AttentionClassifier:
     MAX_GAZE_DEVIATION = 0.4
     CALIBRATION_TOLERANCE = 0.25
@@ -20,6 +109,46 @@ class AttentionClassifier:
             return self._classify_with_calibration(face_features, calibration_data)
         return "attentive" if self._is_looking_at_screen(face_features) else "inattentive"
 
+    def classify_batch(
+        self,
+        features: FeatureBatch,
+        calibration: Optional[CalibrationTable] = None
+    ) -> np.ndarray:
+        if calibration is not None and len(calibration) != len(features):
+            raise ValueError("Calibration table and feature batch must have the same length")
+        left_known = ~(np.isnan(features.left_iris_x) | np.isnan(features.left_iris_y))
+        right_known = ~(np.isnan(features.right_iris_x) | np.isnan(features.right_iris_y))
+
+        left_centered = np.maximum(np.abs(features.left_iris_x), np.abs(features.left_iris_y)) <= self.MAX_GAZE_DEVIATION
+        right_centered = np.maximum(np.abs(features.right_iris_x), np.abs(features.right_iris_y)) <= self.MAX_GAZE_DEVIATION
+        attentive = self._combine_eyes(left_centered, left_known, right_centered, right_known)
+
+        if calibration is not None and calibration.calibrated.any():
+            left_deviation = np.sqrt(features.left_iris_x * features.left_iris_x + features.left_iris_y * features.left_iris_y)
+            right_deviation = np.sqrt(features.right_iris_x * features.right_iris_x + features.right_iris_y * features.right_iris_y)
+            left_similar = np.abs(left_deviation - calibration.left_deviation) <= self.CALIBRATION_TOLERANCE
+            right_similar = np.abs(right_deviation - calibration.right_deviation) <= self.CALIBRATION_TOLERANCE
+            calibrated_attentive = self._combine_eyes(
+                left_similar, left_known & ~np.isnan(calibration.left_deviation),
+                right_similar, right_known & ~np.isnan(calibration.right_deviation)
+            )
+            attentive = np.where(calibration.calibrated, calibrated_attentive, attentive)
+
+        return attentive & features.face_detected & features.eyes_open
+
+    @staticmethod
+    def _combine_eyes(
+        left: np.ndarray,
+        left_known: np.ndarray,
+        right: np.ndarray,
+        right_known: np.ndarray
+    ) -> np.ndarray:
+        return (left | ~left_known) & (right | ~right_known) & (left_known | right_known)
+
+    @staticmethod
+    def labels(attentive: np.ndarray) -> np.ndarray:
+        return ATTENTION_LABELS[np.asarray(attentive, dtype=np.intp)]
+
     def _classify_with_calibration(
         self,
         features: Dict,
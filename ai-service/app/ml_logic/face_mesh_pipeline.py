@@ -1,41 +1,53 @@
-import mediapipe as mp
 import numpy as np
-import cv2
 import threading
-from typing import Optional, Tuple, Dict
+import time
+from typing import Callable, Optional, Tuple, Dict, List, Sequence
 
+from ml_logic.landmark_backends import create_landmark_backend
 from utils.face_metrics import extract_face_features, EyeMetrics
+from utils.frame_buffers import FrameBufferPool
 
 class FaceMeshError(Exception):
     pass
 
+class FaceMeshInferenceError(FaceMeshError):
+    pass
+
 class FaceMeshPipeline:
     MIN_FRAME_DIMENSION = 100
 
-    def __init__(self, static_image_mode: bool = False):
+    def __init__(
+        self,
+        static_image_mode: bool = False,
+        backend: str = "mediapipe",
+        model_dir: Optional[str] = None,
+        num_threads: int = 1,
+        max_batch: int = 16,
+        max_buffers: int = 16,
+        max_faces: int = 1,
+        detection_range: str = "short"
+    ):
         self._lock = threading.RLock()
         self._is_closed = False
-        self._eye_metrics = EyeMetrics()
+        self.buffers = FrameBufferPool(max_buffers)
         try:
-            self.face_mesh = mp.solutions.face_mesh.FaceMesh(
-                static_image_mode=static_image_mode,
-                max_num_faces=1,
-                refine_landmarks=True,
-                min_detection_confidence=0.5,
-                min_tracking_confidence=0.5
+            self.backend = create_landmark_backend(
+                backend, static_image_mode, model_dir, num_threads, max_batch, self.buffers,
+                max_faces, detection_range
             )
         except Exception as e:
-            raise FaceMeshError(f"Failed to initialize MediaPipe FaceMesh: {e}")
+            raise FaceMeshError(f"Failed to initialize {backend} landmark backend: {e}")
 
     def close(self) -> None:
         with self._lock:
             if not self._is_closed:
                 try:
-                    if hasattr(self, 'face_mesh'):
-                        self.face_mesh.close()
+                    if hasattr(self, 'backend'):
+                        self.backend.close()
                 except Exception:
                     pass
                 finally:
+                    self.buffers.clear()
                     self._is_closed = True
 
     def __enter__(self):
@@ -52,30 +64,127 @@ class FaceMeshPipeline:
             raise FaceMeshError(f"Frame too small: {w}x{h}")
         return h, w
 
-    def process(self, frame_bgr: np.ndarray) -> Dict:
+    def process(self, frame_bgr: np.ndarray, eye_metrics: Optional[EyeMetrics] = None) -> Dict:
+        import cv2
+
+        with self._lock:
+            if self._is_closed:
+                raise FaceMeshError("Pipeline closed")
+            h, w = self._validate_frame(frame_bgr)
+            started = time.perf_counter()
+            rgb_frame = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=self.buffers.get("rgb", frame_bgr.shape))
+            converted = time.perf_counter()
+            try:
+                points = self.backend.landmarks(rgb_frame)
+            except Exception as e:
+                raise FaceMeshInferenceError(f"Landmark inference failed: {e}")
+            inferred = time.perf_counter()
+            timings = {
+                'color_conversion': converted - started,
+                'inference': inferred - converted,
+            }
+            return self._build_result(points, w, h, eye_metrics, timings)
+
+    def process_faces(
+        self,
+        frame_bgr: np.ndarray,
+        assign: Callable[[List[Tuple[float, float, float, float]]], Sequence[Optional[EyeMetrics]]]
+    ) -> Tuple[List[Dict], Dict[str, float]]:
+        import cv2
+
         with self._lock:
             if self._is_closed:
                 raise FaceMeshError("Pipeline closed")
             h, w = self._validate_frame(frame_bgr)
-            rgb_frame = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+            started = time.perf_counter()
+            rgb_frame = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=self.buffers.get("rgb", frame_bgr.shape))
+            converted = time.perf_counter()
             try:
-                res = self.face_mesh.process(rgb_frame)
+                faces = self.backend.landmarks_all(rgb_frame)
             except Exception as e:
-                raise FaceMeshError(f"MediaPipe processing failed: {e}")
-            if not res.multi_face_landmarks:
-                return {
-                    'face_detected': False,
-                    'face_features': {},
-                }
-            landmarks = res.multi_face_landmarks[0].landmark
+                raise FaceMeshInferenceError(f"Landmark inference failed: {e}")
+            inferred = time.perf_counter()
+            metrics_list = assign([self._landmark_bbox(points) for points in faces])
+            results = [
+                self._build_result(points, w, h, metrics, {})
+                for points, metrics in zip(faces, metrics_list)
+            ]
+            return results, {
+                'color_conversion': converted - started,
+                'inference': inferred - converted,
+            }
+
+    def process_batch(
+        self,
+        frames_bgr: Sequence[np.ndarray],
+        eye_metrics: Optional[Sequence[Optional[EyeMetrics]]] = None
+    ) -> List[Dict]:
+        import cv2
+
+        with self._lock:
+            if self._is_closed:
+                raise FaceMeshError("Pipeline closed")
+            if not frames_bgr:
+                return []
+            sizes = [self._validate_frame(frame) for frame in frames_bgr]
+            started = time.perf_counter()
+            scratch = self.buffers.get("rgb_batch", (sum(frame.size for frame in frames_bgr),))
+            rgb_frames = []
+            offset = 0
+            for frame in frames_bgr:
+                dst = scratch[offset:offset + frame.size].reshape(frame.shape)
+                rgb_frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=dst))
+                offset += frame.size
+            converted = time.perf_counter()
             try:
-                face_features = extract_face_features(landmarks, w, h, self._eye_metrics)
-                return {
-                    'face_detected': True,
-                    'face_features': face_features,
-                }
-            except Exception:
-                return {
-                    'face_detected': False,
-                    'face_features': {},
-                }
+                batch_points = self.backend.landmarks_batch(rgb_frames)
+            except Exception as e:
+                raise FaceMeshInferenceError(f"Landmark inference failed: {e}")
+            inferred = time.perf_counter()
+            count = len(frames_bgr)
+            metrics_list = eye_metrics or [None] * count
+            return [
+                self._build_result(points, w, h, metrics, {
+                    'color_conversion': (converted - started) / count,
+                    'inference': (inferred - converted) / count,
+                })
+                for points, (h, w), metrics in zip(batch_points, sizes, metrics_list)
+            ]
+
+    def _build_result(
+        self,
+        points: Optional[np.ndarray],
+        w: int,
+        h: int,
+        eye_metrics: Optional[EyeMetrics],
+        timings: Dict[str, float]
+    ) -> Dict:
+        if points is None:
+            return {
+                'face_detected': False,
+                'face_features': {},
+                'stage_timings': timings,
+            }
+        extract_started = time.perf_counter()
+        try:
+            face_features = extract_face_features(points, w, h, eye_metrics)
+            face_bbox = self._landmark_bbox(points)
+            timings['feature_extraction'] = time.perf_counter() - extract_started
+            return {
+                'face_detected': True,
+                'face_features': face_features,
+                'face_bbox': face_bbox,
+                'stage_timings': timings,
+            }
+        except Exception:
+            return {
+                'face_detected': False,
+                'face_features': {},
+                'stage_timings': timings,
+            }
+
+    @staticmethod
+    def _landmark_bbox(points: np.ndarray) -> Tuple[float, float, float, float]:
+        x0, y0 = np.minimum.reduce(points, axis=0).tolist()
+        x1, y1 = np.maximum.reduce(points, axis=0).tolist()
+        return (max(0.0, x0), max(0.0, y0), min(1.0, x1), min(1.0, y1))
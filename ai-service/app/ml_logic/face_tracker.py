@@ -0,0 +1,126 @@
+import itertools
+from typing import Dict, List, Optional, Sequence
+
+from ml_logic.frame_preprocessor import BBox, bbox_iou
+from utils.face_metrics import EyeMetrics
+
+class FaceTrack:
+    def __init__(self, track_id: int, bbox: BBox, smoothing_window: int = 5):
+        self.track_id = track_id
+        self.bbox = bbox
+        self.eye_metrics = EyeMetrics(smoothing_window=smoothing_window)
+        self.hits = 1
+        self.misses = 0
+        self.seat_id: Optional[str] = None
+        self.student_id: Optional[str] = None
+
+class FaceTracker:
+    def __init__(self, min_iou: float = 0.3, max_misses: int = 15, smoothing_window: int = 5):
+        self.min_iou = min_iou
+        self.max_misses = max_misses
+        self.smoothing_window = smoothing_window
+        self._tracks: Dict[int, FaceTrack] = {}
+        self._ids = itertools.count(1)
+        self.created = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def tracks(self) -> List[FaceTrack]:
+        return list(self._tracks.values())
+
+    def update(self, bboxes: Sequence[BBox]) -> List[FaceTrack]:
+        pairs = sorted(
+            (
+                (bbox_iou(track.bbox, bbox), track.track_id, index)
+                for track in self._tracks.values()
+                for index, bbox in enumerate(bboxes)
+            ),
+            reverse=True
+        )
+        matched: List[Optional[FaceTrack]] = [None] * len(bboxes)
+        used = set()
+        for iou, track_id, index in pairs:
+            if iou < self.min_iou:
+                break
+            if matched[index] is None and track_id not in used:
+                matched[index] = self._tracks[track_id]
+                used.add(track_id)
+
+        for track_id in [track_id for track_id in self._tracks if track_id not in used]:
+            track = self._tracks[track_id]
+            track.misses += 1
+            if track.misses > self.max_misses:
+                del self._tracks[track_id]
+                self.expired += 1
+
+        for index, bbox in enumerate(bboxes):
+            track = matched[index]
+            if track is None:
+                track = FaceTrack(next(self._ids), bbox, self.smoothing_window)
+                self._tracks[track.track_id] = track
+                self.created += 1
+                matched[index] = track
+            else:
+                track.bbox = bbox
+                track.hits += 1
+                track.misses = 0
+        return matched
+
+    def stats(self) -> Dict:
+        return {
+            "tracks": len(self._tracks),
+            "created": self.created,
+            "expired": self.expired,
+        }
+
+class Seat:
+    def __init__(self, seat_id: str, student_id: str, bbox: BBox):
+        x0, y0, x1, y1 = bbox
+        if not (0.0 <= x0 < x1 <= 1.0 and 0.0 <= y0 < y1 <= 1.0):
+            raise ValueError(f"Seat {seat_id} must be a normalized box with x0 < x1 and y0 < y1")
+        self.seat_id = seat_id
+        self.student_id = student_id
+        self.bbox = bbox
+
+    def contains(self, x: float, y: float) -> bool:
+        x0, y0, x1, y1 = self.bbox
+        return x0 <= x <= x1 and y0 <= y <= y1
+
+class SeatMap:
+    def __init__(self, seats: Sequence[Seat] = ()):
+        seat_ids = [seat.seat_id for seat in seats]
+        student_ids = [seat.student_id for seat in seats]
+        if len(set(seat_ids)) != len(seat_ids):
+            raise ValueError("Seat IDs must be unique")
+        if len(set(student_ids)) != len(student_ids):
+            raise ValueError("Each student can only be assigned to one seat")
+        self.seats = list(seats)
+
+    def __len__(self) -> int:
+        return len(self.seats)
+
+    def seat_for(self, bbox: BBox) -> Optional[Seat]:
+        x, y = (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+        candidates = [seat for seat in self.seats if seat.contains(x, y)]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda seat: bbox_iou(seat.bbox, bbox))
+
+    def assign(self, tracks: Sequence[FaceTrack]) -> List[str]:
+        claims: Dict[str, FaceTrack] = {}
+        seats: Dict[str, Seat] = {}
+        for track in tracks:
+            seat = self.seat_for(track.bbox)
+            track.seat_id = track.student_id = None
+            if seat is None:
+                continue
+            holder = claims.get(seat.seat_id)
+            if holder is None or track.hits > holder.hits:
+                claims[seat.seat_id] = track
+                seats[seat.seat_id] = seat
+        for seat_id, track in claims.items():
+            track.seat_id = seat_id
+            track.student_id = seats[seat_id].student_id
+        return [seat.student_id for seat in self.seats if seat.seat_id not in claims]
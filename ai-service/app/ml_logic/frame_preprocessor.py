@@ -0,0 +1,116 @@
+import numpy as np
+from typing import Optional, Tuple
+
+BBox = Tuple[float, float, float, float]
+
+FULL_FRAME: BBox = (0.0, 0.0, 1.0, 1.0)
+
+def bbox_iou(a: BBox, b: BBox) -> float:
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    overlap = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - overlap
+    return overlap / union if union > 0 else 0.0
+
+def bbox_in_frame(crop: BBox, bbox: BBox) -> BBox:
+    cx0, cy0, cx1, cy1 = crop
+    cw, ch = cx1 - cx0, cy1 - cy0
+    return (cx0 + bbox[0] * cw, cy0 + bbox[1] * ch, cx0 + bbox[2] * cw, cy0 + bbox[3] * ch)
+
+class RegionOfInterest:
+    def __init__(self):
+        self.frame_size: Optional[Tuple[int, int]] = None
+        self.crop: Optional[BBox] = None
+        self.face_bbox: Optional[BBox] = None
+
+    def reset(self) -> None:
+        self.crop = None
+        self.face_bbox = None
+
+class FramePreprocessor:
+    REDUCED_DECODE_FLAGS = (
+        (8, "IMREAD_REDUCED_COLOR_8"),
+        (4, "IMREAD_REDUCED_COLOR_4"),
+        (2, "IMREAD_REDUCED_COLOR_2"),
+    )
+
+    def __init__(
+        self,
+        max_dimension: int = 640,
+        roi_margin: float = 0.6,
+        roi_enabled: bool = True,
+        min_dimension: int = 100
+    ):
+        self.max_dimension = max_dimension
+        self.roi_margin = roi_margin
+        self.roi_enabled = roi_enabled
+        self.min_dimension = min_dimension
+
+    def decode_mode(self, roi: Optional[RegionOfInterest]) -> Tuple[int, int]:
+        import cv2
+
+        if roi is None or roi.frame_size is None or self.max_dimension <= 0:
+            return cv2.IMREAD_COLOR, 1
+        w, h = roi.frame_size
+        x0, y0, x1, y1 = roi.crop or FULL_FRAME
+        needed = max((x1 - x0) * w, (y1 - y0) * h)
+        for factor, flag in self.REDUCED_DECODE_FLAGS:
+            if needed / factor >= self.max_dimension and min(w, h) / factor >= self.min_dimension:
+                return getattr(cv2, flag), factor
+        return cv2.IMREAD_COLOR, 1
+
+    def prepare(self, frame: np.ndarray, roi: Optional[RegionOfInterest] = None) -> Tuple[np.ndarray, BBox]:
+        h, w = frame.shape[:2]
+        crop = roi.crop if roi is not None and self.roi_enabled and roi.crop else FULL_FRAME
+        px0, py0, px1, py1 = self._to_pixels(crop, w, h)
+        image = frame[py0:py1, px0:px1]
+
+        longest = max(image.shape[:2])
+        if self.max_dimension > 0 and longest > self.max_dimension:
+            scale = self.max_dimension / longest
+            size = (max(1, round(image.shape[1] * scale)), max(1, round(image.shape[0] * scale)))
+            import cv2
+
+            image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        return image, (px0 / w, py0 / h, px1 / w, py1 / h)
+
+    def _to_pixels(self, crop: BBox, w: int, h: int) -> Tuple[int, int, int, int]:
+        x0, y0, x1, y1 = crop
+        px0, py0 = int(x0 * w), int(y0 * h)
+        px1, py1 = int(round(x1 * w)), int(round(y1 * h))
+        px0, px1 = self._ensure_span(px0, px1, w)
+        py0, py1 = self._ensure_span(py0, py1, h)
+        return px0, py0, px1, py1
+
+    def _ensure_span(self, start: int, end: int, limit: int) -> Tuple[int, int]:
+        span = min(self.min_dimension, limit)
+        if end - start >= span:
+            return max(0, start), min(limit, end)
+        center = (start + end) // 2
+        start = min(max(0, center - span // 2), limit - span)
+        return start, start + span
+
+    def update(self, roi: RegionOfInterest, frame_size: Tuple[int, int], crop: BBox, face_bbox: Optional[BBox]) -> None:
+        roi.frame_size = frame_size
+        if not self.roi_enabled or face_bbox is None:
+            roi.reset()
+            return
+        face = bbox_in_frame(crop, face_bbox)
+        roi.face_bbox = face
+        if roi.crop is None or not self._contains(roi.crop, self._expand(face, self.roi_margin / 2)):
+            roi.crop = self._expand(face, self.roi_margin)
+
+    @staticmethod
+    def _expand(bbox: BBox, margin: float) -> BBox:
+        x0, y0, x1, y1 = bbox
+        dx, dy = (x1 - x0) * margin, (y1 - y0) * margin
+        return (max(0.0, x0 - dx), max(0.0, y0 - dy), min(1.0, x1 + dx), min(1.0, y1 + dy))
+
+    @staticmethod
+    def _contains(outer: BBox, inner: BBox) -> bool:
+        return (
+            outer[0] <= inner[0] and outer[1] <= inner[1]
+            and outer[2] >= inner[2] and outer[3] >= inner[3]
+        )
@@ -0,0 +1,401 @@
+import functools
+import importlib.util
+import math
+import os
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ml_logic.frame_preprocessor import bbox_iou
+from ml_logic.landmark_constants import NUM_FACE_LANDMARKS
+from utils.frame_buffers import FrameBufferPool
+
+class LandmarkBackendError(Exception):
+    pass
+
+class LandmarkBackend:
+    name = "base"
+    max_faces = 1
+
+    def landmarks(self, rgb_frame: np.ndarray) -> Optional[np.ndarray]:
+        return self.landmarks_batch([rgb_frame])[0]
+
+    def landmarks_all(self, rgb_frame: np.ndarray) -> List[np.ndarray]:
+        points = self.landmarks(rgb_frame)
+        return [] if points is None else [points]
+
+    def landmarks_batch(self, rgb_frames: Sequence[np.ndarray]) -> List[Optional[np.ndarray]]:
+        return [self.landmarks(frame) for frame in rgb_frames]
+
+    def close(self) -> None:
+        pass
+
+class MediaPipeLandmarkBackend(LandmarkBackend):
+    name = "mediapipe"
+
+    def __init__(self, static_image_mode: bool = False, max_faces: int = 1):
+        import mediapipe as mp
+        from utils.gaze import landmarks_to_array
+
+        self._to_array = landmarks_to_array
+        self.max_faces = max(1, max_faces)
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=static_image_mode,
+            max_num_faces=self.max_faces,
+            refine_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    def landmarks(self, rgb_frame: np.ndarray) -> Optional[np.ndarray]:
+        res = self.face_mesh.process(rgb_frame)
+        if not res.multi_face_landmarks:
+            return None
+        return self._to_array(res.multi_face_landmarks[0])
+
+    def landmarks_all(self, rgb_frame: np.ndarray) -> List[np.ndarray]:
+        res = self.face_mesh.process(rgb_frame)
+        return [self._to_array(face) for face in res.multi_face_landmarks or []]
+
+    def close(self) -> None:
+        self.face_mesh.close()
+
+def _load_interpreter_class():
+    for module in ("ai_edge_litert.interpreter", "tflite_runtime.interpreter", "tensorflow.lite"):
+        try:
+            return importlib.import_module(module).Interpreter
+        except ImportError:
+            continue
+    raise LandmarkBackendError(
+        "The tflite landmark backend needs a TFLite interpreter (pip install ai-edge-litert)"
+    )
+
+def default_model_dir() -> str:
+    spec = importlib.util.find_spec("mediapipe")
+    if spec is None or not spec.submodule_search_locations:
+        raise LandmarkBackendError("LANDMARK_MODEL_DIR is not set and mediapipe is not installed")
+    return os.path.join(list(spec.submodule_search_locations)[0], "modules")
+
+AnchorLayers = Tuple[Tuple[int, int], ...]
+
+class FaceDetectorSpec:
+    def __init__(
+        self,
+        filename: str,
+        size: int,
+        anchor_layers: AnchorLayers,
+        min_score: float,
+        regressors: str,
+        classificators: str
+    ):
+        self.filename = filename
+        self.size = size
+        self.anchor_layers = anchor_layers
+        self.min_score = min_score
+        self.regressors = regressors
+        self.classificators = classificators
+
+FACE_DETECTORS = {
+    "short": FaceDetectorSpec("face_detection_short_range.tflite", 128, ((8, 2), (16, 6)), 0.5, "regressors", "classificators"),
+    "full": FaceDetectorSpec("face_detection_full_range_sparse.tflite", 192, ((4, 1),), 0.5, "Identity", "Identity_1"),
+}
+
+def _ssd_anchors(input_size: int, anchor_layers: AnchorLayers) -> np.ndarray:
+    anchors = []
+    for stride, per_cell in anchor_layers:
+        size = input_size // stride
+        ys, xs = np.mgrid[0:size, 0:size]
+        centers = np.stack([(xs + 0.5) / size, (ys + 0.5) / size], axis=-1).reshape(-1, 1, 2)
+        anchors.append(np.repeat(centers, per_cell, axis=1).reshape(-1, 2))
+    return np.concatenate(anchors).astype(np.float32)
+
+def _sigmoid(logits: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(logits, -100.0, 100.0)))
+
+def _split_detections(input_size: int, anchor_layers: AnchorLayers, output: np.ndarray, count: int) -> np.ndarray:
+    rows = output.reshape(-1, output.shape[-1])
+    layers = []
+    start = 0
+    for stride, per_cell in anchor_layers:
+        cells = (input_size // stride) ** 2 * per_cell
+        layers.append(rows[start:start + count * cells].reshape(count, cells, -1))
+        start += count * cells
+    return np.concatenate(layers, axis=1)
+
+class _Model:
+    def __init__(
+        self,
+        interpreter_class,
+        path: str,
+        num_threads: int,
+        max_batch: int,
+        split: Optional[Callable[[np.ndarray, int], np.ndarray]] = None
+    ):
+        self.path = path
+        self.num_threads = num_threads
+        self.max_batch = max(1, max_batch)
+        self._interpreter_class = interpreter_class
+        self._split = split or (lambda output, count: output.reshape(count, -1))
+        self._interpreters: Dict[int, Tuple[object, int, Dict[str, int]]] = {}
+        self._interpreter(1)
+
+    def _interpreter(self, size: int) -> Tuple[object, int, Dict[str, int]]:
+        entry = self._interpreters.get(size)
+        if entry is None:
+            interpreter = self._interpreter_class(model_path=self.path, num_threads=self.num_threads)
+            detail = interpreter.get_input_details()[0]
+            if size != 1:
+                interpreter.resize_tensor_input(detail["index"], [size] + list(detail["shape"][1:]))
+            interpreter.allocate_tensors()
+            outputs = {output["name"]: output["index"] for output in interpreter.get_output_details()}
+            entry = self._interpreters[size] = (interpreter, detail["index"], outputs)
+        return entry
+
+    def run(self, batch: np.ndarray) -> Dict[str, np.ndarray]:
+        parts: Dict[str, List[np.ndarray]] = {}
+        start = 0
+        while start < len(batch):
+            size = min(self.max_batch, 1 << ((len(batch) - start).bit_length() - 1))
+            interpreter, input_index, outputs = self._interpreter(size)
+            interpreter.set_tensor(input_index, batch[start:start + size])
+            interpreter.invoke()
+            for name, index in outputs.items():
+                parts.setdefault(name, []).append(self._split(interpreter.get_tensor(index), size))
+            start += size
+        return {name: chunks[0] if len(chunks) == 1 else np.concatenate(chunks) for name, chunks in parts.items()}
+
+class _Roi:
+    def __init__(self, center: np.ndarray, size: float, angle: float):
+        self.center = center
+        self.size = size
+        self.angle = angle
+
+    def crop_matrix(self, resolution: int) -> np.ndarray:
+        cos, sin = math.cos(self.angle), math.sin(self.angle)
+        scale = self.size / resolution
+        to_image = np.array([
+            [cos * scale, -sin * scale, 0.0],
+            [sin * scale, cos * scale, 0.0],
+        ])
+        offset = to_image[:, :2] @ np.array([resolution / 2.0, resolution / 2.0])
+        to_image[:, 2] = self.center - offset
+        return to_image
+
+    def project(self, points: np.ndarray, resolution: int) -> np.ndarray:
+        to_image = self.crop_matrix(resolution)
+        return points @ to_image[:, :2].T + to_image[:, 2]
+
+def _roi_from_points(start: np.ndarray, end: np.ndarray, center: np.ndarray, size: float, scale: float) -> _Roi:
+    angle = -math.atan2(-(end[1] - start[1]), end[0] - start[0])
+    return _Roi(center, size * scale, angle)
+
+class TFLiteLandmarkBackend(LandmarkBackend):
+    name = "tflite"
+    LANDMARK_SIZE = 192
+    IRIS_SIZE = 64
+    MIN_PRESENCE_SCORE = 0.5
+    MAX_DETECTION_OVERLAP = 0.3
+    FACE_ROI_SCALE = 1.5
+    IRIS_ROI_SCALE = 2.3
+    EYE_CORNERS = ((33, 133), (362, 263))
+    EYE_CONTOURS = (
+        (33, 7, 163, 144, 145, 153, 154, 155, 133, 246, 161, 160, 159, 158, 157, 173),
+        (263, 249, 390, 373, 374, 380, 381, 382, 362, 466, 388, 387, 386, 385, 384, 398),
+    )
+
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        num_threads: int = 1,
+        max_batch: int = 16,
+        buffers: Optional[FrameBufferPool] = None,
+        max_faces: int = 1,
+        detection_range: str = "short"
+    ):
+        if detection_range not in FACE_DETECTORS:
+            raise LandmarkBackendError(f"Unknown face detection range: {detection_range}")
+        self.buffers = buffers or FrameBufferPool()
+        self.max_faces = max(1, max_faces)
+        self.detection = FACE_DETECTORS[detection_range]
+        interpreter_class = _load_interpreter_class()
+        model_dir = model_dir or default_model_dir()
+
+        def model(*parts: str, split=None) -> _Model:
+            return _Model(interpreter_class, os.path.join(model_dir, *parts), num_threads, max_batch, split)
+
+        try:
+            self.detector = model(
+                "face_detection", self.detection.filename,
+                split=functools.partial(_split_detections, self.detection.size, self.detection.anchor_layers)
+            )
+            self.mesh = model("face_landmark", "face_landmark.tflite")
+            self.iris = model("iris_landmark", "iris_landmark.tflite")
+        except (ValueError, RuntimeError) as e:
+            raise LandmarkBackendError(f"Failed to load landmark models from {model_dir}: {e}")
+        self.anchors = _ssd_anchors(self.detection.size, self.detection.anchor_layers)
+
+    def landmarks_batch(self, rgb_frames: Sequence[np.ndarray]) -> List[Optional[np.ndarray]]:
+        if not rgb_frames:
+            return []
+        detections = self._detect(rgb_frames, 1)
+        results: List[Optional[np.ndarray]] = [None] * len(rgb_frames)
+        for i, points in self._refine(rgb_frames, [(i, rois[0]) for i, rois in enumerate(detections) if rois]):
+            results[i] = points
+        return results
+
+    def landmarks_all(self, rgb_frame: np.ndarray) -> List[np.ndarray]:
+        rois = self._detect([rgb_frame], self.max_faces)[0]
+        return [points for _, points in self._refine([rgb_frame], [(0, roi) for roi in rois])]
+
+    def _refine(self, rgb_frames: Sequence[np.ndarray], found: List[Tuple[int, _Roi]]) -> List[Tuple[int, np.ndarray]]:
+        if not found:
+            return []
+
+        crops = self.buffers.get("mesh_input", (len(found), self.LANDMARK_SIZE, self.LANDMARK_SIZE, 3), np.float32)
+        for row, (i, roi) in enumerate(found):
+            self._crop(rgb_frames[i], roi, self.LANDMARK_SIZE, 0.0, 1.0, crops[row])
+        outputs = self.mesh.run(crops)
+        mesh = outputs["conv2d_21"].reshape(len(found), -1, 3)[:, :, :2]
+        presence = _sigmoid(outputs["conv2d_31"].reshape(-1))
+
+        faces: List[Tuple[int, np.ndarray]] = []
+        for row, (i, roi) in enumerate(found):
+            if presence[row] >= self.MIN_PRESENCE_SCORE:
+                faces.append((i, roi.project(mesh[row], self.LANDMARK_SIZE)))
+        if not faces:
+            return []
+
+        eye_rois = []
+        eye_crops = self.buffers.get("iris_input", (len(faces) * 2, self.IRIS_SIZE, self.IRIS_SIZE, 3), np.float32)
+        for i, points in faces:
+            for side, (start, end) in enumerate(self.EYE_CORNERS):
+                roi = _roi_from_points(
+                    points[start], points[end],
+                    (points[start] + points[end]) / 2.0,
+                    float(np.linalg.norm(points[end] - points[start])),
+                    self.IRIS_ROI_SCALE
+                )
+                out = eye_crops[len(eye_rois)]
+                self._crop(rgb_frames[i], roi, self.IRIS_SIZE, 0.0, 1.0, out[:, ::-1] if side else out)
+                eye_rois.append(roi)
+        outputs = self.iris.run(eye_crops)
+        irises = outputs["output_iris"].reshape(len(eye_crops), -1, 3)[:, :, :2].copy()
+        irises[1::2, :, 0] = self.IRIS_SIZE - irises[1::2, :, 0]
+        irises[1::2, [1, 3]] = irises[1::2, [3, 1]]
+        contours = outputs["output_eyes_contours_and_brows"].reshape(len(eye_crops), -1, 3)[:, :len(self.EYE_CONTOURS[0]), :2].copy()
+        contours[1::2, :, 0] = self.IRIS_SIZE - contours[1::2, :, 0]
+
+        results: List[Tuple[int, np.ndarray]] = []
+        for face, (i, points) in enumerate(faces):
+            full = np.empty((NUM_FACE_LANDMARKS, 2), dtype=np.float64)
+            full[:points.shape[0]] = points
+            for side in range(2):
+                index = face * 2 + side
+                full[list(self.EYE_CONTOURS[side])] = eye_rois[index].project(contours[index], self.IRIS_SIZE)
+                offset = points.shape[0] + side * irises.shape[1]
+                full[offset:offset + irises.shape[1]] = eye_rois[index].project(irises[index], self.IRIS_SIZE)
+            h, w = rgb_frames[i].shape[:2]
+            full /= (w, h)
+            results.append((i, full))
+        return results
+
+    def _detect(self, rgb_frames: Sequence[np.ndarray], max_faces: int) -> List[List[_Roi]]:
+        import cv2
+
+        size = self.detection.size
+        batch = self.buffers.get("detection_input", (len(rgb_frames), size, size, 3), np.float32)
+        letterboxes = []
+        for row, frame in enumerate(rgb_frames):
+            h, w = frame.shape[:2]
+            side = max(h, w)
+            scale = size / side
+            width, height = max(1, round(w * scale)), max(1, round(h * scale))
+            resized = cv2.resize(
+                frame, (width, height),
+                dst=self.buffers.get("detection_resize", (height, width, 3)),
+                interpolation=cv2.INTER_AREA
+            )
+            top = (size - height) // 2
+            left = (size - width) // 2
+            batch[row] = -1.0
+            region = batch[row, top:top + height, left:left + width]
+            np.multiply(resized, 2.0 / 255.0, out=region, dtype=np.float32)
+            region -= 1.0
+            letterboxes.append((side, left / scale, top / scale))
+
+        outputs = self.detector.run(batch)
+        regressors = outputs[self.detection.regressors]
+        scores = _sigmoid(outputs[self.detection.classificators][:, :, 0])
+        return [
+            self._select(scores[row], regressors[row], letterbox, max_faces)
+            for row, letterbox in enumerate(letterboxes)
+        ]
+
+    def _select(
+        self,
+        scores: np.ndarray,
+        regressors: np.ndarray,
+        letterbox: Tuple[float, float, float],
+        max_faces: int
+    ) -> List[_Roi]:
+        side, pad_x, pad_y = letterbox
+        size = self.detection.size
+        candidates = [int(np.argmax(scores))] if max_faces == 1 else np.argsort(-scores, kind="stable").tolist()
+        rois: List[_Roi] = []
+        boxes: List[Tuple[float, float, float, float]] = []
+        for index in candidates:
+            if scores[index] < self.detection.min_score or len(rois) >= max_faces:
+                break
+            raw = regressors[index] / size
+            anchor = self.anchors[index]
+            center = (raw[0:2] + anchor) * side - (pad_x, pad_y)
+            extent = float(max(raw[2:4] * side))
+            box = (center[0] - extent / 2, center[1] - extent / 2, center[0] + extent / 2, center[1] + extent / 2)
+            if any(bbox_iou(box, kept) > self.MAX_DETECTION_OVERLAP for kept in boxes):
+                continue
+            keypoints = (raw[4:].reshape(-1, 2) + anchor) * side - (pad_x, pad_y)
+            rois.append(_roi_from_points(keypoints[0], keypoints[1], center, extent, self.FACE_ROI_SCALE))
+            boxes.append(box)
+        return rois
+
+    def _crop(self, frame: np.ndarray, roi: _Roi, resolution: int, low: float, high: float, out: np.ndarray) -> np.ndarray:
+        import cv2
+
+        to_crop = cv2.invertAffineTransform(roi.crop_matrix(resolution))
+        crop = cv2.warpAffine(
+            frame, to_crop, (resolution, resolution),
+            dst=self.buffers.get(("crop", resolution), (resolution, resolution, frame.shape[2])),
+            flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT
+        )
+        np.multiply(crop, (high - low) / 255.0, out=out, dtype=np.float32)
+        if low:
+            out += low
+        return out
+
+    def close(self) -> None:
+        self.detector = self.mesh = self.iris = None
+
+LANDMARK_BACKENDS = ("mediapipe", "tflite")
+
+def create_landmark_backend(
+    name: str,
+    static_image_mode: bool = False,
+    model_dir: Optional[str] = None,
+    num_threads: int = 1,
+    max_batch: int = 16,
+    buffers: Optional[FrameBufferPool] = None,
+    max_faces: int = 1,
+    detection_range: str = "short"
+) -> LandmarkBackend:
+    if name == "mediapipe":
+        return MediaPipeLandmarkBackend(static_image_mode=static_image_mode, max_faces=max_faces)
+    if name == "tflite":
+        return TFLiteLandmarkBackend(
+            model_dir=model_dir,
+            num_threads=num_threads,
+            max_batch=max_batch,
+            buffers=buffers,
+            max_faces=max_faces,
+            detection_range=detection_range
+        )
+    raise LandmarkBackendError(f"Unknown landmark backend: {name}")
@@ -7,4 +7,13 @@ LEFT_EYE_LANDMARKS = [33, 160, 158, 133, 153, 144]
 RIGHT_EYE_LANDMARKS = [362, 385, 387, 263, 373, 380]
 
 LEFT_EYE_CORNERS = [33, 133]
-RIGHT_EYE_CORNERS = [362, 263]
\ No newline at end of file
+RIGHT_EYE_CORNERS = [362, 263]
+
+NUM_FACE_LANDMARKS = 478
+
+EYE_LANDMARK_INDICES = np.array([LEFT_EYE_LANDMARKS, RIGHT_EYE_LANDMARKS], dtype=np.intp)
+IRIS_LANDMARK_INDICES = np.array([LEFT_IRIS, RIGHT_IRIS], dtype=np.intp)
+FEATURE_LANDMARK_INDICES = np.concatenate([EYE_LANDMARK_INDICES.ravel(), IRIS_LANDMARK_INDICES.ravel()])
+
+EAR_SEGMENT_START = np.array([1, 2, 0], dtype=np.intp)
+EAR_SEGMENT_END = np.array([5, 4, 3], dtype=np.intp)
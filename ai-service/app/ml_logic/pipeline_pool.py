@@ -0,0 +1,173 @@
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from ml_logic.face_mesh_pipeline import FaceMeshPipeline, FaceMeshError, FaceMeshInferenceError
+from utils.face_metrics import EyeMetrics
+
+class PipelineUnavailableError(FaceMeshError):
+    pass
+
+class PooledPipeline:
+    def __init__(self, pipeline_id: int, pipeline: FaceMeshPipeline):
+        self.pipeline_id = pipeline_id
+        self.pipeline = pipeline
+        self.processed = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.restarts = 0
+        self.last_error: Optional[str] = None
+        self.busy = False
+
+    def record_success(self) -> None:
+        self.processed += 1
+        self.consecutive_failures = 0
+
+    def record_failure(self, error: Exception) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = str(error)
+
+    def health(self, max_consecutive_failures: int) -> Dict:
+        return {
+            "id": self.pipeline_id,
+            "healthy": self.consecutive_failures < max_consecutive_failures,
+            "busy": self.busy,
+            "processed": self.processed,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+            "buffers": self.pipeline.buffers.stats(),
+        }
+
+class FaceMeshPipelinePool:
+    def __init__(
+        self,
+        size: int,
+        checkout_timeout: float = 2.0,
+        max_consecutive_failures: int = 3,
+        pipeline_factory: Optional[Callable[[], FaceMeshPipeline]] = None
+    ):
+        if size < 1:
+            raise ValueError("Pipeline pool size must be at least 1")
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.max_consecutive_failures = max_consecutive_failures
+        self._factory = pipeline_factory or (lambda: FaceMeshPipeline(static_image_mode=False))
+        self._lock = threading.RLock()
+        self._is_closed = False
+        self._rejected = 0
+        self._slots: List[PooledPipeline] = []
+        self._available: "queue.LifoQueue[PooledPipeline]" = queue.LifoQueue()
+        try:
+            for pipeline_id in range(size):
+                slot = PooledPipeline(pipeline_id, self._factory())
+                self._slots.append(slot)
+                self._available.put(slot)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            if self._is_closed:
+                return
+            self._is_closed = True
+            for slot in self._slots:
+                try:
+                    slot.pipeline.close()
+                except Exception:
+                    pass
+
+    def checkout(self, timeout: Optional[float] = None) -> PooledPipeline:
+        if self._is_closed:
+            raise FaceMeshError("Pipeline pool closed")
+        wait = self.checkout_timeout if timeout is None else timeout
+        try:
+            slot = self._available.get(timeout=wait)
+        except queue.Empty:
+            with self._lock:
+                self._rejected += 1
+            raise PipelineUnavailableError(
+                f"No face mesh pipeline available after {wait:.2f}s"
+            )
+        slot.busy = True
+        return slot
+
+    def checkin(self, slot: PooledPipeline) -> None:
+        slot.busy = False
+        if slot.consecutive_failures >= self.max_consecutive_failures and not self._is_closed:
+            self._restart(slot)
+        self._available.put(slot)
+
+    def _restart(self, slot: PooledPipeline) -> None:
+        try:
+            slot.pipeline.close()
+        except Exception:
+            pass
+        try:
+            slot.pipeline = self._factory()
+            slot.consecutive_failures = 0
+            slot.restarts += 1
+        except Exception as e:
+            slot.record_failure(e)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[PooledPipeline]:
+        slot = self.checkout(timeout)
+        try:
+            yield slot
+        finally:
+            self.checkin(slot)
+
+    def process(self, frame_bgr: np.ndarray, eye_metrics: Optional[EyeMetrics] = None) -> Dict:
+        with self.lease() as slot:
+            try:
+                result = slot.pipeline.process(frame_bgr, eye_metrics)
+            except FaceMeshInferenceError as e:
+                slot.record_failure(e)
+                raise
+            slot.record_success()
+            return result
+
+    def process_batch(
+        self,
+        frames_bgr: List[np.ndarray],
+        eye_metrics: Optional[Sequence[Optional[EyeMetrics]]] = None
+    ) -> List[Dict]:
+        with self.lease() as slot:
+            try:
+                results = slot.pipeline.process_batch(frames_bgr, eye_metrics)
+            except FaceMeshInferenceError as e:
+                slot.record_failure(e)
+                raise
+            slot.record_success()
+            return results
+
+    def warm_up(self, frames: List[np.ndarray]) -> int:
+        slots = [self.checkout() for _ in range(self.size)]
+        try:
+            for slot in slots:
+                for frame in frames:
+                    slot.pipeline.process(frame)
+        finally:
+            for slot in slots:
+                self.checkin(slot)
+        return len(slots)
+
+    def available(self) -> int:
+        return self._available.qsize()
+
+    def health(self) -> Dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "available": self.available(),
+                "rejected": self._rejected,
+                "closed": self._is_closed,
+                "pipelines": [slot.health(self.max_consecutive_failures) for slot in self._slots],
+            }
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+
+from core import config
+from endpoints.replica_routing import create_replica_routing_router
+from services.replica_router import ReplicaRouter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    replica_router = ReplicaRouter(
+        config.ROUTER_REPLICAS,
+        virtual_nodes=config.ROUTER_VIRTUAL_NODES,
+        request_timeout=config.ROUTER_REQUEST_TIMEOUT,
+        health_interval=config.ROUTER_HEALTH_INTERVAL
+    )
+    app.state.replica_router = replica_router
+    health_task = asyncio.create_task(replica_router.run_health_checks())
+    logger.info("Routing across %d replicas", len(replica_router.members))
+    try:
+        yield
+    finally:
+        health_task.cancel()
+        await asyncio.gather(health_task, return_exceptions=True)
+        await replica_router.close()
+        logger.info("Router shutdown complete")
+
+def create_router_application() -> FastAPI:
+    app = FastAPI(
+        title="AI Service Router",
+        description="Routes each student's frames to the ai-service replica that owns them",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    app.include_router(create_replica_routing_router(), tags=["routing"])
+
+    @app.get("/health")
+    def health(request: Request):
+        replica_router = getattr(request.app.state, "replica_router", None)
+        if replica_router is None:
+            return {"ready": False}
+        stats = replica_router.stats()
+        return {"ready": bool(stats["replicas"]), **stats}
+
+    return app
+
+app = create_router_application()
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=config.ROUTER_PORT)
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Set
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+class AdmissionError(Exception):
+    reason = "rejected"
+
+class FrameExpiredError(AdmissionError):
+    reason = "expired"
+
+class FrameSupersededError(AdmissionError):
+    reason = "superseded"
+
+class AdmissionOverflowError(AdmissionError):
+    reason = "overflow"
+
+def parse_frame_timestamp(timestamp: Optional[str]) -> Optional[float]:
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+class _Job:
+    def __init__(
+        self,
+        student_id: str,
+        fn: Callable[..., Any],
+        args: tuple,
+        expires_at: Optional[float],
+        future: asyncio.Future
+    ):
+        self.student_id = student_id
+        self.fn = fn
+        self.args = args
+        self.expires_at = expires_at
+        self.future = future
+        self.submitted = time.perf_counter()
+
+class AdmissionScheduler:
+    def __init__(
+        self,
+        executor: Executor,
+        max_concurrency: int,
+        deadline: float = 2.0,
+        max_pending: int = 256,
+        trust_client_timestamps: bool = False,
+        max_clock_skew: float = 1.0,
+        skew_log_interval: float = 60.0
+    ):
+        self.executor = executor
+        self.max_concurrency = max(1, max_concurrency)
+        self.deadline = deadline
+        self.max_pending = max(1, max_pending)
+        self.trust_client_timestamps = trust_client_timestamps
+        self.max_clock_skew = max(0.0, max_clock_skew)
+        self.skew_log_interval = skew_log_interval
+        self._skewed = 0
+        self._last_skew_log: Optional[float] = None
+        self._pending: "OrderedDict[str, _Job]" = OrderedDict()
+        self._in_flight: Set[str] = set()
+        self._running = 0
+        self._admitted = 0
+        self._completed = 0
+        self._shed: Dict[str, int] = {"expired": 0, "superseded": 0, "overflow": 0}
+
+    def _expires_at(self, timestamp: Optional[str]) -> Optional[float]:
+        if self.deadline <= 0:
+            return None
+        now = time.time()
+        arrival_deadline = now + self.deadline
+        frame_time = parse_frame_timestamp(timestamp) if self.trust_client_timestamps else None
+        if frame_time is None:
+            return arrival_deadline
+        if now - frame_time > self.max_clock_skew:
+            self._record_skew(now - frame_time)
+            frame_time = now - self.max_clock_skew
+        return min(arrival_deadline, frame_time + self.deadline)
+
+    def _record_skew(self, age: float) -> None:
+        self._skewed += 1
+        now = time.monotonic()
+        if self._last_skew_log is None or now - self._last_skew_log >= self.skew_log_interval:
+            self._last_skew_log = now
+            logger.warning(
+                "Frame timestamp is %.2fs behind this host's clock; clamping to %.2fs (%d frames so far)",
+                age, self.max_clock_skew, self._skewed
+            )
+
+    def _shed_job(self, job: _Job, error: AdmissionError) -> None:
+        self._shed[error.reason] += 1
+        metrics.SHED_FRAMES.inc(error.reason)
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    async def submit(self, student_id: str, timestamp: Optional[str], fn: Callable[..., Any], *args) -> Any:
+        loop = asyncio.get_running_loop()
+        expires_at = self._expires_at(timestamp)
+        if expires_at is not None and time.time() > expires_at:
+            self._shed["expired"] += 1
+            metrics.SHED_FRAMES.inc("expired")
+            raise FrameExpiredError(f"Frame is older than the {self.deadline:g}s deadline")
+
+        job = _Job(student_id, fn, args, expires_at, loop.create_future())
+        previous = self._pending.get(student_id)
+        if previous is not None:
+            self._pending[student_id] = job
+            self._shed_job(previous, FrameSupersededError(f"Superseded by a newer frame for student {student_id}"))
+        else:
+            if len(self._pending) >= self.max_pending:
+                _, oldest = self._pending.popitem(last=False)
+                self._shed_job(oldest, AdmissionOverflowError("Admission queue is full"))
+            self._pending[student_id] = job
+        self._admitted += 1
+        self._dispatch(loop)
+
+        try:
+            return await job.future
+        finally:
+            if self._pending.get(student_id) is job:
+                del self._pending[student_id]
+            metrics.EXECUTOR_QUEUE_DEPTH.set(len(self._pending))
+
+    def _next_job(self) -> Optional[_Job]:
+        for student_id, job in self._pending.items():
+            if student_id not in self._in_flight:
+                del self._pending[student_id]
+                return job
+        return None
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        while self._running < self.max_concurrency:
+            job = self._next_job()
+            if job is None:
+                break
+            if job.future.done():
+                continue
+            if job.expires_at is not None and time.time() > job.expires_at:
+                self._shed_job(job, FrameExpiredError(f"Frame expired after waiting past the {self.deadline:g}s deadline"))
+                continue
+            metrics.observe_stages({"executor_queue": time.perf_counter() - job.submitted})
+            self._running += 1
+            self._in_flight.add(job.student_id)
+            task = loop.run_in_executor(self.executor, job.fn, *job.args)
+            task.add_done_callback(lambda done, job=job: self._finish(loop, job, done))
+        metrics.EXECUTOR_QUEUE_DEPTH.set(len(self._pending))
+
+    def _finish(self, loop: asyncio.AbstractEventLoop, job: _Job, done: asyncio.Future) -> None:
+        self._running -= 1
+        self._in_flight.discard(job.student_id)
+        self._completed += 1
+        if not job.future.done():
+            if done.cancelled():
+                job.future.cancel()
+            elif done.exception() is not None:
+                job.future.set_exception(done.exception())
+            else:
+                job.future.set_result(done.result())
+        self._dispatch(loop)
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self._pending),
+            "running": self._running,
+            "max_concurrency": self.max_concurrency,
+            "deadline": self.deadline,
+            "admitted": self._admitted,
+            "completed": self._completed,
+            "shed": dict(self._shed),
+            "clock_skew_clamped": self._skewed,
+        }
@@ -0,0 +1,230 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+FRAMES, ATTENTIVE, NO_FACE, EYES_CLOSED = range(4)
+FIELDS = 4
+
+class RollingWindow:
+    def __init__(self, seconds: float, buckets: int = 60):
+        self.seconds = seconds
+        self.size = max(1, buckets)
+        self.bucket_seconds = seconds / self.size
+        self._counts = [0] * (self.size * FIELDS)
+        self._totals = [0] * FIELDS
+        self._head: Optional[int] = None
+
+    def _advance(self, now: float) -> int:
+        bucket = int(now // self.bucket_seconds)
+        if self._head is None:
+            self._head = bucket
+        elif bucket > self._head:
+            for step in range(1, min(bucket - self._head, self.size) + 1):
+                offset = ((self._head + step) % self.size) * FIELDS
+                for field in range(FIELDS):
+                    self._totals[field] -= self._counts[offset + field]
+                    self._counts[offset + field] = 0
+            self._head = bucket
+        return (self._head % self.size) * FIELDS
+
+    def add(self, now: float, values: Sequence[int]) -> None:
+        offset = self._advance(now)
+        for field, value in enumerate(values):
+            self._counts[offset + field] += value
+            self._totals[field] += value
+
+    def totals(self, now: float) -> List[int]:
+        self._advance(now)
+        return list(self._totals)
+
+class AttentionAggregate:
+    def __init__(self, windows: Sequence[float], buckets: int, now: float):
+        self.windows = [RollingWindow(seconds, buckets) for seconds in windows]
+        self.totals = [0] * FIELDS
+        self.started_at = now
+        self.last_seen = now
+        self.last_label: Optional[str] = None
+        self.streak_frames = 0
+        self.streak_started = now
+        self.longest_streaks = {"attentive": 0, "inattentive": 0}
+
+    def record(self, now: float, label: str, face_detected: bool, eyes_closed: bool) -> None:
+        values = (1, int(label == "attentive"), int(not face_detected), int(eyes_closed))
+        for window in self.windows:
+            window.add(now, values)
+        for field, value in enumerate(values):
+            self.totals[field] += value
+        if label == self.last_label:
+            self.streak_frames += 1
+        else:
+            self.last_label = label
+            self.streak_frames = 1
+            self.streak_started = now
+        self.longest_streaks[label] = max(self.longest_streaks.get(label, 0), self.streak_frames)
+        self.last_seen = now
+
+    def summary(self, now: float, streaks: bool = True) -> Dict:
+        summary = {
+            "frames": self.totals[FRAMES],
+            "attentiveRatio": _ratio(self.totals[ATTENTIVE], self.totals[FRAMES]),
+            "noFace": self.totals[NO_FACE],
+            "eyesClosed": self.totals[EYES_CLOSED],
+            "durationSeconds": now - self.started_at,
+            "idleSeconds": now - self.last_seen,
+            "windows": [_window_summary(window, window.totals(now)) for window in self.windows],
+        }
+        if streaks:
+            summary.update({
+                "streak": {
+                    "label": self.last_label,
+                    "frames": self.streak_frames,
+                    "seconds": now - self.streak_started if self.last_label else 0.0,
+                },
+                "longestAttentiveStreak": self.longest_streaks["attentive"],
+                "longestInattentiveStreak": self.longest_streaks["inattentive"],
+            })
+        return summary
+
+class _StudentEntry:
+    def __init__(self, aggregate: AttentionAggregate, class_id: Optional[str]):
+        self.aggregate = aggregate
+        self.class_id = class_id
+
+class _ClassEntry:
+    def __init__(self, aggregate: AttentionAggregate):
+        self.aggregate = aggregate
+        self.students = 0
+        self.attentive_students = 0
+
+def _ratio(part: int, total: int) -> Optional[float]:
+    return part / total if total else None
+
+def _window_summary(window: RollingWindow, totals: List[int]) -> Dict:
+    return {
+        "seconds": window.seconds,
+        "frames": totals[FRAMES],
+        "attentive": totals[ATTENTIVE],
+        "attentiveRatio": _ratio(totals[ATTENTIVE], totals[FRAMES]),
+        "noFace": totals[NO_FACE],
+        "eyesClosed": totals[EYES_CLOSED],
+    }
+
+class AttentionAggregator:
+    def __init__(
+        self,
+        windows: Sequence[float] = (60.0, 300.0),
+        buckets: int = 60,
+        idle_ttl: float = 3600.0,
+        max_students: int = 10000,
+        sweep_interval: float = 30.0
+    ):
+        self.windows = tuple(sorted(windows))
+        self.buckets = buckets
+        self.idle_ttl = idle_ttl
+        self.max_students = max_students
+        self.sweep_interval = sweep_interval
+        self._students: "OrderedDict[str, _StudentEntry]" = OrderedDict()
+        self._classes: Dict[str, _ClassEntry] = {}
+        self._lock = threading.RLock()
+        self._last_sweep = time.monotonic()
+        self._evicted = 0
+
+    def record(
+        self,
+        student_id: str,
+        class_id: Optional[str],
+        label: str,
+        face_detected: bool,
+        eyes_closed: bool
+    ) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            entry = self._students.get(student_id)
+            if entry is None:
+                while len(self._students) >= self.max_students:
+                    self._evict(next(iter(self._students)))
+                entry = _StudentEntry(AttentionAggregate(self.windows, self.buckets, now), None)
+                self._students[student_id] = entry
+            else:
+                self._students.move_to_end(student_id)
+            if class_id and class_id != entry.class_id:
+                self._leave_class(entry)
+                self._join_class(entry, class_id, now)
+
+            was_attentive = entry.aggregate.last_label == "attentive"
+            entry.aggregate.record(now, label, face_detected, eyes_closed)
+            if entry.class_id is not None:
+                class_entry = self._classes[entry.class_id]
+                class_entry.aggregate.record(now, label, face_detected, eyes_closed)
+                class_entry.attentive_students += int(label == "attentive") - int(was_attentive)
+            return entry.aggregate.streak_frames
+
+    def _join_class(self, entry: _StudentEntry, class_id: str, now: float) -> None:
+        class_entry = self._classes.get(class_id)
+        if class_entry is None:
+            class_entry = self._classes[class_id] = _ClassEntry(AttentionAggregate(self.windows, self.buckets, now))
+        class_entry.students += 1
+        class_entry.attentive_students += int(entry.aggregate.last_label == "attentive")
+        entry.class_id = class_id
+
+    def _leave_class(self, entry: _StudentEntry) -> None:
+        if entry.class_id is None:
+            return
+        class_entry = self._classes[entry.class_id]
+        class_entry.students -= 1
+        class_entry.attentive_students -= int(entry.aggregate.last_label == "attentive")
+        if class_entry.students == 0:
+            del self._classes[entry.class_id]
+        entry.class_id = None
+
+    def _evict(self, student_id: str) -> bool:
+        entry = self._students.pop(student_id, None)
+        if entry is None:
+            return False
+        self._leave_class(entry)
+        self._evicted += 1
+        return True
+
+    def _sweep(self, now: float) -> None:
+        self._last_sweep = now
+        for student_id, entry in list(self._students.items()):
+            if now - entry.aggregate.last_seen <= self.idle_ttl:
+                break
+            self._evict(student_id)
+
+    def end_student(self, student_id: str) -> bool:
+        with self._lock:
+            return self._evict(student_id)
+
+    def student_summary(self, student_id: str) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._students.get(student_id)
+            if entry is None:
+                return None
+            return {"studentId": student_id, "classId": entry.class_id, **entry.aggregate.summary(now)}
+
+    def class_summary(self, class_id: str) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            class_entry = self._classes.get(class_id)
+            if class_entry is None:
+                return None
+            return {
+                "classId": class_id,
+                "students": class_entry.students,
+                "attentiveStudents": class_entry.attentive_students,
+                **class_entry.aggregate.summary(now, streaks=False),
+            }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "students": len(self._students),
+                "classes": len(self._classes),
+                "evicted": self._evicted,
+                "windows": list(self.windows),
+            }
@@ -1,21 +1,40 @@
 import time
 import threading
-from typing import Dict, Optional
-from services.frame_processor import FrameProcessingService
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from core import metrics
+from services.frame_processor import FrameProcessingService, merge_stage_timings
 from services.calibration_storage import CalibrationStorageService
+from services.frame_cache import FrameResultCache
+from services.attention_aggregates import AttentionAggregator
+from services.capture_hints import CaptureIntervalAdvisor
+from services.classroom_sessions import ClassroomSessionManager
+from services.flight_recorder import FrameData, SlowFrameRecorder
 from ml_logic.face_mesh_pipeline import FaceMeshError
-from ml_logic.attention_classifier import AttentionClassifier
+from ml_logic.pipeline_pool import PipelineUnavailableError
+from ml_logic.attention_classifier import AttentionClassifier, CalibrationTable, FeatureBatch
+from ml_logic.face_tracker import SeatMap
+from utils.image_decoder import ImageDecoder
 
 class AttentionAnalysisService:
     def __init__(
         self,
         frame_service=None,
         attention_classifier=None,
-        calibration_storage=None
+        calibration_storage=None,
+        frame_cache: Optional[FrameResultCache] = None,
+        aggregator: Optional[AttentionAggregator] = None,
+        capture_advisor: Optional[CaptureIntervalAdvisor] = None,
+        flight_recorder: Optional[SlowFrameRecorder] = None,
+        classroom_sessions: Optional[ClassroomSessionManager] = None
     ):
         self.frame_service = frame_service or FrameProcessingService()
         self.attention_classifier = attention_classifier or AttentionClassifier()
         self.calibration_storage = calibration_storage or CalibrationStorageService()
+        self.frame_cache = frame_cache
+        self.aggregator = aggregator or AttentionAggregator()
+        self.capture_advisor = capture_advisor or CaptureIntervalAdvisor()
+        self.flight_recorder = flight_recorder
+        self.classroom_sessions = classroom_sessions
         self._lock = threading.RLock()
         self._is_closed = False
 
@@ -28,112 +47,469 @@ class AttentionAnalysisService:
                 self.frame_service.close()
             except Exception:
                 pass
+            try:
+                self.calibration_storage.close()
+            except Exception:
+                pass
+            if self.classroom_sessions is not None:
+                self.classroom_sessions.close()
+
+    def warm_up(self, frames: List[bytes]) -> Dict:
+        if self._is_closed:
+            raise RuntimeError("Service is closed")
+        return self.frame_service.warm_up(frames)
 
     def analyze_frame_from_base64(
         self,
         student_id: str,
         frame_id: str,
         frame_base64: str,
-        frame_timestamp: str
+        frame_timestamp: str,
+        class_id: Optional[str] = None
+    ) -> Dict:
+        if self._is_closed:
+            raise RuntimeError("Service is closed")
+
+        start_time = time.time()
+        try:
+            if self.frame_cache is not None:
+                started = time.perf_counter()
+                image_data = ImageDecoder.decode_base64(frame_base64.strip())
+                decode_timing = {"base64_decode": time.perf_counter() - started}
+                metrics.observe_stages(decode_timing)
+                result = self._analyze_bytes(student_id, frame_id, image_data, frame_timestamp, start_time)
+                merge_stage_timings(result["stage_timings"], decode_timing)
+            else:
+                frame_result = self.frame_service.process_base64_frame(
+                    frame_base64.strip(),
+                    frame_timestamp.strip(),
+                    student_id.strip()
+                )
+                end_time = time.time()
+                result = self._build_result(student_id, frame_id, frame_result, start_time, end_time)
+                self._attach_frame_details(result, frame_result)
+            self._record(student_id, class_id, result)
+            self._record_slow_frame(student_id, frame_id, start_time, frame_base64, result)
+            return result
+        except PipelineUnavailableError as e:
+            metrics.ERRORS.inc(type(e).__name__)
+            raise
+        except Exception as e:
+            metrics.ERRORS.inc(type(e).__name__)
+            self._record_slow_frame(student_id, frame_id, start_time, frame_base64, error=e)
+            raise FaceMeshError(f"Error during analysis: {e}")
+
+    def analyze_frame(
+        self,
+        student_id: str,
+        frame_id: str,
+        image_data: Union[bytes, bytearray, memoryview],
+        frame_timestamp: str,
+        class_id: Optional[str] = None
     ) -> Dict:
         if self._is_closed:
             raise RuntimeError("Service is closed")
 
         start_time = time.time()
         try:
-            frame_result = self.frame_service.process_base64_frame(
-                frame_base64.strip(),
-                frame_timestamp.strip()
+            result = self._analyze_bytes(student_id, frame_id, image_data, frame_timestamp, start_time)
+            self._record(student_id, class_id, result)
+            self._record_slow_frame(student_id, frame_id, start_time, image_data, result)
+            return result
+        except PipelineUnavailableError as e:
+            metrics.ERRORS.inc(type(e).__name__)
+            raise
+        except Exception as e:
+            metrics.ERRORS.inc(type(e).__name__)
+            self._record_slow_frame(student_id, frame_id, start_time, image_data, error=e)
+            raise FaceMeshError(f"Error during analysis: {e}")
+
+    def analyze_frame_batch(
+        self,
+        student_id: str,
+        frames: Sequence[Tuple[str, Union[bytes, bytearray, memoryview], str]],
+        class_id: Optional[str] = None
+    ) -> List[Union[Dict, Exception]]:
+        if self._is_closed:
+            raise RuntimeError("Service is closed")
+
+        start_time = time.time()
+        try:
+            frame_results = self.frame_service.process_frame_batch(
+                [image_data for _, image_data, _ in frames],
+                [frame_timestamp.strip() for _, _, frame_timestamp in frames],
+                student_id.strip()
             )
+        except Exception as e:
+            metrics.ERRORS.inc(type(e).__name__)
+            return [FaceMeshError(f"Error during analysis: {e}") for _ in frames]
+        end_time = time.time()
+
+        results: List[Union[Dict, Exception]] = []
+        analyzed = []
+        for index, ((frame_id, _, _), frame_result) in enumerate(zip(frames, frame_results)):
+            if isinstance(frame_result, Exception):
+                metrics.ERRORS.inc(type(frame_result).__name__)
+                results.append(FaceMeshError(f"Error during analysis: {frame_result}"))
+            else:
+                results.append(frame_result)
+                analyzed.append((index, frame_id))
+        classified = self._classify_faces(
+            student_id,
+            [frame_id for _, frame_id in analyzed],
+            [results[index] for index, _ in analyzed],
+            start_time,
+            end_time
+        )
+        for (index, _), result in zip(analyzed, classified):
+            self._attach_frame_details(result, results[index])
+            self._record(student_id, class_id, result)
+            results[index] = result
+        return results
+
+    def analyze_classroom_frame(
+        self,
+        camera_id: str,
+        frame_id: str,
+        frame: Union[bytes, bytearray, memoryview, str],
+        frame_timestamp: str,
+        class_id: Optional[str] = None
+    ) -> Dict:
+        if self._is_closed:
+            raise RuntimeError("Service is closed")
+        if self.classroom_sessions is None:
+            raise RuntimeError("Classroom mode is disabled")
+
+        start_time = time.time()
+        try:
+            image_data = ImageDecoder.decode_base64(frame.strip()) if isinstance(frame, str) else frame
+            classroom_frame = self.classroom_sessions.process_frame_bytes(camera_id.strip(), image_data)
             end_time = time.time()
-            face_detected = frame_result.get('face_detected', False)
-            face_features = frame_result.get('face_features', {}) or {}
+            metrics.observe_stages(classroom_frame.stage_timings)
+            class_id = class_id.strip() if class_id else None
 
-            if not face_detected:
-                return {
-                    "status": "success",
-                    "student_id": student_id.strip(),
-                    "frame_id": frame_id.strip(),
-                    "face_detected": False,
-                    "attention_label": "inattentive",
-                    "processing_timestamp": {
-                        "start": start_time,
-                        "end": end_time,
-                        "duration": end_time - start_time,
-                    },
-                }
-
-            if face_features.get('eyes_open') is False:
-                return {
-                    "status": "success",
-                    "student_id": student_id.strip(),
-                    "frame_id": frame_id.strip(),
-                    "face_detected": True,
-                    "attention_label": "inattentive",
-                    "processing_timestamp": {
-                        "start": start_time,
-                        "end": end_time,
-                        "duration": end_time - start_time,
-                    },
-                }
-
-            has_calibration = self.calibration_storage.has_calibration(student_id)
-            calibration_data = None
-            calibration_stored = False
-
-            if not has_calibration and face_features and face_features.get('eyes_open'):
-                calibration_values = self.attention_classifier.extract_calibration_values(face_features)
-                if calibration_values[0] is not None or calibration_values[1] is not None:
-                    calibration_stored = self.calibration_storage.store_calibration(
-                        student_id,
-                        calibration_values[0],
-                        calibration_values[1]
+            faces = []
+            for track, face_result in classroom_frame.faces:
+                face_features = face_result.get('face_features', {}) or {}
+                result = self._classify_face(
+                    track.student_id,
+                    frame_id,
+                    face_result.get('face_detected', False),
+                    face_features,
+                    face_result.setdefault('stage_timings', {}),
+                    start_time,
+                    end_time
+                )
+                result["track_id"] = track.track_id
+                result["seat_id"] = track.seat_id
+                result["face_bbox"] = face_result.get("face_bbox")
+                metrics.CLASSROOM_FACES.inc("true" if track.student_id else "false")
+                if track.student_id:
+                    self.aggregator.record(
+                        track.student_id,
+                        class_id,
+                        result["attention_label"],
+                        result["face_detected"],
+                        result.get("eyes_closed", False)
                     )
-                    if calibration_stored:
-                        calibration_data = calibration_values
-            elif has_calibration:
-                calibration_data = self.calibration_storage.get_calibration(student_id)
-
-            attention_label = self.attention_classifier.classify_attention(
-                face_features,
-                face_detected,
-                calibration_data
-            )
-
-            if calibration_stored:
-                attention_label = "attentive"
+                faces.append(result)
+            for student_id in classroom_frame.absent_students:
+                self.aggregator.record(student_id, class_id, "inattentive", False, False)
 
-            response = {
+            return {
                 "status": "success",
-                "student_id": student_id.strip(),
+                "camera_id": camera_id.strip(),
                 "frame_id": frame_id.strip(),
-                "face_detected": face_detected,
-                "attention_label": attention_label,
+                "faces": faces,
+                "absent_students": classroom_frame.absent_students,
+                "frame_size": classroom_frame.frame_size,
+                "stage_timings": classroom_frame.stage_timings,
                 "processing_timestamp": {
                     "start": start_time,
                     "end": end_time,
-                    "duration": end_time - start_time
-                }
+                    "duration": end_time - start_time,
+                },
             }
-            if calibration_stored:
-                response["calibration_stored"] = True
-            if calibration_data:
-                response["using_calibration"] = True
-            return response
-
+        except PipelineUnavailableError as e:
+            metrics.ERRORS.inc(type(e).__name__)
+            raise
         except Exception as e:
-            raise FaceMeshError(f"Error during analysis: {e}")
+            metrics.ERRORS.inc(type(e).__name__)
+            raise FaceMeshError(f"Error during classroom analysis: {e}")
 
-    def analyze_frame(
+    def set_seat_map(self, camera_id: str, seat_map: SeatMap) -> None:
+        if self.classroom_sessions is None:
+            raise RuntimeError("Classroom mode is disabled")
+        self.classroom_sessions.set_seat_map(camera_id.strip(), seat_map)
+
+    def get_seat_map(self, camera_id: str) -> SeatMap:
+        if self.classroom_sessions is None:
+            raise RuntimeError("Classroom mode is disabled")
+        return self.classroom_sessions.seat_map(camera_id.strip())
+
+    def end_classroom_session(self, camera_id: str) -> bool:
+        if self.classroom_sessions is None:
+            return False
+        return self.classroom_sessions.end_session(camera_id.strip())
+
+    def _analyze_bytes(
+        self,
+        student_id: str,
+        frame_id: str,
+        image_data: Union[bytes, bytearray, memoryview],
+        frame_timestamp: str,
+        start_time: float
+    ) -> Dict:
+        cache_key = None
+        timings: Dict[str, float] = {}
+        if self.frame_cache is not None:
+            started = time.perf_counter()
+            cached, cache_key = self.frame_cache.lookup(student_id.strip(), image_data)
+            timings["cache_lookup"] = time.perf_counter() - started
+            metrics.observe_stages(timings)
+            if cached is not None:
+                metrics.CACHED_FRAMES.inc()
+                result = self._cached_result(cached, frame_id, start_time)
+                result["stage_timings"] = timings
+                return result
+
+        frame_result = self.frame_service.process_frame_bytes(
+            image_data,
+            frame_timestamp.strip(),
+            student_id.strip()
+        )
+        end_time = time.time()
+        result = self._build_result(student_id, frame_id, frame_result, start_time, end_time)
+        self._attach_frame_details(result, frame_result)
+        merge_stage_timings(result["stage_timings"], timings)
+        if cache_key is not None:
+            self.frame_cache.store(
+                student_id.strip(), cache_key, result, image_data, frame_result.get("face_region")
+            )
+        return result
+
+    def _record(self, student_id: str, class_id: Optional[str], result: Dict) -> None:
+        label = result.get("attention_label", "inattentive")
+        streak_frames = self.aggregator.record(
+            student_id.strip(),
+            class_id.strip() if class_id else None,
+            label,
+            result.get("face_detected", False),
+            result.get("eyes_closed", False)
+        )
+        motion = 0.0 if result.get("cached") else result.get("landmark_motion")
+        result["next_capture_interval"] = self.capture_advisor.advise(label, streak_frames, motion)
+
+    def _attach_frame_details(self, result: Dict, frame_result: Dict) -> None:
+        result["landmark_motion"] = frame_result.get("landmark_motion")
+        result["frame_size"] = frame_result.get("frame_size")
+        result["stage_timings"] = dict(frame_result.get("stage_timings", {}))
+
+    def _record_slow_frame(
+        self,
+        student_id: str,
+        frame_id: str,
+        start_time: float,
+        frame: FrameData,
+        result: Optional[Dict] = None,
+        error: Optional[Exception] = None
+    ) -> None:
+        if self.flight_recorder is None:
+            return
+        duration = time.time() - start_time
+        if not self.flight_recorder.admits(duration):
+            return
+        result = result or {}
+        self.flight_recorder.record(
+            student_id.strip(),
+            frame_id.strip(),
+            duration,
+            stage_timings=result.get("stage_timings"),
+            frame_size=result.get("frame_size"),
+            face_detected=result.get("face_detected"),
+            cached=result.get("cached", False),
+            error=str(error) if error is not None else None,
+            frame=frame
+        )
+
+    def _cached_result(self, cached: Dict, frame_id: str, start_time: float) -> Dict:
+        end_time = time.time()
+        result = {key: value for key, value in cached.items() if key != "calibration_stored"}
+        result["frame_id"] = frame_id.strip()
+        result["cached"] = True
+        result["processing_timestamp"] = {
+            "start": start_time,
+            "end": end_time,
+            "duration": end_time - start_time,
+        }
+        return result
+
+    def _build_result(
         self,
         student_id: str,
         frame_id: str,
-        image_data: bytes,
-        frame_timestamp: str
+        frame_result: Dict,
+        start_time: float,
+        end_time: float
+    ) -> Dict:
+        face_detected = frame_result.get('face_detected', False)
+        face_features = frame_result.get('face_features', {}) or {}
+        stage_timings = frame_result.setdefault('stage_timings', {})
+        metrics.observe_stages(stage_timings)
+        metrics.FRAMES.inc("true" if face_detected else "false")
+        return self._classify_face(student_id, frame_id, face_detected, face_features, stage_timings, start_time, end_time)
+
+    def _classify_face(
+        self,
+        student_id: Optional[str],
+        frame_id: str,
+        face_detected: bool,
+        face_features: Dict,
+        stage_timings: Dict[str, float],
+        start_time: float,
+        end_time: float
     ) -> Dict:
-        import base64
-        frame_base64 = base64.b64encode(image_data).decode('utf-8')
-        return self.analyze_frame_from_base64(student_id, frame_id, frame_base64, frame_timestamp)
+        if not face_detected or face_features.get('eyes_open') is False:
+            return self._face_response(student_id, frame_id, face_detected, face_features, "inattentive", start_time, end_time)
+
+        calibration_data, calibration_stored = self._calibration(student_id, face_features)
+        classify_started = time.perf_counter()
+        attention_label = self.attention_classifier.classify_attention(
+            face_features,
+            face_detected,
+            calibration_data
+        )
+        stage_timings['classification'] = time.perf_counter() - classify_started
+        metrics.observe_stages({"classification": stage_timings['classification']})
+        return self._face_response(
+            student_id, frame_id, face_detected, face_features, attention_label, start_time, end_time,
+            calibration_data, calibration_stored
+        )
+
+    def _classify_faces(
+        self,
+        student_id: str,
+        frame_ids: Sequence[str],
+        frame_results: Sequence[Dict],
+        start_time: float,
+        end_time: float
+    ) -> List[Dict]:
+        if not frame_results:
+            return []
+        detected, features, calibrations, stored = [], [], [], []
+        for frame_result in frame_results:
+            face_detected = frame_result.get('face_detected', False)
+            face_features = frame_result.get('face_features', {}) or {}
+            metrics.observe_stages(frame_result.setdefault('stage_timings', {}))
+            metrics.FRAMES.inc("true" if face_detected else "false")
+            calibration_data, calibration_stored = None, False
+            if face_detected and face_features.get('eyes_open') is not False:
+                calibration_data, calibration_stored = self._calibration(student_id, face_features)
+            detected.append(face_detected)
+            features.append(face_features)
+            calibrations.append(calibration_data)
+            stored.append(calibration_stored)
+
+        classify_started = time.perf_counter()
+        labels = self.attention_classifier.labels(self.attention_classifier.classify_batch(
+            FeatureBatch.from_features(features, face_detected=detected),
+            CalibrationTable.from_calibrations(calibrations)
+        )).tolist()
+        classification = (time.perf_counter() - classify_started) / max(1, len(frame_results))
+
+        results = []
+        for frame_id, frame_result, face_detected, face_features, label, calibration_data, calibration_stored in zip(
+            frame_ids, frame_results, detected, features, labels, calibrations, stored
+        ):
+            if face_detected and face_features.get('eyes_open') is not False:
+                frame_result['stage_timings']['classification'] = classification
+                metrics.observe_stages({"classification": classification})
+            results.append(self._face_response(
+                student_id, frame_id, face_detected, face_features, label, start_time, end_time,
+                calibration_data, calibration_stored
+            ))
+        return results
+
+    def _calibration(
+        self,
+        student_id: Optional[str],
+        face_features: Dict
+    ) -> Tuple[Optional[Tuple[Optional[float], Optional[float]]], bool]:
+        calibration_data = self.calibration_storage.get_calibration(student_id) if student_id else None
+        calibration_stored = False
+
+        if student_id and calibration_data is None and face_features and face_features.get('eyes_open'):
+            calibration_values = self.attention_classifier.extract_calibration_values(face_features)
+            if calibration_values[0] is not None or calibration_values[1] is not None:
+                calibration_stored = self.calibration_storage.store_calibration(
+                    student_id,
+                    calibration_values[0],
+                    calibration_values[1]
+                )
+                if calibration_stored:
+                    calibration_data = calibration_values
+        return calibration_data, calibration_stored
+
+    def _face_response(
+        self,
+        student_id: Optional[str],
+        frame_id: str,
+        face_detected: bool,
+        face_features: Dict,
+        attention_label: str,
+        start_time: float,
+        end_time: float,
+        calibration_data: Optional[Tuple[Optional[float], Optional[float]]] = None,
+        calibration_stored: bool = False
+    ) -> Dict:
+        response = {
+            "status": "success",
+            "student_id": student_id.strip() if student_id else None,
+            "frame_id": frame_id.strip(),
+            "face_detected": face_detected,
+            "attention_label": attention_label,
+            "processing_timestamp": {
+                "start": start_time,
+                "end": end_time,
+                "duration": end_time - start_time
+            }
+        }
+        if not face_detected:
+            return response
+        if face_features.get('eyes_open') is False:
+            response["eyes_closed"] = True
+            return response
+        if calibration_stored:
+            response["attention_label"] = "attentive"
+            response["calibration_stored"] = True
+        if calibration_data:
+            response["using_calibration"] = True
+        return response
+
+    def end_student_session(self, student_id: str) -> bool:
+        if self.frame_cache is not None:
+            self.frame_cache.invalidate(student_id.strip())
+        aggregates_ended = self.aggregator.end_student(student_id.strip())
+        session_ended = self.frame_service.end_student_session(student_id.strip())
+        return session_ended or aggregates_ended
+
+    def health(self) -> Dict:
+        health = dict(self.frame_service.health())
+        health["calibration"] = self.calibration_storage.stats()
+        health["aggregates"] = self.aggregator.stats()
+        if self.frame_cache is not None:
+            health["frame_cache"] = self.frame_cache.stats()
+        if self.flight_recorder is not None:
+            health["slow_frames"] = self.flight_recorder.stats()
+        if self.classroom_sessions is not None:
+            health["classroom"] = self.classroom_sessions.stats()
+        return health
+
+    def get_student_summary(self, student_id: str) -> Optional[Dict]:
+        return self.aggregator.student_summary(student_id.strip())
+
+    def get_class_summary(self, class_id: str) -> Optional[Dict]:
+        return self.aggregator.class_summary(class_id.strip())
 
     def get_calibration_status(self, student_id: str) -> Dict:
         calibration = self.calibration_storage.get_calibration(student_id)
@@ -144,3 +520,13 @@ class AttentionAnalysisService:
                 "right_gaze_deviation": calibration[1]
             }
         return {"has_calibration": False}
+
+    def export_calibrations(self, student_ids: Optional[List[str]] = None) -> List[Tuple[str, Optional[float], Optional[float]]]:
+        return self.calibration_storage.export_calibrations(student_ids)
+
+    def import_calibrations(self, calibrations: List[Tuple[str, Optional[float], Optional[float]]]) -> int:
+        imported = self.calibration_storage.import_calibrations(calibrations)
+        if self.frame_cache is not None:
+            for student_id, _, _ in calibrations:
+                self.frame_cache.invalidate(student_id)
+        return imported
@@ -1,26 +1,138 @@
+import logging
+import os
+import sqlite3
 import threading
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Calibration = Tuple[Optional[float], Optional[float]]
 
 class CalibrationStorageService:
 
-    def __init__(self):
-        self._calibrations: Dict[str, Tuple[float, float]] = {}
+    def __init__(self, db_path: Optional[str] = None, flush_interval: float = 1.0, max_retry_delay: float = 30.0):
+        self._calibrations: Dict[str, Calibration] = {}
         self._lock = threading.RLock()
-    
+        self._pending: List[Tuple[str, Optional[float], Optional[float]]] = []
+        self._wakeup = threading.Condition(self._lock)
+        self._is_closed = False
+        self._written = 0
+        self._write_errors = 0
+        self._dropped = 0
+        self._retry_delay = 0.0
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_retry_delay = max(flush_interval, max_retry_delay)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writer: Optional[threading.Thread] = None
+        if db_path:
+            self._conn = self._open(db_path)
+            self._calibrations.update(self._load())
+            logger.info("Loaded %d calibrations from %s", len(self._calibrations), db_path)
+            self._writer = threading.Thread(target=self._write_loop, name="calibration-writer", daemon=True)
+            self._writer.start()
+
+    @staticmethod
+    def _open(db_path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS calibrations ("
+            "student_id TEXT PRIMARY KEY, left_gaze REAL, right_gaze REAL)"
+        )
+        conn.commit()
+        return conn
+
+    def _load(self) -> Dict[str, Calibration]:
+        rows = self._conn.execute("SELECT student_id, left_gaze, right_gaze FROM calibrations").fetchall()
+        return {student_id: (left_gaze, right_gaze) for student_id, left_gaze, right_gaze in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._is_closed:
+                return
+            self._is_closed = True
+            self._wakeup.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._lock:
+                if self._retry_delay and not self._is_closed:
+                    self._wakeup.wait(self._retry_delay)
+                elif not self._pending and not self._is_closed:
+                    self._wakeup.wait(self.flush_interval)
+                batch, self._pending = self._pending, []
+                closing = self._is_closed
+            if batch and not self._write(batch):
+                with self._lock:
+                    if closing:
+                        self._dropped += len(batch)
+                        logger.error("Dropping %d unpersisted calibrations on close", len(batch))
+                        return
+                    self._pending[:0] = batch
+                    self._retry_delay = min(self.max_retry_delay, max(self.flush_interval, self._retry_delay * 2))
+                continue
+            self._retry_delay = 0.0
+            if closing:
+                return
+
+    def _write(self, batch: List[Tuple[str, Optional[float], Optional[float]]]) -> bool:
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO calibrations (student_id, left_gaze, right_gaze) VALUES (?, ?, ?)",
+                    batch
+                )
+            self._written += len(batch)
+            return True
+        except sqlite3.Error as e:
+            self._write_errors += 1
+            logger.error("Failed to persist %d calibrations, retrying: %s", len(batch), e)
+            return False
+
     def store_calibration(self, student_id: str, left_gaze: Optional[float], right_gaze: Optional[float]) -> bool:
+        if left_gaze is None and right_gaze is None:
+            return False
         with self._lock:
             if student_id in self._calibrations:
                 return False
-            
-            if left_gaze is not None or right_gaze is not None:
-                self._calibrations[student_id] = (left_gaze, right_gaze)
-                return True
-            return False
-    
-    def get_calibration(self, student_id: str) -> Optional[Tuple[Optional[float], Optional[float]]]:
-        with self._lock:
-            return self._calibrations.get(student_id)
-    
+            self._calibrations[student_id] = (left_gaze, right_gaze)
+            if self._writer is not None and not self._is_closed:
+                self._pending.append((student_id, left_gaze, right_gaze))
+            return True
+
+    def export_calibrations(self, student_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, Optional[float], Optional[float]]]:
+        calibrations = self._calibrations.copy()
+        if student_ids is not None:
+            calibrations = {sid: calibrations[sid] for sid in student_ids if sid in calibrations}
+        return [(student_id, left, right) for student_id, (left, right) in calibrations.items()]
+
+    def import_calibrations(self, calibrations: Iterable[Tuple[str, Optional[float], Optional[float]]]) -> int:
+        return sum(1 for student_id, left, right in calibrations if self.store_calibration(student_id, left, right))
+
+    def get_calibration(self, student_id: str) -> Optional[Calibration]:
+        return self._calibrations.get(student_id)
+
     def has_calibration(self, student_id: str) -> bool:
+        return student_id in self._calibrations
+
+    def stats(self) -> Dict:
         with self._lock:
-            return student_id in self._calibrations
\ No newline at end of file
+            return {
+                "entries": len(self._calibrations),
+                "persistent": self._writer is not None,
+                "pending_writes": len(self._pending),
+                "written": self._written,
+                "write_errors": self._write_errors,
+                "retry_delay": self._retry_delay,
+                "dropped": self._dropped,
+            }
@@ -0,0 +1,38 @@
+from typing import Callable, Optional
+
+class CaptureIntervalAdvisor:
+    def __init__(
+        self,
+        base_interval: float = 1.0,
+        min_interval: float = 0.25,
+        max_interval: float = 5.0,
+        stable_frames_per_step: int = 5,
+        motion_threshold: float = 0.05,
+        target_load: float = 0.75,
+        load_fn: Optional[Callable[[], float]] = None
+    ):
+        if not 0 < min_interval <= base_interval <= max_interval:
+            raise ValueError("Capture intervals must satisfy 0 < min <= base <= max")
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.stable_frames_per_step = max(1, stable_frames_per_step)
+        self.motion_threshold = motion_threshold
+        self.target_load = target_load
+        self._load_fn = load_fn
+
+    def advise(self, label: str, streak_frames: int, motion: Optional[float]) -> float:
+        if streak_frames <= 1 or (motion is not None and motion >= self.motion_threshold):
+            interval = self.min_interval
+        else:
+            steps = (streak_frames - 1) // self.stable_frames_per_step
+            interval = self.base_interval * 2 ** min(steps, 16)
+            if label != "attentive":
+                interval = min(interval, self.base_interval)
+            if motion:
+                interval /= 1 + motion / self.motion_threshold
+
+        load = self._load_fn() if self._load_fn is not None else 0.0
+        if self.target_load > 0 and load > self.target_load:
+            interval *= load / self.target_load
+        return min(self.max_interval, max(self.min_interval, interval))
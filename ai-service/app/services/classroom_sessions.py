@@ -0,0 +1,137 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from core import config
+from ml_logic.face_mesh_pipeline import FaceMeshPipeline, FaceMeshInferenceError
+from ml_logic.face_tracker import FaceTrack, FaceTracker, SeatMap
+from ml_logic.frame_preprocessor import FramePreprocessor
+from ml_logic.pipeline_pool import PipelineUnavailableError
+from services.tracking_sessions import TrackingSession, TrackingSessionManager
+from utils.image_decoder import ImageDecoder
+
+def create_classroom_pipeline() -> FaceMeshPipeline:
+    return FaceMeshPipeline(
+        static_image_mode=False,
+        backend=config.CLASSROOM_LANDMARK_BACKEND,
+        model_dir=config.LANDMARK_MODEL_DIR or None,
+        num_threads=config.LANDMARK_NUM_THREADS,
+        max_batch=max(config.LANDMARK_MAX_BATCH, 2 * config.CLASSROOM_MAX_FACES),
+        max_faces=config.CLASSROOM_MAX_FACES,
+        detection_range=config.CLASSROOM_DETECTION_RANGE
+    )
+
+class ClassroomFrame:
+    def __init__(
+        self,
+        faces: List[Tuple[FaceTrack, Dict]],
+        absent_students: List[str],
+        stage_timings: Dict[str, float],
+        frame_size: Tuple[int, int]
+    ):
+        self.faces = faces
+        self.absent_students = absent_students
+        self.stage_timings = stage_timings
+        self.frame_size = frame_size
+
+class ClassroomCamera(TrackingSession):
+    def __init__(
+        self,
+        camera_id: str,
+        pipeline_factory: Callable[[], FaceMeshPipeline],
+        tracker: FaceTracker
+    ):
+        super().__init__(camera_id, pipeline_factory, tracker.smoothing_window)
+        self.tracker = tracker
+
+    def process_faces(
+        self,
+        frame_bgr: np.ndarray,
+        seat_map: SeatMap
+    ) -> Tuple[List[Tuple[FaceTrack, Dict]], List[str], Dict[str, float]]:
+        with self.lock:
+            if self._pipeline is None:
+                self._pipeline = self._pipeline_factory()
+            tracks: List[FaceTrack] = []
+            absent: List[str] = []
+
+            def assign(bboxes):
+                tracks.extend(self.tracker.update(bboxes))
+                absent.extend(seat_map.assign(tracks))
+                return [track.eye_metrics for track in tracks]
+
+            try:
+                results, timings = self._pipeline.process_faces(frame_bgr, assign)
+            except FaceMeshInferenceError:
+                self.failed = True
+                raise
+            self.frames += 1
+            return list(zip(tracks, results)), absent, timings
+
+class ClassroomSessionManager(TrackingSessionManager):
+    def __init__(
+        self,
+        max_cameras: int,
+        idle_ttl: float,
+        pipeline_factory: Optional[Callable[[], FaceMeshPipeline]] = None,
+        preprocessor: Optional[FramePreprocessor] = None,
+        min_iou: float = 0.3,
+        max_misses: int = 15,
+        smoothing_window: int = 5
+    ):
+        super().__init__(
+            max_sessions=max_cameras,
+            idle_ttl=idle_ttl,
+            pipeline_factory=pipeline_factory or create_classroom_pipeline,
+            smoothing_window=smoothing_window
+        )
+        self.min_iou = min_iou
+        self.max_misses = max_misses
+        self.decoder = ImageDecoder()
+        self.preprocessor = preprocessor or FramePreprocessor(
+            max_dimension=config.CLASSROOM_MAX_DIMENSION,
+            roi_enabled=False
+        )
+        self._seat_maps: Dict[str, SeatMap] = {}
+        self._seat_lock = threading.Lock()
+
+    def _create_session(self, camera_id: str) -> ClassroomCamera:
+        return ClassroomCamera(
+            camera_id,
+            self._factory,
+            FaceTracker(self.min_iou, self.max_misses, self.smoothing_window)
+        )
+
+    def set_seat_map(self, camera_id: str, seat_map: SeatMap) -> None:
+        with self._seat_lock:
+            if seat_map.seats:
+                self._seat_maps[camera_id] = seat_map
+            else:
+                self._seat_maps.pop(camera_id, None)
+
+    def seat_map(self, camera_id: str) -> SeatMap:
+        with self._seat_lock:
+            return self._seat_maps.get(camera_id) or SeatMap()
+
+    def process_frame_bytes(self, camera_id: str, image_bytes: Union[bytes, bytearray, memoryview]) -> ClassroomFrame:
+        started = time.perf_counter()
+        frame = self.decoder.decode_image_bytes(image_bytes)
+        decoded = time.perf_counter()
+        inference_frame, _ = self.preprocessor.prepare(frame)
+        timings = {'image_decode': decoded - started, 'preprocess': time.perf_counter() - decoded}
+        with self.session(camera_id) as camera:
+            if camera is None:
+                raise PipelineUnavailableError(
+                    f"All {self.max_sessions} classroom camera slots are busy"
+                )
+            faces, absent, inference_timings = camera.process_faces(inference_frame, self.seat_map(camera_id))
+        timings.update(inference_timings)
+        return ClassroomFrame(faces, absent, timings, (frame.shape[1], frame.shape[0]))
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        with self._seat_lock:
+            stats["seat_maps"] = len(self._seat_maps)
+        return stats
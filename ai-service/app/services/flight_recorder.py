@@ -0,0 +1,164 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+from utils.image_decoder import ImageDecoder
+
+FrameData = Union[bytes, bytearray, memoryview, str]
+
+class SlowFrame:
+    def __init__(
+        self,
+        entry_id: int,
+        student_id: str,
+        frame_id: str,
+        duration: float,
+        stage_timings: Dict[str, float],
+        frame_size: Optional[Tuple[int, int]],
+        face_detected: Optional[bool],
+        cached: bool,
+        error: Optional[str],
+        frame_bytes: Optional[bytes]
+    ):
+        self.entry_id = entry_id
+        self.student_id = student_id
+        self.frame_id = frame_id
+        self.duration = duration
+        self.stage_timings = stage_timings
+        self.frame_size = frame_size
+        self.face_detected = face_detected
+        self.cached = cached
+        self.error = error
+        self.frame_bytes = frame_bytes
+        self.recorded_at = time.time()
+        self.recorded_monotonic = time.monotonic()
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.entry_id,
+            "studentId": self.student_id,
+            "frameId": self.frame_id,
+            "recordedAt": self.recorded_at,
+            "durationMs": self.duration * 1000.0,
+            "stagesMs": {stage: seconds * 1000.0 for stage, seconds in self.stage_timings.items()},
+            "width": self.frame_size[0] if self.frame_size else None,
+            "height": self.frame_size[1] if self.frame_size else None,
+            "faceDetected": self.face_detected,
+            "cached": self.cached,
+            "error": self.error,
+            "frameBytes": len(self.frame_bytes) if self.frame_bytes is not None else None,
+        }
+
+class SlowFrameRecorder:
+    def __init__(
+        self,
+        capacity: int = 32,
+        window: float = 300.0,
+        min_duration: float = 0.0,
+        capture_frames: bool = False,
+        max_frame_bytes: int = 2 * 1024 * 1024
+    ):
+        self.capacity = max(1, capacity)
+        self.window = window
+        self.min_duration = min_duration
+        self.capture_frames = capture_frames
+        self.max_frame_bytes = max_frame_bytes
+        self._heap: List[Tuple[float, int, SlowFrame]] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threshold = min_duration
+        self._next_expiry = float("inf")
+        self._recorded = 0
+
+    def admits(self, duration: float) -> bool:
+        return duration > self._threshold or time.monotonic() >= self._next_expiry
+
+    def record(
+        self,
+        student_id: str,
+        frame_id: str,
+        duration: float,
+        stage_timings: Optional[Dict[str, float]] = None,
+        frame_size: Optional[Tuple[int, int]] = None,
+        face_detected: Optional[bool] = None,
+        cached: bool = False,
+        error: Optional[str] = None,
+        frame: Optional[FrameData] = None
+    ) -> bool:
+        if duration < self.min_duration or not self.admits(duration):
+            return False
+        frame_bytes = self._frame_bytes(frame) if self.capture_frames and frame is not None else None
+        with self._lock:
+            self._prune(time.monotonic())
+            if len(self._heap) >= self.capacity and duration <= self._heap[0][0]:
+                return False
+            entry = SlowFrame(
+                next(self._ids),
+                student_id,
+                frame_id,
+                duration,
+                dict(stage_timings or {}),
+                tuple(frame_size) if frame_size else None,
+                face_detected,
+                cached,
+                error,
+                frame_bytes
+            )
+            if len(self._heap) >= self.capacity:
+                heapq.heapreplace(self._heap, (duration, entry.entry_id, entry))
+            else:
+                heapq.heappush(self._heap, (duration, entry.entry_id, entry))
+            self._recorded += 1
+            self._update_bounds()
+            return True
+
+    def _frame_bytes(self, frame: FrameData) -> Optional[bytes]:
+        try:
+            data = ImageDecoder.decode_base64(frame.strip()) if isinstance(frame, str) else bytes(frame)
+        except Exception:
+            return None
+        return data if len(data) <= self.max_frame_bytes else None
+
+    def _prune(self, now: float) -> None:
+        if now < self._next_expiry:
+            return
+        self._heap = [item for item in self._heap if now - item[2].recorded_monotonic <= self.window]
+        heapq.heapify(self._heap)
+        self._update_bounds()
+
+    def _update_bounds(self) -> None:
+        full = len(self._heap) >= self.capacity
+        self._threshold = max(self.min_duration, self._heap[0][0]) if full else self.min_duration
+        self._next_expiry = min(
+            (item[2].recorded_monotonic + self.window for item in self._heap),
+            default=float("inf")
+        )
+
+    def frames(self) -> List[SlowFrame]:
+        with self._lock:
+            self._prune(time.monotonic())
+            return [item[2] for item in sorted(self._heap, reverse=True)]
+
+    def get(self, entry_id: int) -> Optional[SlowFrame]:
+        with self._lock:
+            return next((item[2] for item in self._heap if item[1] == entry_id), None)
+
+    def clear(self) -> int:
+        with self._lock:
+            cleared = len(self._heap)
+            self._heap = []
+            self._update_bounds()
+            return cleared
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._heap),
+                "capacity": self.capacity,
+                "window": self.window,
+                "threshold_ms": self._threshold * 1000.0,
+                "recorded": self._recorded,
+                "capture_frames": self.capture_frames,
+            }
@@ -0,0 +1,135 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from ml_logic.frame_preprocessor import BBox
+
+class FrameCacheKey:
+    def __init__(self, digest: bytes, phash: Optional[int]):
+        self.digest = digest
+        self.phash = phash
+
+class _CacheEntry:
+    def __init__(self, key: FrameCacheKey, result: Dict, stored_at: float, eye_region: Optional[BBox]):
+        self.key = key
+        self.result = result
+        self.stored_at = stored_at
+        self.eye_region = eye_region
+
+class FrameResultCache:
+    HASH_SIZE = 8
+    EYE_BAND = (0.2, 0.55)
+
+    def __init__(
+        self,
+        ttl: float,
+        max_students: int = 1024,
+        phash_max_distance: int = -1,
+        phash_ttl: float = 0.5
+    ):
+        self.ttl = ttl
+        self.max_students = max_students
+        self.phash_max_distance = phash_max_distance
+        self.phash_ttl = min(phash_ttl, ttl)
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._exact_hits = 0
+        self._perceptual_hits = 0
+        self._misses = 0
+        self._expired = 0
+
+    @staticmethod
+    def exact_digest(image_bytes: Union[bytes, bytearray, memoryview]) -> bytes:
+        return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
+    @classmethod
+    def eye_region(cls, face_bbox: Optional[BBox]) -> Optional[BBox]:
+        if not face_bbox:
+            return None
+        x0, y0, x1, y1 = face_bbox
+        top, bottom = cls.EYE_BAND
+        return (x0, y0 + (y1 - y0) * top, x1, y0 + (y1 - y0) * bottom)
+
+    def perceptual_hash(self, image_bytes: Union[bytes, bytearray, memoryview], region: BBox) -> Optional[int]:
+        import cv2
+
+        gray = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_2)
+        if gray is None or gray.size == 0:
+            return None
+        h, w = gray.shape
+        x0, y0, x1, y1 = region
+        band = gray[max(0, int(y0 * h)):int(round(y1 * h)), max(0, int(x0 * w)):int(round(x1 * w))]
+        if band.shape[0] < self.HASH_SIZE or band.shape[1] <= self.HASH_SIZE:
+            return None
+        small = cv2.resize(band, (self.HASH_SIZE + 1, self.HASH_SIZE), interpolation=cv2.INTER_AREA)
+        bits = small[:, 1:] > small[:, :-1]
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    def lookup(self, student_id: str, image_bytes: Union[bytes, bytearray, memoryview]) -> Tuple[Optional[Dict], FrameCacheKey]:
+        digest = self.exact_digest(image_bytes)
+        key = FrameCacheKey(digest, None)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is not None and now - entry.stored_at > self.ttl:
+                del self._entries[student_id]
+                self._expired += 1
+                entry = None
+            if entry is not None and entry.key.digest == digest:
+                self._exact_hits += 1
+                return entry.result, entry.key
+            near = (
+                self.phash_max_distance >= 0 and entry is not None and entry.key.phash is not None
+                and now - entry.stored_at <= self.phash_ttl
+            )
+            if not near:
+                self._misses += 1
+                return None, key
+
+        phash = self.perceptual_hash(image_bytes, entry.eye_region)
+        with self._lock:
+            if phash is not None and bin(entry.key.phash ^ phash).count("1") <= self.phash_max_distance:
+                self._perceptual_hits += 1
+                return entry.result, key
+            self._misses += 1
+        return None, key
+
+    def store(
+        self,
+        student_id: str,
+        key: FrameCacheKey,
+        result: Dict,
+        image_bytes: Optional[Union[bytes, bytearray, memoryview]] = None,
+        face_bbox: Optional[BBox] = None
+    ) -> None:
+        region = self.eye_region(face_bbox) if self.phash_max_distance >= 0 else None
+        if region is not None and image_bytes is not None:
+            key.phash = self.perceptual_hash(image_bytes, region)
+        with self._lock:
+            self._entries[student_id] = _CacheEntry(key, result, time.monotonic(), region)
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_students:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, student_id: str) -> None:
+        with self._lock:
+            self._entries.pop(student_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self._exact_hits + self._perceptual_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "phash_ttl": self.phash_ttl if self.phash_max_distance >= 0 else None,
+                "exact_hits": self._exact_hits,
+                "perceptual_hits": self._perceptual_hits,
+                "misses": self._misses,
+                "expired": self._expired,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
@@ -1,13 +1,105 @@
-import base64
 import threading
-from typing import Dict
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from core import config
 from ml_logic.face_mesh_pipeline import FaceMeshPipeline, FaceMeshError
+from ml_logic.frame_preprocessor import BBox, FramePreprocessor, bbox_in_frame
+from ml_logic.pipeline_pool import FaceMeshPipelinePool
+from utils.face_metrics import EyeMetrics
+from services.tracking_sessions import TrackingSession, TrackingSessionManager
 from utils.image_decoder import ImageDecoder
 
+WARMUP_SESSION_ID = "__warmup__"
+
+def create_pipeline(static_image_mode: bool) -> FaceMeshPipeline:
+    return FaceMeshPipeline(
+        static_image_mode=static_image_mode,
+        backend=config.LANDMARK_BACKEND,
+        model_dir=config.LANDMARK_MODEL_DIR or None,
+        num_threads=config.LANDMARK_NUM_THREADS,
+        max_batch=config.LANDMARK_MAX_BATCH
+    )
+
+def merge_stage_timings(stage_timings: Dict[str, float], timings: Dict[str, float]) -> Dict[str, float]:
+    for stage, seconds in timings.items():
+        stage_timings[stage] = stage_timings.get(stage, 0.0) + seconds
+    return stage_timings
+
+GAZE_KEYS = (
+    'left_iris_x_normalized',
+    'left_iris_y_normalized',
+    'right_iris_x_normalized',
+    'right_iris_y_normalized',
+)
+
+def gaze_offsets(face_features: Dict) -> Optional[Tuple[float, ...]]:
+    values = tuple(face_features.get(key) for key in GAZE_KEYS)
+    return None if any(value is None for value in values) else values
+
+def landmark_motion(
+    previous_face: Optional[BBox],
+    face: Optional[BBox],
+    previous_gaze: Optional[Tuple[float, ...]],
+    gaze: Optional[Tuple[float, ...]]
+) -> Optional[float]:
+    if previous_face is None or face is None:
+        return None
+    size = max(face[2] - face[0], face[3] - face[1], 1e-6)
+    motion = max(abs(a - b) for a, b in zip(previous_face, face)) / size
+    if previous_gaze is not None and gaze is not None:
+        motion = max(motion, max(abs(a - b) for a, b in zip(previous_gaze, gaze)))
+    return motion
+
+def face_region(crop: BBox, result: Dict) -> Optional[BBox]:
+    face_bbox = result.get('face_bbox')
+    return bbox_in_frame(crop, face_bbox) if face_bbox else None
+
+class DecodedFrame:
+    def __init__(
+        self,
+        frame: np.ndarray,
+        frame_size: Tuple[int, int],
+        inference_frame: np.ndarray,
+        crop: BBox,
+        timings: Dict[str, float],
+        previous_face: Optional[BBox] = None
+    ):
+        self.frame = frame
+        self.frame_size = frame_size
+        self.inference_frame = inference_frame
+        self.crop = crop
+        self.timings = timings
+        self.previous_face = previous_face
+
 class FrameProcessingService:
 
-    def __init__(self):
-        self.pipeline = FaceMeshPipeline(static_image_mode=False)
+    def __init__(
+        self,
+        pipeline_pool: Optional[FaceMeshPipelinePool] = None,
+        tracking_sessions: Optional[TrackingSessionManager] = None,
+        preprocessor: Optional[FramePreprocessor] = None
+    ):
+        self.pipeline_pool = pipeline_pool or FaceMeshPipelinePool(
+            size=config.FACE_MESH_POOL_SIZE,
+            checkout_timeout=config.PIPELINE_CHECKOUT_TIMEOUT,
+            max_consecutive_failures=config.PIPELINE_MAX_CONSECUTIVE_FAILURES,
+            pipeline_factory=lambda: create_pipeline(static_image_mode=True)
+        )
+        self.tracking_sessions = tracking_sessions or TrackingSessionManager(
+            max_sessions=config.TRACKING_MAX_SESSIONS,
+            idle_ttl=config.TRACKING_SESSION_TTL,
+            pipeline_factory=lambda: create_pipeline(static_image_mode=False),
+            smoothing_window=config.EAR_SMOOTHING_WINDOW,
+            max_graphs=config.TRACKING_MAX_GRAPHS,
+            graph_ttl=config.TRACKING_GRAPH_TTL
+        )
+        self.preprocessor = preprocessor or FramePreprocessor(
+            max_dimension=config.INFERENCE_MAX_DIMENSION,
+            roi_margin=config.ROI_MARGIN,
+            roi_enabled=config.ROI_CROP_ENABLED,
+            min_dimension=ImageDecoder.MIN_FRAME_DIMENSION
+        )
         self.decoder = ImageDecoder()
         self._lock = threading.RLock()
         self._is_closed = False
@@ -18,31 +110,190 @@ class FrameProcessingService:
                 return
             self._is_closed = True
             try:
-                self.pipeline.close()
+                self.tracking_sessions.close()
+            except Exception:
+                pass
+            try:
+                self.pipeline_pool.close()
             except Exception:
                 pass
 
-    def process_base64_frame(self, frame_base64: str, timestamp: str) -> Dict:
+    def process_base64_frame(
+        self,
+        frame_base64: str,
+        timestamp: str,
+        student_id: Optional[str] = None
+    ) -> Dict:
         if self._is_closed:
             raise RuntimeError("Frame processing service is closed")
 
-        try:
-            if "," in frame_base64:
-                frame_base64 = frame_base64.split(",", 1)[1]
-            frame_bytes = base64.b64decode(frame_base64)
-        except Exception as e:
-            raise ValueError(f"Invalid base64 data: {e}")
-
-        frame = self.decoder.decode_image_bytes(frame_bytes)
-        frame_result = self.pipeline.process(frame)
+        started = time.perf_counter()
+        frame_bytes = self.decoder.decode_base64(frame_base64)
+        decoded = time.perf_counter()
+        frame_result = self._process_encoded(frame_bytes, student_id)
+        merge_stage_timings(frame_result.setdefault('stage_timings', {}), {'base64_decode': decoded - started})
         frame_result['timestamp'] = timestamp
         return frame_result
 
-    def process_frame_bytes(self, image_bytes: bytes, timestamp: str) -> Dict:
+    def process_frame_bytes(
+        self,
+        image_bytes: Union[bytes, bytearray, memoryview],
+        timestamp: str,
+        student_id: Optional[str] = None
+    ) -> Dict:
         if self._is_closed:
             raise RuntimeError("Frame processing service is closed")
 
-        frame = self.decoder.decode_image_bytes(image_bytes)
-        frame_result = self.pipeline.process(frame)
+        frame_result = self._process_encoded(image_bytes, student_id)
         frame_result['timestamp'] = timestamp
-        return frame_result
\ No newline at end of file
+        return frame_result
+
+    def process_frame_batch(
+        self,
+        images: Sequence[Union[bytes, bytearray, memoryview]],
+        timestamps: Sequence[str],
+        student_id: Optional[str] = None
+    ) -> List[Union[Dict, Exception]]:
+        if self._is_closed:
+            raise RuntimeError("Frame processing service is closed")
+
+        results: List[Union[Dict, Exception, None]] = [None] * len(images)
+        decoded: List[Tuple[int, DecodedFrame]] = []
+        for index, image_bytes in enumerate(images):
+            try:
+                decoded.append((index, self._decode(image_bytes)))
+            except FaceMeshError as e:
+                results[index] = e
+        if not decoded:
+            return results
+        if student_id:
+            with self.tracking_sessions.session(student_id) as session:
+                if session is not None:
+                    with session.lock:
+                        return self._infer_batch(decoded, timestamps, results, session.eye_metrics)
+        return self._infer_batch(decoded, timestamps, results, None)
+
+    def _infer_batch(
+        self,
+        decoded: List[Tuple[int, DecodedFrame]],
+        timestamps: Sequence[str],
+        results: List[Union[Dict, Exception, None]],
+        eye_metrics: Optional[EyeMetrics]
+    ) -> List[Union[Dict, Exception]]:
+        frame_results = self.pipeline_pool.process_batch(
+            [frame.inference_frame for _, frame in decoded],
+            [eye_metrics] * len(decoded)
+        )
+        for (index, frame), result in zip(decoded, frame_results):
+            merge_stage_timings(result.setdefault('stage_timings', {}), frame.timings)
+            result['frame_size'] = frame.frame_size
+            result['face_region'] = face_region(frame.crop, result)
+            result['timestamp'] = timestamps[index]
+            results[index] = result
+        return results
+
+    def _process_encoded(self, image_bytes: Union[bytes, bytearray, memoryview], student_id: Optional[str]) -> Dict:
+        if student_id:
+            with self.tracking_sessions.session(student_id) as session:
+                if session is not None:
+                    with session.lock:
+                        return self._infer_for_session(session, self._decode_for_session(session, image_bytes))
+        return self._infer(self._decode(image_bytes))
+
+    def _decode(self, image_bytes: Union[bytes, bytearray, memoryview]) -> DecodedFrame:
+        started = time.perf_counter()
+        frame = self.decoder.decode_image_bytes(image_bytes)
+        decoded = time.perf_counter()
+        inference_frame, crop = self.preprocessor.prepare(frame)
+        return DecodedFrame(
+            frame,
+            (frame.shape[1], frame.shape[0]),
+            inference_frame,
+            crop,
+            {'image_decode': decoded - started, 'preprocess': time.perf_counter() - decoded}
+        )
+
+    def _infer(self, decoded: DecodedFrame) -> Dict:
+        result = self.pipeline_pool.process(decoded.inference_frame)
+        merge_stage_timings(result.setdefault('stage_timings', {}), decoded.timings)
+        result['frame_size'] = decoded.frame_size
+        result['face_region'] = face_region(decoded.crop, result)
+        return result
+
+    def _decode_for_session(self, session: TrackingSession, image_bytes: Union[bytes, bytearray, memoryview]) -> DecodedFrame:
+        roi = session.roi
+        previous_face = roi.face_bbox
+        flags, factor = self.preprocessor.decode_mode(roi)
+        started = time.perf_counter()
+        try:
+            frame = self.decoder.decode_image_bytes(image_bytes, flags)
+        except FaceMeshError:
+            if factor == 1:
+                raise
+            roi.frame_size = None
+            roi.reset()
+            factor = 1
+            frame = self.decoder.decode_image_bytes(image_bytes)
+        frame_size = (frame.shape[1] * factor, frame.shape[0] * factor)
+        if roi.frame_size is not None:
+            if max(abs(a - b) for a, b in zip(roi.frame_size, frame_size)) > factor:
+                roi.reset()
+            else:
+                frame_size = roi.frame_size
+        decoded = time.perf_counter()
+
+        inference_frame, crop = self.preprocessor.prepare(frame, roi)
+        timings = {'image_decode': decoded - started, 'preprocess': time.perf_counter() - decoded}
+        return DecodedFrame(frame, frame_size, inference_frame, crop, timings, previous_face)
+
+    def _infer_for_session(self, session: TrackingSession, decoded: DecodedFrame) -> Dict:
+        roi = session.roi
+        timings = decoded.timings
+        crop = decoded.crop
+        result = session.process(decoded.inference_frame, self.pipeline_pool.process)
+        if not result.get('face_detected') and roi.crop is not None:
+            roi.reset()
+            merge_stage_timings(timings, result.get('stage_timings', {}))
+            retry_started = time.perf_counter()
+            inference_frame, crop = self.preprocessor.prepare(decoded.frame, roi)
+            merge_stage_timings(timings, {'preprocess': time.perf_counter() - retry_started})
+            result = session.process(inference_frame, self.pipeline_pool.process)
+
+        self.preprocessor.update(roi, decoded.frame_size, crop, result.get('face_bbox'))
+        gaze = gaze_offsets(result.get('face_features') or {})
+        result['landmark_motion'] = landmark_motion(decoded.previous_face, roi.face_bbox, session.last_gaze, gaze)
+        session.last_gaze = gaze
+        merge_stage_timings(result.setdefault('stage_timings', {}), timings)
+        result['frame_size'] = decoded.frame_size
+        result['face_region'] = face_region(crop, result)
+        return result
+
+    def warm_up(self, frames: List[bytes]) -> Dict:
+        if self._is_closed:
+            raise RuntimeError("Frame processing service is closed")
+
+        started = time.perf_counter()
+        prepared = [self.preprocessor.prepare(self.decoder.decode_image_bytes(data))[0] for data in frames]
+        pipelines = self.pipeline_pool.warm_up(prepared)
+        try:
+            for data in frames:
+                self.process_frame_bytes(data, "", WARMUP_SESSION_ID)
+        finally:
+            self.end_student_session(WARMUP_SESSION_ID)
+        return {
+            "pipelines": pipelines,
+            "frames": len(frames),
+            "seconds": time.perf_counter() - started,
+        }
+
+    def end_student_session(self, student_id: str) -> bool:
+        return self.tracking_sessions.end_session(student_id)
+
+    def health(self) -> Dict:
+        tracking = self.tracking_sessions.stats()
+        return {
+            "graphs": self.pipeline_pool.size + tracking["graphs"],
+            "max_graphs": self.pipeline_pool.size + tracking["max_graphs"],
+            "pool": self.pipeline_pool.health(),
+            "tracking_sessions": tracking,
+        }
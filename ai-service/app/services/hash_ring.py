@@ -0,0 +1,61 @@
+import bisect
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+class ConsistentHashRing:
+    def __init__(self, nodes: Iterable[str] = (), virtual_nodes: int = 128):
+        if virtual_nodes < 1:
+            raise ValueError("virtual_nodes must be at least 1")
+        self.virtual_nodes = virtual_nodes
+        self._nodes: List[str] = []
+        self._points: List[Tuple[int, str]] = []
+        self._hashes: List[int] = []
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def copy(self) -> "ConsistentHashRing":
+        ring = ConsistentHashRing(virtual_nodes=self.virtual_nodes)
+        ring._nodes = list(self._nodes)
+        ring._points = list(self._points)
+        ring._hashes = list(self._hashes)
+        return ring
+
+    def add(self, node: str) -> bool:
+        if node in self._nodes:
+            return False
+        self._nodes.append(node)
+        self._points.extend((self._hash(f"{node}#{i}"), node) for i in range(self.virtual_nodes))
+        self._rebuild()
+        return True
+
+    def remove(self, node: str) -> bool:
+        if node not in self._nodes:
+            return False
+        self._nodes.remove(node)
+        self._points = [point for point in self._points if point[1] != node]
+        self._rebuild()
+        return True
+
+    def _rebuild(self) -> None:
+        self._points.sort()
+        self._hashes = [h for h, _ in self._points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._points)
+        return self._points[index][1]
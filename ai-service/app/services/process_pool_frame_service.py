@@ -0,0 +1,357 @@
+import base64
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from multiprocessing.connection import wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Union
+
+from ml_logic.face_mesh_pipeline import FaceMeshError, FaceMeshInferenceError
+from ml_logic.pipeline_pool import PipelineUnavailableError
+
+logger = logging.getLogger(__name__)
+
+_ERROR_TYPES = {
+    cls.__name__: cls
+    for cls in (ValueError, RuntimeError, FaceMeshError, FaceMeshInferenceError, PipelineUnavailableError)
+}
+
+def _decode_base64(view: memoryview) -> bytes:
+    comma = bytes(view[:64]).find(b",")
+    if comma != -1:
+        view = view[comma + 1:]
+    try:
+        return base64.b64decode(view)
+    except Exception as e:
+        raise ValueError(f"Invalid base64 data: {e}")
+
+def _release(view: memoryview) -> None:
+    try:
+        view.release()
+    except BufferError:
+        pass
+
+def _worker_main(conn, shm_name: str, slot_bytes: int, settings: Dict) -> None:
+    from ml_logic.pipeline_pool import FaceMeshPipelinePool
+    from services.frame_processor import FrameProcessingService, create_pipeline
+    from services.tracking_sessions import TrackingSessionManager
+
+    shm = SharedMemory(name=shm_name)
+    service = FrameProcessingService(
+        pipeline_pool=FaceMeshPipelinePool(
+            size=1,
+            checkout_timeout=settings["checkout_timeout"],
+            pipeline_factory=lambda: create_pipeline(static_image_mode=True)
+        ),
+        tracking_sessions=TrackingSessionManager(
+            max_sessions=settings["max_sessions"],
+            idle_ttl=settings["session_ttl"],
+            pipeline_factory=lambda: create_pipeline(static_image_mode=False),
+            smoothing_window=settings["smoothing_window"],
+            max_graphs=settings["max_graphs"],
+            graph_ttl=settings["graph_ttl"]
+        )
+    )
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            kind, task_id, payload = message
+            try:
+                if kind == "end_session":
+                    result = service.end_student_session(payload)
+                elif kind == "warm_up":
+                    result = service.warm_up(payload)
+                else:
+                    slot, length, timestamp, student_id = payload
+                    start = slot * slot_bytes
+                    view = shm.buf[start:start + length]
+                    try:
+                        frame_bytes = _decode_base64(view) if kind == "base64" else view
+                        result = service.process_frame_bytes(frame_bytes, timestamp, student_id)
+                        del frame_bytes
+                    finally:
+                        _release(view)
+                conn.send(("ok", task_id, result, service.health()["graphs"]))
+            except Exception as e:
+                conn.send(("error", task_id, (type(e).__name__, str(e)), service.health()["graphs"]))
+    finally:
+        service.close()
+        shm.close()
+
+class _WorkerHandle:
+    def __init__(self, index: int, shm: SharedMemory, slots: int):
+        self.index = index
+        self.shm = shm
+        self.process: Optional[mp.Process] = None
+        self.conn = None
+        self.send_lock = threading.Lock()
+        self.free_slots: "queue.Queue[int]" = queue.Queue()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+        self.pending: Dict[int, tuple] = {}
+        self.processed = 0
+        self.failures = 0
+        self.restarts = 0
+        self.graphs = 0
+
+    def health(self) -> Dict:
+        return {
+            "index": self.index,
+            "pid": self.process.pid if self.process else None,
+            "alive": bool(self.process and self.process.is_alive()),
+            "in_flight": len(self.pending),
+            "processed": self.processed,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "graphs": self.graphs,
+        }
+
+class ProcessPoolFrameService:
+
+    def __init__(
+        self,
+        workers: int,
+        slots_per_worker: int,
+        slot_bytes: int,
+        task_timeout: float,
+        checkout_timeout: float,
+        worker_settings: Dict
+    ):
+        if workers < 1:
+            raise ValueError("Process pool needs at least one worker")
+        self.slot_bytes = slot_bytes
+        self.task_timeout = task_timeout
+        self.checkout_timeout = checkout_timeout
+        self._settings = worker_settings
+        self._context = mp.get_context("spawn")
+        self._lock = threading.RLock()
+        self._is_closed = False
+        self._task_ids = itertools.count()
+        self._round_robin = itertools.count()
+        self._workers: List[_WorkerHandle] = []
+        try:
+            for index in range(workers):
+                shm = SharedMemory(create=True, size=slots_per_worker * slot_bytes)
+                handle = _WorkerHandle(index, shm, slots_per_worker)
+                self._workers.append(handle)
+                self._start_worker(handle)
+        except Exception:
+            self.close()
+            raise
+        self._supervisor = threading.Thread(
+            target=self._supervise,
+            name="process-pool-supervisor",
+            daemon=True
+        )
+        self._supervisor.start()
+
+    def _start_worker(self, handle: _WorkerHandle) -> None:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, handle.shm.name, self.slot_bytes, self._settings),
+            name=f"facemesh-worker-{handle.index}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        handle.process = process
+        handle.conn = parent_conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._is_closed:
+                return
+            self._is_closed = True
+        for handle in self._workers:
+            with handle.send_lock:
+                try:
+                    if handle.conn is not None:
+                        handle.conn.send(None)
+                except Exception:
+                    pass
+        for handle in self._workers:
+            if handle.process is not None:
+                handle.process.join(timeout=5)
+                if handle.process.is_alive():
+                    handle.process.terminate()
+            self._fail_pending(handle, RuntimeError("Frame processing service is closed"))
+            try:
+                handle.shm.close()
+                handle.shm.unlink()
+            except Exception:
+                pass
+
+    def _supervise(self) -> None:
+        while not self._is_closed:
+            watched = {}
+            for handle in self._workers:
+                if handle.conn is not None:
+                    watched[handle.conn] = (handle, False)
+                if handle.process is not None:
+                    watched[handle.process.sentinel] = (handle, True)
+            try:
+                ready = wait(list(watched), timeout=0.5)
+            except OSError:
+                continue
+            for obj in ready:
+                handle, exited = watched[obj]
+                if self._is_closed:
+                    return
+                if exited:
+                    self._restart_worker(handle)
+                    continue
+                try:
+                    message = handle.conn.recv()
+                except (EOFError, OSError):
+                    continue
+                self._complete(handle, message)
+
+    def _complete(self, handle: _WorkerHandle, message: tuple) -> None:
+        outcome, task_id, payload, handle.graphs = message
+        with handle.send_lock:
+            entry = handle.pending.pop(task_id, None)
+        if entry is None:
+            return
+        future, slot = entry
+        if slot is not None:
+            handle.free_slots.put(slot)
+        if outcome == "ok":
+            handle.processed += 1
+            future.set_result(payload)
+        else:
+            handle.failures += 1
+            error_name, error_message = payload
+            future.set_exception(_ERROR_TYPES.get(error_name, FaceMeshError)(error_message))
+
+    def _restart_worker(self, handle: _WorkerHandle) -> None:
+        with handle.send_lock:
+            exitcode = handle.process.exitcode if handle.process else None
+            logger.warning("Inference worker %d exited with code %s, restarting", handle.index, exitcode)
+            self._fail_pending(handle, FaceMeshInferenceError("Inference worker crashed"))
+            try:
+                handle.conn.close()
+            except Exception:
+                pass
+            if self._is_closed:
+                return
+            handle.restarts += 1
+            handle.graphs = 0
+            self._start_worker(handle)
+
+    def _fail_pending(self, handle: _WorkerHandle, error: Exception) -> None:
+        pending, handle.pending = handle.pending, {}
+        for future, slot in pending.values():
+            if slot is not None:
+                handle.free_slots.put(slot)
+            if not future.done():
+                future.set_exception(error)
+
+    def _worker_for(self, student_id: Optional[str]) -> _WorkerHandle:
+        if student_id:
+            index = zlib.crc32(student_id.encode("utf-8")) % len(self._workers)
+        else:
+            index = next(self._round_robin) % len(self._workers)
+        return self._workers[index]
+
+    def _submit(self, handle: _WorkerHandle, kind: str, payload, slot: Optional[int] = None) -> Dict:
+        future: Future = Future()
+        with handle.send_lock:
+            task_id = next(self._task_ids)
+            handle.pending[task_id] = (future, slot)
+            try:
+                handle.conn.send((kind, task_id, payload))
+            except Exception as e:
+                handle.pending.pop(task_id, None)
+                if slot is not None:
+                    handle.free_slots.put(slot)
+                raise FaceMeshInferenceError(f"Failed to dispatch frame to inference worker: {e}")
+        try:
+            return future.result(timeout=self.task_timeout)
+        except FutureTimeoutError:
+            handle.process.kill()
+            raise FaceMeshInferenceError(f"Inference worker timed out after {self.task_timeout:.1f}s")
+
+    def _process(
+        self,
+        kind: str,
+        data: Union[bytes, bytearray, memoryview],
+        timestamp: str,
+        student_id: Optional[str]
+    ) -> Dict:
+        if self._is_closed:
+            raise RuntimeError("Frame processing service is closed")
+        length = len(data)
+        if length > self.slot_bytes:
+            raise ValueError(f"Frame of {length} bytes exceeds shared memory slot of {self.slot_bytes} bytes")
+
+        handle = self._worker_for(student_id)
+        try:
+            slot = handle.free_slots.get(timeout=self.checkout_timeout)
+        except queue.Empty:
+            raise PipelineUnavailableError(
+                f"No inference worker slot available after {self.checkout_timeout:.2f}s"
+            )
+        try:
+            start = slot * self.slot_bytes
+            handle.shm.buf[start:start + length] = data
+        except Exception:
+            handle.free_slots.put(slot)
+            raise
+        return self._submit(handle, kind, (slot, length, timestamp, student_id), slot)
+
+    def process_base64_frame(
+        self,
+        frame_base64: str,
+        timestamp: str,
+        student_id: Optional[str] = None
+    ) -> Dict:
+        try:
+            data = frame_base64.encode("ascii")
+        except UnicodeEncodeError as e:
+            raise ValueError(f"Invalid base64 data: {e}")
+        return self._process("base64", data, timestamp, student_id)
+
+    def process_frame_bytes(
+        self,
+        image_bytes: Union[bytes, bytearray, memoryview],
+        timestamp: str,
+        student_id: Optional[str] = None
+    ) -> Dict:
+        return self._process("bytes", image_bytes, timestamp, student_id)
+
+    def end_student_session(self, student_id: str) -> bool:
+        if self._is_closed:
+            return False
+        return bool(self._submit(self._worker_for(student_id), "end_session", student_id))
+
+    def warm_up(self, frames: List[bytes]) -> Dict:
+        if self._is_closed:
+            raise RuntimeError("Frame processing service is closed")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(self._workers)) as executor:
+            results = list(executor.map(lambda handle: self._submit(handle, "warm_up", frames), self._workers))
+        return {
+            "pipelines": sum(result["pipelines"] for result in results),
+            "frames": len(frames),
+            "seconds": time.perf_counter() - started,
+        }
+
+    def health(self) -> Dict:
+        return {
+            "backend": "process",
+            "graphs": sum(handle.graphs for handle in self._workers),
+            "max_graphs": len(self._workers) * (1 + self._settings["max_graphs"]),
+            "workers": [handle.health() for handle in self._workers],
+        }
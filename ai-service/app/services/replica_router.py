@@ -0,0 +1,174 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+import httpx
+
+from services.hash_ring import ConsistentHashRing
+
+logger = logging.getLogger(__name__)
+
+CALIBRATIONS_PATH = "/api/attention/calibrations"
+
+class ReplicaUnavailableError(Exception):
+    pass
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        replicas: Iterable[str],
+        virtual_nodes: int = 128,
+        request_timeout: float = 10.0,
+        health_interval: float = 5.0,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.members: List[str] = []
+        for replica in replicas:
+            replica = replica.strip().rstrip("/")
+            if replica and replica not in self.members:
+                self.members.append(replica)
+        self.health_interval = health_interval
+        self._ring = ConsistentHashRing(self.members, virtual_nodes)
+        self._down: Set[str] = set()
+        self._client = client or httpx.AsyncClient(timeout=request_timeout)
+        self._membership_lock = asyncio.Lock()
+        self._is_closed = False
+        self._handoffs = 0
+        self._moved_calibrations = 0
+        self._failovers = 0
+
+    async def close(self) -> None:
+        if self._is_closed:
+            return
+        self._is_closed = True
+        await self._client.aclose()
+
+    def owner(self, student_id: str) -> str:
+        replica = self._ring.owner(student_id.strip())
+        if replica is None:
+            raise ReplicaUnavailableError("No ai-service replicas available")
+        return replica
+
+    async def forward(
+        self,
+        student_id: str,
+        method: str,
+        path: str,
+        **kwargs
+    ) -> httpx.Response:
+        for _ in range(max(1, len(self._ring))):
+            replica = self.owner(student_id)
+            try:
+                return await self._client.request(method, replica + path, **kwargs)
+            except httpx.TransportError as e:
+                logger.warning("Replica %s unreachable: %s", replica, e)
+                await self._mark_down(replica)
+        raise ReplicaUnavailableError("No ai-service replicas available")
+
+    async def broadcast(self, method: str, path: str, **kwargs) -> List[httpx.Response]:
+        replicas = self._ring.nodes
+        responses = await asyncio.gather(
+            *(self._client.request(method, replica + path, **kwargs) for replica in replicas),
+            return_exceptions=True
+        )
+        for replica, response in zip(replicas, responses):
+            if isinstance(response, httpx.TransportError):
+                logger.warning("Replica %s unreachable: %s", replica, response)
+                await self._mark_down(replica)
+        return [response for response in responses if isinstance(response, httpx.Response)]
+
+    async def add_replica(self, replica: str) -> bool:
+        replica = replica.strip().rstrip("/")
+        async with self._membership_lock:
+            if replica not in self.members:
+                self.members.append(replica)
+            self._down.discard(replica)
+            if replica in self._ring:
+                return False
+            ring = self._ring.copy()
+            ring.add(replica)
+            await self._handoff(ring, self._ring.nodes)
+            self._ring = ring
+            logger.info("Replica %s joined; ring has %d replicas", replica, len(ring))
+            return True
+
+    async def remove_replica(self, replica: str) -> bool:
+        replica = replica.strip().rstrip("/")
+        async with self._membership_lock:
+            if replica in self.members:
+                self.members.remove(replica)
+            self._down.discard(replica)
+            if replica not in self._ring:
+                return False
+            ring = self._ring.copy()
+            ring.remove(replica)
+            await self._handoff(ring, [replica])
+            self._ring = ring
+            logger.info("Replica %s left; ring has %d replicas", replica, len(ring))
+            return True
+
+    async def _mark_down(self, replica: str) -> None:
+        async with self._membership_lock:
+            if replica not in self._ring:
+                return
+            ring = self._ring.copy()
+            ring.remove(replica)
+            self._ring = ring
+            self._down.add(replica)
+            self._failovers += 1
+            logger.warning("Replica %s removed from ring after failure", replica)
+
+    async def _handoff(self, ring: ConsistentHashRing, sources: List[str]) -> None:
+        for source in sources:
+            try:
+                response = await self._client.get(source + CALIBRATIONS_PATH)
+                response.raise_for_status()
+                calibrations = response.json().get("calibrations", [])
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Could not export calibrations from %s: %s", source, e)
+                continue
+
+            moves: Dict[str, List[Dict]] = {}
+            for entry in calibrations:
+                target = ring.owner(entry["studentId"])
+                if target is not None and target != source:
+                    moves.setdefault(target, []).append(entry)
+
+            for target, entries in moves.items():
+                try:
+                    response = await self._client.post(target + CALIBRATIONS_PATH, json={"calibrations": entries})
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    logger.warning("Could not hand off %d calibrations to %s: %s", len(entries), target, e)
+                    continue
+                self._moved_calibrations += len(entries)
+        self._handoffs += 1
+
+    async def check_health(self) -> None:
+        for replica in list(self.members):
+            try:
+                response = await self._client.get(replica + "/health")
+                healthy = response.status_code == 200 and response.json().get("ready", False)
+            except (httpx.HTTPError, ValueError):
+                healthy = False
+            if healthy and replica not in self._ring:
+                await self.add_replica(replica)
+            elif not healthy and replica in self._ring:
+                await self._mark_down(replica)
+
+    async def run_health_checks(self) -> None:
+        while not self._is_closed:
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.exception("Replica health check failed: %s", e)
+            await asyncio.sleep(self.health_interval)
+
+    def stats(self) -> Dict:
+        return {
+            "replicas": self._ring.nodes,
+            "down": sorted(self._down),
+            "handoffs": self._handoffs,
+            "moved_calibrations": self._moved_calibrations,
+            "failovers": self._failovers,
+        }
@@ -0,0 +1,246 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from contextlib import ExitStack
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Union
+
+from core import metrics
+from ml_logic.frame_preprocessor import FramePreprocessor
+from ml_logic.pipeline_pool import FaceMeshPipelinePool, PipelineUnavailableError
+from services.frame_processor import DecodedFrame, FrameProcessingService, merge_stage_timings
+from services.tracking_sessions import TrackingSession, TrackingSessionManager
+
+class PipelineStage:
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], None],
+        workers: int = 1,
+        queue_size: int = 4,
+        submit_timeout: float = 2.0,
+        next_stage: Optional["PipelineStage"] = None,
+        window: float = 10.0
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.submit_timeout = submit_timeout
+        self.next_stage = next_stage
+        self.window = window
+        self._queue: "queue.Queue[Optional[Tuple[Any, Future]]]" = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._is_closed = False
+        self._running: Dict[int, float] = {}
+        self._recent: Deque[Tuple[float, float]] = deque()
+        self._started_at = time.perf_counter()
+        self._processed = 0
+        self._failed = 0
+        self._busy_seconds = 0.0
+        self._blocked_seconds = 0.0
+        self._threads = [
+            threading.Thread(target=self._work, args=(worker,), name=f"stage-{name}-{worker}", daemon=True)
+            for worker in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            if self._is_closed:
+                return
+            self._is_closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(self, item: Any, future: Optional[Future] = None) -> Future:
+        if self._is_closed:
+            raise RuntimeError(f"Pipeline stage {self.name} is closed")
+        future = future or Future()
+        try:
+            self._queue.put((item, future), timeout=self.submit_timeout)
+        except queue.Full:
+            raise PipelineUnavailableError(
+                f"Pipeline stage {self.name} queue still full after {self.submit_timeout:.2f}s"
+            )
+        return future
+
+    def _work(self, worker: int) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                return
+            item, future = entry
+            started = time.perf_counter()
+            with self._lock:
+                self._running[worker] = started
+            error = None
+            try:
+                self.handler(item)
+            except Exception as e:
+                error = e
+            finished = time.perf_counter()
+            with self._lock:
+                del self._running[worker]
+                self._recent.append((finished, finished - started))
+                self._busy_seconds += finished - started
+                if error is None:
+                    self._processed += 1
+                else:
+                    self._failed += 1
+                self._trim(finished)
+
+            if error is not None:
+                future.set_exception(error)
+            elif self.next_stage is None:
+                future.set_result(item)
+            else:
+                try:
+                    self.next_stage.submit(item, future)
+                except Exception as e:
+                    future.set_exception(e)
+                with self._lock:
+                    self._blocked_seconds += time.perf_counter() - finished
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.window
+        while self._recent and self._recent[0][0] < horizon:
+            self._recent.popleft()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def utilization(self) -> float:
+        now = time.perf_counter()
+        with self._lock:
+            self._trim(now)
+            window_start = max(now - self.window, self._started_at)
+            elapsed = now - window_start
+            busy = sum(min(duration, finished - window_start) for finished, duration in self._recent)
+            busy += sum(now - max(started, window_start) for started in self._running.values())
+        return min(1.0, busy / (self.workers * elapsed)) if elapsed > 0 else 0.0
+
+    def stats(self) -> Dict:
+        utilization = self.utilization()
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "active": len(self._running),
+                "queue_size": self.queue_size,
+                "queue_depth": self.queue_depth(),
+                "processed": self._processed,
+                "failed": self._failed,
+                "utilization": utilization,
+                "busy_seconds": self._busy_seconds,
+                "blocked_seconds": self._blocked_seconds,
+            }
+
+class StagedFrame:
+    def __init__(
+        self,
+        student_id: Optional[str],
+        image_bytes: Optional[Union[bytes, bytearray, memoryview]] = None,
+        frame_base64: Optional[str] = None
+    ):
+        self.student_id = student_id
+        self.image_bytes = image_bytes
+        self.frame_base64 = frame_base64
+        self.session: Optional[TrackingSession] = None
+        self.decoded: Optional[DecodedFrame] = None
+        self.result: Optional[Dict] = None
+        self.resources = ExitStack()
+
+class StagedFrameService(FrameProcessingService):
+    def __init__(
+        self,
+        decode_workers: int = 1,
+        inference_workers: int = 1,
+        queue_size: int = 4,
+        submit_timeout: float = 2.0,
+        pipeline_pool: Optional[FaceMeshPipelinePool] = None,
+        tracking_sessions: Optional[TrackingSessionManager] = None,
+        preprocessor: Optional[FramePreprocessor] = None
+    ):
+        super().__init__(pipeline_pool, tracking_sessions, preprocessor)
+        self.inference_stage = PipelineStage(
+            "inference", self._inference_step, inference_workers, queue_size, submit_timeout
+        )
+        self.decode_stage = PipelineStage(
+            "decode", self._decode_step, decode_workers, queue_size, submit_timeout, next_stage=self.inference_stage
+        )
+        self.stages = (self.decode_stage, self.inference_stage)
+        metrics.registry.add_collector(self._collect_metrics)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._is_closed:
+                return
+            metrics.registry.remove_collector(self._collect_metrics)
+            for stage in self.stages:
+                stage.close()
+            super().close()
+
+    def process_base64_frame(
+        self,
+        frame_base64: str,
+        timestamp: str,
+        student_id: Optional[str] = None
+    ) -> Dict:
+        return self._run(StagedFrame(student_id, frame_base64=frame_base64), timestamp)
+
+    def process_frame_bytes(
+        self,
+        image_bytes: Union[bytes, bytearray, memoryview],
+        timestamp: str,
+        student_id: Optional[str] = None
+    ) -> Dict:
+        return self._run(StagedFrame(student_id, image_bytes=image_bytes), timestamp)
+
+    def _run(self, frame: StagedFrame, timestamp: str) -> Dict:
+        if self._is_closed:
+            raise RuntimeError("Frame processing service is closed")
+        try:
+            self.decode_stage.submit(frame).result()
+        finally:
+            frame.resources.close()
+        frame.result['timestamp'] = timestamp
+        return frame.result
+
+    def _decode_step(self, frame: StagedFrame) -> None:
+        timings = {}
+        if frame.frame_base64 is not None:
+            started = time.perf_counter()
+            frame.image_bytes = self.decoder.decode_base64(frame.frame_base64)
+            timings['base64_decode'] = time.perf_counter() - started
+        if frame.student_id:
+            frame.session = frame.resources.enter_context(self.tracking_sessions.session(frame.student_id))
+        if frame.session is None:
+            frame.decoded = self._decode(frame.image_bytes)
+        else:
+            with frame.session.lock:
+                frame.decoded = self._decode_for_session(frame.session, frame.image_bytes)
+        merge_stage_timings(frame.decoded.timings, timings)
+        frame.image_bytes = frame.frame_base64 = None
+
+    def _inference_step(self, frame: StagedFrame) -> None:
+        if frame.session is None:
+            frame.result = self._infer(frame.decoded)
+        else:
+            with frame.session.lock:
+                frame.result = self._infer_for_session(frame.session, frame.decoded)
+        frame.decoded = None
+
+    def _collect_metrics(self) -> None:
+        for stage in self.stages:
+            metrics.PIPELINE_STAGE_UTILIZATION.set(stage.utilization(), stage.name)
+            metrics.PIPELINE_STAGE_QUEUE_DEPTH.set(stage.queue_depth(), stage.name)
+
+    def health(self) -> Dict:
+        health = super().health()
+        health["backend"] = "staged"
+        health["stages"] = {stage.name: stage.stats() for stage in self.stages}
+        return health
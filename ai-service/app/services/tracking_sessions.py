@@ -0,0 +1,239 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ml_logic.face_mesh_pipeline import FaceMeshPipeline, FaceMeshInferenceError
+from ml_logic.frame_preprocessor import RegionOfInterest
+from ml_logic.pipeline_pool import PipelineUnavailableError
+from utils.face_metrics import EyeMetrics
+
+Fallback = Callable[[np.ndarray, EyeMetrics], Dict]
+
+class TrackingSession:
+    def __init__(
+        self,
+        student_id: str,
+        pipeline_factory: Callable[[], FaceMeshPipeline],
+        smoothing_window: int = 5
+    ):
+        self.student_id = student_id
+        self.eye_metrics = EyeMetrics(smoothing_window=smoothing_window)
+        self.roi = RegionOfInterest()
+        self.last_gaze: Optional[Tuple[float, ...]] = None
+        self.lock = threading.RLock()
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.frames = 0
+        self.active = 0
+        self.failed = False
+        self.graph_granted = False
+        self._pipeline_factory = pipeline_factory
+        self._pipeline: Optional[FaceMeshPipeline] = None
+
+    def process(self, frame_bgr: np.ndarray, fallback: Optional[Fallback] = None) -> Dict:
+        with self.lock:
+            if not self.graph_granted:
+                if fallback is None:
+                    raise PipelineUnavailableError(f"No tracking graph is free for {self.student_id}")
+                result = fallback(frame_bgr, self.eye_metrics)
+                self.frames += 1
+                return result
+            if self._pipeline is None:
+                self._pipeline = self._pipeline_factory()
+            try:
+                result = self._pipeline.process(frame_bgr, self.eye_metrics)
+            except FaceMeshInferenceError:
+                self.failed = True
+                raise
+            self.frames += 1
+            return result
+
+    @property
+    def has_pipeline(self) -> bool:
+        return self._pipeline is not None
+
+    def release_graph(self) -> None:
+        with self.lock:
+            if not self.graph_granted:
+                self._close_pipeline()
+
+    def close(self) -> None:
+        with self.lock:
+            self.graph_granted = False
+            self._close_pipeline()
+
+    def _close_pipeline(self) -> None:
+        if self._pipeline is not None:
+            try:
+                self._pipeline.close()
+            except Exception:
+                pass
+            self._pipeline = None
+
+class TrackingSessionManager:
+    def __init__(
+        self,
+        max_sessions: int,
+        idle_ttl: float,
+        pipeline_factory: Optional[Callable[[], FaceMeshPipeline]] = None,
+        smoothing_window: int = 5,
+        sweep_interval: float = 10.0,
+        max_graphs: Optional[int] = None,
+        graph_ttl: Optional[float] = None
+    ):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_graphs = max_sessions if max_graphs is None else max(0, max_graphs)
+        self.graph_ttl = idle_ttl if graph_ttl is None else graph_ttl
+        self.smoothing_window = smoothing_window
+        self.sweep_interval = sweep_interval
+        self._factory = pipeline_factory or (lambda: FaceMeshPipeline(static_image_mode=False))
+        self._sessions: "OrderedDict[str, TrackingSession]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._is_closed = False
+        self._last_sweep = time.monotonic()
+        self._created = 0
+        self._evicted_lru = 0
+        self._evicted_ttl = 0
+        self._overflow = 0
+        self._graphs = 0
+        self._graph_fallbacks = 0
+        self._graphs_released = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._is_closed:
+                return
+            self._is_closed = True
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._graphs = 0
+        for session in sessions:
+            session.close()
+
+    @contextmanager
+    def session(self, student_id: str) -> Iterator[Optional[TrackingSession]]:
+        session, stale = self._acquire(student_id)
+        for old in stale:
+            old.release_graph()
+        try:
+            yield session
+        finally:
+            if session is not None:
+                self._release(session)
+
+    def _acquire(self, student_id: str):
+        now = time.monotonic()
+        stale: List[TrackingSession] = []
+        with self._lock:
+            if self._is_closed:
+                return None, stale
+            if now - self._last_sweep >= self.sweep_interval:
+                stale.extend(self._sweep_expired(now))
+                stale.extend(self._sweep_idle_graphs(now))
+                self._last_sweep = now
+            session = self._sessions.get(student_id)
+            if session is not None:
+                self._sessions.move_to_end(student_id)
+            else:
+                if len(self._sessions) >= self.max_sessions:
+                    victim = self._pop_lru_idle()
+                    if victim is None:
+                        self._overflow += 1
+                        return None, stale
+                    stale.append(victim)
+                    self._evicted_lru += 1
+                session = self._create_session(student_id)
+                self._sessions[student_id] = session
+                self._created += 1
+            if not session.graph_granted:
+                if self._graphs < self.max_graphs:
+                    session.graph_granted = True
+                    self._graphs += 1
+                else:
+                    self._graph_fallbacks += 1
+            session.active += 1
+            session.last_used = now
+            return session, stale
+
+    def _create_session(self, student_id: str) -> TrackingSession:
+        return TrackingSession(student_id, self._factory, self.smoothing_window)
+
+    def _release(self, session: TrackingSession) -> None:
+        failed = None
+        with self._lock:
+            session.active -= 1
+            session.last_used = time.monotonic()
+            if session.failed and session.active == 0:
+                if self._sessions.get(session.student_id) is session:
+                    del self._sessions[session.student_id]
+                    self._revoke_graph(session)
+                failed = session
+        if failed is not None:
+            failed.close()
+
+    def _revoke_graph(self, session: TrackingSession) -> None:
+        if session.graph_granted:
+            session.graph_granted = False
+            self._graphs -= 1
+
+    def _pop_lru_idle(self) -> Optional[TrackingSession]:
+        for student_id, session in self._sessions.items():
+            if session.active == 0:
+                del self._sessions[student_id]
+                self._revoke_graph(session)
+                return session
+        return None
+
+    def _sweep_expired(self, now: float) -> List[TrackingSession]:
+        expired = [
+            student_id for student_id, session in self._sessions.items()
+            if session.active == 0 and now - session.last_used > self.idle_ttl
+        ]
+        self._evicted_ttl += len(expired)
+        sessions = [self._sessions.pop(student_id) for student_id in expired]
+        for session in sessions:
+            self._revoke_graph(session)
+        return sessions
+
+    def _sweep_idle_graphs(self, now: float) -> List[TrackingSession]:
+        idle = [
+            session for session in self._sessions.values()
+            if session.graph_granted and session.active == 0 and now - session.last_used > self.graph_ttl
+        ]
+        for session in idle:
+            self._revoke_graph(session)
+        self._graphs_released += len(idle)
+        return idle
+
+    def end_session(self, student_id: str) -> bool:
+        with self._lock:
+            session = self._sessions.get(student_id)
+            if session is None or session.active:
+                return False
+            del self._sessions[student_id]
+            self._revoke_graph(session)
+        session.close()
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "graphs": sum(1 for session in self._sessions.values() if session.has_pipeline),
+                "max_graphs": self.max_graphs,
+                "graph_fallbacks": self._graph_fallbacks,
+                "graphs_released": self._graphs_released,
+                "idle_ttl": self.idle_ttl,
+                "created": self._created,
+                "evicted_lru": self._evicted_lru,
+                "evicted_ttl": self._evicted_ttl,
+                "overflow": self._overflow,
+            }
@@ -1,10 +1,11 @@
 from typing import Optional, Tuple
 import numpy as np
 from ml_logic.landmark_constants import (
-    LEFT_IRIS,
-    RIGHT_IRIS,
-    LEFT_EYE_LANDMARKS,
-    RIGHT_EYE_LANDMARKS,
+    EYE_LANDMARK_INDICES,
+    IRIS_LANDMARK_INDICES,
+    FEATURE_LANDMARK_INDICES,
+    EAR_SEGMENT_START,
+    EAR_SEGMENT_END,
 )
 from . import gaze
 from collections import deque
@@ -13,6 +14,8 @@ class EyeMetrics:
     def __init__(self, smoothing_window: int = 5):
         self.left_ear_history = deque(maxlen=smoothing_window)
         self.right_ear_history = deque(maxlen=smoothing_window)
+        self.left_ear_sum = 0.0
+        self.right_ear_sum = 0.0
 
     def calculate_eye_aspect_ratio(self, eye_coords: np.ndarray) -> float:
         if eye_coords is None or eye_coords.shape[0] < 6:
@@ -24,44 +27,71 @@ class EyeMetrics:
             return 0.0
         return (vertical1 + vertical2) / (2.0 * horizontal)
 
+    def calculate_eye_aspect_ratios(self, eye_coords: np.ndarray) -> Tuple[float, float]:
+        segments = eye_coords[:, EAR_SEGMENT_START] - eye_coords[:, EAR_SEGMENT_END]
+        lengths = np.sqrt(np.add.reduce(segments * segments, axis=-1))
+        horizontal = lengths[:, 2]
+        if horizontal.all():
+            ratios = (lengths[:, 0] + lengths[:, 1]) / (2.0 * horizontal)
+        else:
+            ratios = np.divide(
+                lengths[:, 0] + lengths[:, 1],
+                2.0 * horizontal,
+                out=np.zeros_like(horizontal),
+                where=horizontal != 0.0
+            )
+        return ratios[0], ratios[1]
+
     def smooth_ear(self, left_ear: float, right_ear: float) -> Tuple[float, float]:
+        left_ear, right_ear = float(left_ear), float(right_ear)
+        if len(self.left_ear_history) == self.left_ear_history.maxlen:
+            self.left_ear_sum -= self.left_ear_history[0]
+            self.right_ear_sum -= self.right_ear_history[0]
         self.left_ear_history.append(left_ear)
         self.right_ear_history.append(right_ear)
-        left_mean = float(np.mean(self.left_ear_history))
-        right_mean = float(np.mean(self.right_ear_history))
-        return left_mean, right_mean
+        self.left_ear_sum += left_ear
+        self.right_ear_sum += right_ear
+        count = len(self.left_ear_history)
+        return self.left_ear_sum / count, self.right_ear_sum / count
 
     def are_eyes_open(self, left_ear: float, right_ear: float, threshold: float = 0.25) -> bool:
         return (left_ear > threshold) or (right_ear > threshold)
 
+def _normalized_iris_offsets(eye_coords: np.ndarray, iris_coords: np.ndarray) -> np.ndarray:
+    eye_centers = np.add.reduce(eye_coords, axis=1) / eye_coords.shape[1]
+    iris_centers = np.add.reduce(iris_coords, axis=1) / iris_coords.shape[1]
+    bbox_sizes = np.maximum(np.maximum.reduce(eye_coords, axis=1) - np.minimum.reduce(eye_coords, axis=1), 1.0)
+    denoms = np.maximum(np.maximum.reduce(bbox_sizes, axis=1), 1.0)
+    return (iris_centers - eye_centers) / denoms[:, None]
+
+def _feature_coords(points: np.ndarray, w: int, h: int):
+    count = points.shape[0]
+    if count > FEATURE_LANDMARK_INDICES.max():
+        coords = gaze.to_pixel_coords(points[FEATURE_LANDMARK_INDICES], w, h)
+        eye_size = EYE_LANDMARK_INDICES.size
+        return coords[:eye_size].reshape(2, -1, 2), coords[eye_size:].reshape(2, -1, 2)
+    if count > EYE_LANDMARK_INDICES.max():
+        return gaze.to_pixel_coords(points[EYE_LANDMARK_INDICES], w, h), None
+    return None, None
+
 def extract_face_features(landmarks, w: int, h: int, eye_metrics: Optional[EyeMetrics] = None) -> dict:
     if eye_metrics is None:
         eye_metrics = EyeMetrics()
     features = {}
-    left_eye_coords = gaze.get_landmark_coords(landmarks, LEFT_EYE_LANDMARKS, w, h)
-    right_eye_coords = gaze.get_landmark_coords(landmarks, RIGHT_EYE_LANDMARKS, w, h)
-    left_ear = eye_metrics.calculate_eye_aspect_ratio(left_eye_coords) if left_eye_coords is not None else 0.0
-    right_ear = eye_metrics.calculate_eye_aspect_ratio(right_eye_coords) if right_eye_coords is not None else 0.0
+    eye_coords, iris_coords = _feature_coords(gaze.landmarks_to_array(landmarks), w, h)
+
+    if eye_coords is not None:
+        left_ear, right_ear = eye_metrics.calculate_eye_aspect_ratios(eye_coords)
+    else:
+        left_ear, right_ear = 0.0, 0.0
     left_ear, right_ear = eye_metrics.smooth_ear(left_ear, right_ear)
     features['left_eye_aspect_ratio'] = left_ear
     features['right_eye_aspect_ratio'] = right_ear
     features['eyes_open'] = eye_metrics.are_eyes_open(left_ear, right_ear)
-    left_iris = gaze.get_iris_center(landmarks, LEFT_IRIS, w, h)
-    right_iris = gaze.get_iris_center(landmarks, RIGHT_IRIS, w, h)
-
-    def _normalized_iris(eye_coords: Optional[np.ndarray], iris_center: Optional[np.ndarray]):
-        if eye_coords is None or iris_center is None:
-            return None, None
-        eye_center = np.mean(eye_coords, axis=0)
-        min_xy = np.min(eye_coords, axis=0)
-        max_xy = np.max(eye_coords, axis=0)
-        bbox_size = np.maximum(max_xy - min_xy, 1.0)
-        denom = max(bbox_size[0], bbox_size[1], 1.0)
-        norm = (iris_center - eye_center) / denom
-        return float(norm[0]), float(norm[1])
 
-    lx, ly = _normalized_iris(left_eye_coords, left_iris)
-    rx, ry = _normalized_iris(right_eye_coords, right_iris)
+    lx = ly = rx = ry = None
+    if iris_coords is not None:
+        (lx, ly), (rx, ry) = _normalized_iris_offsets(eye_coords, iris_coords).tolist()
     features['left_iris_x_normalized'] = lx
     features['left_iris_y_normalized'] = ly
     features['right_iris_x_normalized'] = rx
@@ -0,0 +1,50 @@
+import math
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple
+
+import numpy as np
+
+class FrameBufferPool:
+    def __init__(self, max_buffers: int = 16):
+        self.max_buffers = max(1, max_buffers)
+        self._blocks: "OrderedDict[Tuple[Hashable, np.dtype], np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def get(self, name: Hashable, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        dtype = np.dtype(dtype)
+        key = (name, dtype)
+        size = math.prod(shape)
+        block = self._blocks.get(key)
+        if block is not None and block.size >= size:
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return block[:size].reshape(shape)
+        self.misses += 1
+        if block is not None:
+            self._bytes -= block.nbytes
+        block = np.empty(size, dtype=dtype)
+        self._blocks[key] = block
+        self._blocks.move_to_end(key)
+        self._bytes += block.nbytes
+        while len(self._blocks) > self.max_buffers:
+            _, evicted = self._blocks.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evicted += 1
+        return block.reshape(shape)
+
+    def clear(self) -> None:
+        self._blocks.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict:
+        return {
+            "buffers": len(self._blocks),
+            "max_buffers": self.max_buffers,
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
@@ -1,8 +1,28 @@
 from typing import Optional, List
 import numpy as np
 
+def landmarks_to_array(landmarks) -> np.ndarray:
+    if isinstance(landmarks, np.ndarray):
+        return landmarks[:, :2]
+    if hasattr(landmarks, "landmark"):
+        landmarks = landmarks.landmark
+    count = len(landmarks)
+    flat = np.fromiter(
+        (value for lm in landmarks for value in (lm.x, lm.y)),
+        dtype=np.float64,
+        count=2 * count
+    )
+    return flat.reshape(count, 2)
+
+def to_pixel_coords(points: np.ndarray, w: int, h: int) -> np.ndarray:
+    coords = np.empty(points.shape, dtype=np.float32)
+    np.multiply(points, (float(w), float(h)), out=coords, casting="same_kind")
+    return coords
+
 def get_landmark_coords(landmarks, indices: List[int], w: int, h: int) -> Optional[np.ndarray]:
     try:
+        if isinstance(landmarks, np.ndarray):
+            return to_pixel_coords(landmarks[indices, :2], w, h)
         coords = []
         for idx in indices:
             lm = landmarks[idx]
@@ -1,5 +1,6 @@
-import cv2
+import base64
 import numpy as np
+from typing import Optional, Union
 from ml_logic.face_mesh_pipeline import FaceMeshError
 
 class ImageDecoder:
@@ -7,13 +8,27 @@ class ImageDecoder:
     MIN_FRAME_DIMENSION = 100 
 
     @staticmethod
-    def decode_image_bytes(image_data: bytes) -> np.ndarray:
+    def decode_base64(frame_base64: str) -> bytes:
+        try:
+            if "," in frame_base64:
+                frame_base64 = frame_base64.split(",", 1)[1]
+            return base64.b64decode(frame_base64)
+        except Exception as e:
+            raise ValueError(f"Invalid base64 data: {e}")
+
+    @staticmethod
+    def decode_image_bytes(
+        image_data: Union[bytes, bytearray, memoryview],
+        flags: Optional[int] = None
+    ) -> np.ndarray:
+        import cv2
+
         try:
             nparr = np.frombuffer(image_data, np.uint8)
             if nparr.size == 0:
                 raise ValueError("Empty image data buffer")
                 
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR if flags is None else flags)
             if frame is None or frame.size == 0:
                 raise ValueError("Failed to decode image or frame is empty")
             
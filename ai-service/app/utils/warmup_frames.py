@@ -0,0 +1,37 @@
+import numpy as np
+from typing import List, Optional
+
+def synthetic_frames(
+    count: int,
+    width: int = 640,
+    height: int = 480,
+    image_path: Optional[str] = None
+) -> List[np.ndarray]:
+    import cv2
+
+    frames: List[np.ndarray] = []
+    if image_path:
+        frame = cv2.imread(image_path)
+        if frame is None:
+            raise ValueError(f"Could not read warm-up image: {image_path}")
+        frames.append(frame)
+
+    rng = np.random.default_rng(0)
+    gradient = np.tile(np.linspace(0, 255, width, dtype=np.uint8), (height, 1))
+    while len(frames) < count:
+        if len(frames) % 2:
+            frames.append(cv2.cvtColor(gradient, cv2.COLOR_GRAY2BGR))
+        else:
+            frames.append(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+    return frames
+
+def encode_frames(frames: List[np.ndarray], quality: int = 85) -> List[bytes]:
+    import cv2
+
+    encoded = []
+    for frame in frames:
+        ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("Failed to encode warm-up frame")
+        encoded.append(buffer.tobytes())
+    return encoded
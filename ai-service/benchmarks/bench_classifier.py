@@ -0,0 +1,102 @@
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from ml_logic.attention_classifier import (
+    IRIS_FEATURE_KEYS,
+    AttentionClassifier,
+    CalibrationTable,
+    FeatureBatch,
+)
+
+def make_samples(count: int, seed: int = 0) -> Tuple[List[Dict], List[bool], List[Optional[Tuple]]]:
+    rng = np.random.default_rng(seed)
+    # Quantize to a coarse grid so that samples land exactly on the thresholds.
+    values = np.round(rng.uniform(-0.6, 0.6, size=(count, 4)) * 20) / 20
+    missing = rng.random((count, 4)) < 0.1
+    features, detected, calibrations = [], [], []
+    for row, row_missing in zip(values.tolist(), missing.tolist()):
+        feature = {key: None if gone else value for key, value, gone in zip(IRIS_FEATURE_KEYS, row, row_missing)}
+        feature['eyes_open'] = rng.choice([True, True, True, False, None])
+        features.append(feature if rng.random() > 0.02 else {})
+        detected.append(bool(rng.random() > 0.05))
+        roll = rng.random()
+        if roll < 0.4:
+            calibrations.append(None)
+        elif roll < 0.45:
+            calibrations.append((None, None))
+        else:
+            left, right = (np.round(rng.uniform(0.0, 0.6, size=2) * 20) / 20).tolist()
+            calibrations.append((None if rng.random() < 0.1 else left, None if rng.random() < 0.1 else right))
+    return features, detected, calibrations
+
+def classify_scalar(classifier: AttentionClassifier, features, detected, calibrations) -> List[str]:
+    return [
+        classifier.classify_attention(feature, face_detected=flag, calibration_data=calibration)
+        for feature, flag, calibration in zip(features, detected, calibrations)
+    ]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scalar vs vectorized attention classification over a batch of samples")
+    parser.add_argument("--samples", type=int, default=10000)
+    parser.add_argument("--number", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--run-size", type=int, default=8, help="Frames per student in one analyze_frame_batch call")
+    args = parser.parse_args()
+
+    classifier = AttentionClassifier()
+    features, detected, calibrations = make_samples(args.samples)
+    batch = FeatureBatch.from_features(features, face_detected=detected)
+    table = CalibrationTable.from_calibrations(calibrations)
+
+    cases = {
+        "scalar classify_attention": lambda: classify_scalar(classifier, features, detected, calibrations),
+        "classify_batch incl. packing": lambda: classifier.classify_batch(
+            FeatureBatch.from_features(features, face_detected=detected),
+            CalibrationTable.from_calibrations(calibrations)
+        ),
+        "classify_batch": lambda: classifier.classify_batch(batch, table),
+    }
+    results = {}
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat)) / args.number
+        results[name] = best
+        print(f"{name:30s} {best * 1e3:8.2f} ms/batch {best / args.samples * 1e9:8.1f} ns/sample")
+    runs = [
+        (features[start:start + args.run_size], detected[start:start + args.run_size], calibrations[start:start + args.run_size])
+        for start in range(0, args.samples, args.run_size)
+    ]
+    cases = {
+        f"scalar, runs of {args.run_size}": lambda: [classify_scalar(classifier, *run) for run in runs],
+        f"batch, runs of {args.run_size}": lambda: [
+            classifier.labels(classifier.classify_batch(
+                FeatureBatch.from_features(run_features, face_detected=run_detected),
+                CalibrationTable.from_calibrations(run_calibrations)
+            ))
+            for run_features, run_detected, run_calibrations in runs
+        ],
+    }
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat)) / args.number
+        results[name] = best
+        print(f"{name:30s} {best * 1e3:8.2f} ms/batch {best / args.samples * 1e9:8.1f} ns/sample")
+    scalar = results["scalar classify_attention"]
+    print(f"{'speedup incl. packing':30s} {scalar / results['classify_batch incl. packing']:8.2f}x")
+    print(f"{'speedup':30s} {scalar / results['classify_batch']:8.2f}x")
+    print(f"{f'speedup, runs of {args.run_size}':30s} {results[f'scalar, runs of {args.run_size}'] / results[f'batch, runs of {args.run_size}']:8.2f}x")
+
+    expected = classify_scalar(classifier, features, detected, calibrations)
+    actual = AttentionClassifier.labels(classifier.classify_batch(batch, table)).tolist()
+    mismatches = sum(a != b for a, b in zip(expected, actual))
+    print(f"{'label mismatches':30s} {mismatches} of {args.samples} ({expected.count('attentive')} attentive)")
+    if mismatches:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
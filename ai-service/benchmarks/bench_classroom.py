@@ -0,0 +1,99 @@
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from ml_logic.face_tracker import Seat, SeatMap
+from services.classroom_sessions import ClassroomSessionManager
+from services.frame_processor import FrameProcessingService
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "corpus"
+
+def load_faces(corpus: Path, seats: int, tile: int) -> List[np.ndarray]:
+    faces = []
+    for path in sorted(corpus.glob("*.jpg")):
+        frame = cv2.imread(str(path))
+        if frame is not None:
+            faces.append(cv2.resize(frame, (tile, tile)))
+    if not faces:
+        raise SystemExit(f"No frames in {corpus}; run build_corpus.py first")
+    return [faces[index % len(faces)] for index in range(seats)]
+
+def classroom_frame(faces: List[np.ndarray], columns: int) -> np.ndarray:
+    rows = math.ceil(len(faces) / columns)
+    tile = faces[0].shape[0]
+    grid = np.zeros((rows * tile, columns * tile, 3), dtype=np.uint8)
+    for index, face in enumerate(faces):
+        row, column = divmod(index, columns)
+        grid[row * tile:(row + 1) * tile, column * tile:(column + 1) * tile] = face
+    return grid
+
+def seat_map(count: int, columns: int) -> SeatMap:
+    rows = math.ceil(count / columns)
+    return SeatMap([
+        Seat(f"seat-{index}", f"student-{index}", (
+            (index % columns) / columns,
+            (index // columns) / rows,
+            (index % columns + 1) / columns,
+            (index // columns + 1) / rows
+        ))
+        for index in range(count)
+    ])
+
+def encode(frame: np.ndarray) -> bytes:
+    ok, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    if not ok:
+        raise SystemExit("Failed to encode frame")
+    return buffer.tobytes()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare one classroom-camera pass against per-student frames for the same seats")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--seats", type=int, default=4)
+    parser.add_argument("--columns", type=int, default=2)
+    parser.add_argument("--tile", type=int, default=320)
+    parser.add_argument("--iterations", type=int, default=30)
+    args = parser.parse_args()
+
+    faces = load_faces(args.corpus, args.seats, args.tile)
+    room = encode(classroom_frame(faces, args.columns))
+    singles = [encode(face) for face in faces]
+
+    manager = ClassroomSessionManager(max_cameras=1, idle_ttl=300.0)
+    manager.set_seat_map("bench", seat_map(args.seats, args.columns))
+    try:
+        manager.process_frame_bytes("bench", room)
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            result = manager.process_frame_bytes("bench", room)
+        classroom_ms = (time.perf_counter() - started) / args.iterations * 1000.0
+        seated = sum(1 for track, _ in result.faces if track.student_id)
+        tracks = len({track.track_id for track, _ in result.faces})
+    finally:
+        manager.close()
+
+    service = FrameProcessingService()
+    try:
+        for index, frame in enumerate(singles):
+            service.process_frame_bytes(frame, "", f"bench-{index}")
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            for index, frame in enumerate(singles):
+                service.process_frame_bytes(frame, "", f"bench-{index}")
+        per_student_ms = (time.perf_counter() - started) / args.iterations * 1000.0
+    finally:
+        service.close()
+
+    print(f"{args.seats} seats, {args.iterations} iterations")
+    print(f"classroom   {classroom_ms:7.2f} ms/frame  {len(result.faces)} faces, {tracks} tracks, {seated} seated, absent {result.absent_students}")
+    print(f"per-student {per_student_ms:7.2f} ms/round ({per_student_ms / args.seats:.2f} ms/student)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from ml_logic.landmark_constants import (
+    LEFT_IRIS,
+    RIGHT_IRIS,
+    LEFT_EYE_LANDMARKS,
+    RIGHT_EYE_LANDMARKS,
+    NUM_FACE_LANDMARKS,
+)
+from ml_logic.face_mesh_pipeline import FaceMeshPipeline
+from utils import gaze
+from utils.face_metrics import EyeMetrics, extract_face_features
+
+def make_landmarks(seed: int = 0):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0.3, 0.7, size=(NUM_FACE_LANDMARKS, 3))
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+    except ImportError:
+        from types import SimpleNamespace
+        return [SimpleNamespace(x=x, y=y, z=z) for x, y, z in points.tolist()]
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in points.tolist():
+        landmark_list.landmark.add(x=x, y=y, z=z)
+    return landmark_list
+
+def landmark_sequence(landmarks):
+    return getattr(landmarks, "landmark", landmarks)
+
+class ScalarEyeMetrics(EyeMetrics):
+    def smooth_ear(self, left_ear: float, right_ear: float):
+        self.left_ear_history.append(left_ear)
+        self.right_ear_history.append(right_ear)
+        return float(np.mean(self.left_ear_history)), float(np.mean(self.right_ear_history))
+
+def extract_face_features_scalar(landmarks, w: int, h: int, eye_metrics: EyeMetrics) -> dict:
+    features = {}
+    left_eye_coords = gaze.get_landmark_coords(landmarks, LEFT_EYE_LANDMARKS, w, h)
+    right_eye_coords = gaze.get_landmark_coords(landmarks, RIGHT_EYE_LANDMARKS, w, h)
+    left_ear = eye_metrics.calculate_eye_aspect_ratio(left_eye_coords) if left_eye_coords is not None else 0.0
+    right_ear = eye_metrics.calculate_eye_aspect_ratio(right_eye_coords) if right_eye_coords is not None else 0.0
+    left_ear, right_ear = eye_metrics.smooth_ear(left_ear, right_ear)
+    features['left_eye_aspect_ratio'] = left_ear
+    features['right_eye_aspect_ratio'] = right_ear
+    features['eyes_open'] = eye_metrics.are_eyes_open(left_ear, right_ear)
+    left_iris = gaze.get_iris_center(landmarks, LEFT_IRIS, w, h)
+    right_iris = gaze.get_iris_center(landmarks, RIGHT_IRIS, w, h)
+
+    def _normalized_iris(eye_coords: Optional[np.ndarray], iris_center: Optional[np.ndarray]):
+        if eye_coords is None or iris_center is None:
+            return None, None
+        eye_center = np.mean(eye_coords, axis=0)
+        min_xy = np.min(eye_coords, axis=0)
+        max_xy = np.max(eye_coords, axis=0)
+        bbox_size = np.maximum(max_xy - min_xy, 1.0)
+        denom = max(bbox_size[0], bbox_size[1], 1.0)
+        norm = (iris_center - eye_center) / denom
+        return float(norm[0]), float(norm[1])
+
+    lx, ly = _normalized_iris(left_eye_coords, left_iris)
+    rx, ry = _normalized_iris(right_eye_coords, right_iris)
+    features['left_iris_x_normalized'] = lx
+    features['left_iris_y_normalized'] = ly
+    features['right_iris_x_normalized'] = rx
+    features['right_iris_y_normalized'] = ry
+    return features
+
+def landmark_bbox_scalar(landmarks):
+    xs = [lm.x for lm in landmarks]
+    ys = [lm.y for lm in landmarks]
+    return (max(0.0, min(xs)), max(0.0, min(ys)), min(1.0, max(xs)), min(1.0, max(ys)))
+
+def process_landmarks_before(landmarks, w: int, h: int, eye_metrics: EyeMetrics):
+    sequence = landmark_sequence(landmarks)
+    return extract_face_features_scalar(sequence, w, h, eye_metrics), landmark_bbox_scalar(sequence)
+
+def process_landmarks_after(landmarks, w: int, h: int, eye_metrics: EyeMetrics):
+    points = gaze.landmarks_to_array(landmarks)
+    return extract_face_features(points, w, h, eye_metrics), FaceMeshPipeline._landmark_bbox(points)
+
+def check_equivalence(samples: int, w: int, h: int) -> float:
+    worst = 0.0
+    before_metrics, after_metrics = ScalarEyeMetrics(), EyeMetrics()
+    for seed in range(samples):
+        landmarks = make_landmarks(seed)
+        before, before_bbox = process_landmarks_before(landmarks, w, h, before_metrics)
+        after, after_bbox = process_landmarks_after(landmarks, w, h, after_metrics)
+        worst = max(worst, max(abs(a - b) for a, b in zip(before_bbox, after_bbox)))
+        for key, value in before.items():
+            if isinstance(value, bool):
+                assert value == after[key], key
+            else:
+                worst = max(worst, abs(float(value) - float(after[key])))
+    return worst
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-frame cost of landmark post-processing (features and face box)")
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    landmarks = make_landmarks()
+    cases = {
+        "before (per-landmark lists)": lambda: process_landmarks_before(landmarks, args.width, args.height, ScalarEyeMetrics()),
+        "after (vectorized)": lambda: process_landmarks_after(landmarks, args.width, args.height, EyeMetrics()),
+    }
+    results = {}
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat)) / args.number
+        results[name] = best
+        print(f"{name:30s} {best * 1e6:8.1f} us/frame")
+    before, after = results.values()
+    print(f"{'speedup':30s} {before / after:8.2f}x")
+    print(f"{'max abs feature difference':30s} {check_equivalence(50, args.width, args.height):.2e}")
+
+if __name__ == "__main__":
+    main()
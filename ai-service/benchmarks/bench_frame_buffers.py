@@ -0,0 +1,95 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from ml_logic.face_mesh_pipeline import FaceMeshPipeline
+from ml_logic.landmark_backends import LANDMARK_BACKENDS
+from services.frame_processor import FrameProcessingService
+from services.tracking_sessions import TrackingSessionManager
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "corpus"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+def load_frames(corpus: Path, limit: int) -> List[bytes]:
+    frames = [path.read_bytes() for path in sorted(corpus.glob("*.jpg"))[:limit or None]]
+    if not frames:
+        raise SystemExit(f"No frames in {corpus}; run build_corpus.py first")
+    return frames
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * PAGE_SIZE
+
+def run(service: FrameProcessingService, frames: List[bytes], iterations: int, students: int) -> Dict:
+    for index, frame in enumerate(frames):
+        service.process_frame_bytes(frame, "", f"bench-{index % students}")
+
+    started = time.perf_counter()
+    for index in range(iterations):
+        service.process_frame_bytes(frames[index % len(frames)], "", f"bench-{index % students}")
+    elapsed = time.perf_counter() - started
+
+    rss = []
+    for index in range(iterations):
+        service.process_frame_bytes(frames[index % len(frames)], "", f"bench-{index % students}")
+        if index % max(1, iterations // 20) == 0:
+            rss.append(rss_bytes())
+
+    tracemalloc.start()
+    peaks = []
+    for index in range(min(iterations, 200)):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        service.process_frame_bytes(frames[index % len(frames)], "", f"bench-{index % students}")
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return {
+        "ms_per_frame": elapsed / iterations * 1000.0,
+        "peak_kib_per_frame": sum(peaks) / len(peaks) / 1024.0,
+        "rss_start_mib": rss[0] / 2 ** 20,
+        "rss_end_mib": rss[-1] / 2 ** 20,
+        "rss_spread_mib": (max(rss) - min(rss)) / 2 ** 20,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure per-frame latency, transient allocations and RSS drift of the frame hot path")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--limit", type=int, default=64)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--students", type=int, default=4)
+    parser.add_argument("--backends", default=",".join(LANDMARK_BACKENDS))
+    args = parser.parse_args()
+
+    frames = load_frames(args.corpus, args.limit)
+    print(f"{len(frames)} frames from {args.corpus}, {args.iterations} iterations, {args.students} students")
+    for backend in args.backends.split(","):
+        service = FrameProcessingService(
+            tracking_sessions=TrackingSessionManager(
+                max_sessions=args.students,
+                idle_ttl=300.0,
+                pipeline_factory=lambda: FaceMeshPipeline(static_image_mode=False, backend=backend)
+            )
+        )
+        try:
+            result = run(service, frames, args.iterations, args.students)
+        except Exception as e:
+            print(f"{backend:10s} failed: {e}")
+            continue
+        finally:
+            service.close()
+        print(
+            f"{backend:10s} {result['ms_per_frame']:7.2f} ms/frame "
+            f"peak {result['peak_kib_per_frame']:8.1f} KiB/frame "
+            f"rss {result['rss_start_mib']:7.1f} -> {result['rss_end_mib']:7.1f} MiB "
+            f"(spread {result['rss_spread_mib']:.1f} MiB)"
+        )
+
+if __name__ == "__main__":
+    main()
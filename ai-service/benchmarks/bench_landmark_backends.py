@@ -0,0 +1,93 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from ml_logic.face_mesh_pipeline import FaceMeshError, FaceMeshPipeline
+from ml_logic.landmark_backends import LANDMARK_BACKENDS
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "corpus"
+IRIS_KEYS = ("left_iris_x_normalized", "left_iris_y_normalized", "right_iris_x_normalized", "right_iris_y_normalized")
+
+def load_frames(corpus: Path, limit: int) -> List[np.ndarray]:
+    frames = []
+    for path in sorted(corpus.glob("*.jpg"))[:limit or None]:
+        frame = cv2.imread(str(path))
+        if frame is not None:
+            frames.append(frame)
+    if not frames:
+        raise SystemExit(f"No frames in {corpus}; run build_corpus.py first")
+    return frames
+
+def run_batches(pipeline: FaceMeshPipeline, frames: List[np.ndarray], batch_size: int, rounds: int) -> Dict:
+    results = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        results = []
+        for start in range(0, len(frames), batch_size):
+            batch = frames[start:start + batch_size]
+            if batch_size == 1:
+                results.append(pipeline.process(batch[0]))
+            else:
+                results.extend(pipeline.process_batch(batch))
+    elapsed = (time.perf_counter() - started) / rounds
+    return {"ms_per_frame": elapsed / len(frames) * 1000.0, "fps": len(frames) / elapsed, "results": results}
+
+def compare(reference: List[Dict], results: List[Dict]) -> str:
+    detected = sum(a["face_detected"] == b["face_detected"] for a, b in zip(reference, results))
+    both = [(a["face_features"], b["face_features"]) for a, b in zip(reference, results) if a["face_detected"] and b["face_detected"]]
+    eyes = sum(a.get("eyes_open") == b.get("eyes_open") for a, b in both)
+    offsets = [abs(a[key] - b[key]) for a, b in both for key in IRIS_KEYS if a.get(key) is not None and b.get(key) is not None]
+    return (
+        f"face agreement {detected}/{len(reference)}, eyes_open agreement {eyes}/{len(both)}, "
+        f"mean iris offset diff {np.mean(offsets) if offsets else float('nan'):.3f}"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare landmark backends and the effect of batching on CPU throughput")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--limit", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--backends", default=",".join(LANDMARK_BACKENDS))
+    args = parser.parse_args()
+
+    frames = load_frames(args.corpus, args.limit)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+    print(f"{len(frames)} frames from {args.corpus}")
+
+    reference = None
+    for backend in args.backends.split(","):
+        try:
+            pipeline = FaceMeshPipeline(
+                static_image_mode=True,
+                backend=backend,
+                num_threads=args.threads,
+                max_batch=max(batch_sizes)
+            )
+        except Exception as e:
+            print(f"{backend:10s} unavailable: {e}")
+            continue
+        try:
+            for batch_size in batch_sizes if backend != "mediapipe" else [1]:
+                run_batches(pipeline, frames, batch_size, 1)
+                run = run_batches(pipeline, frames, batch_size, args.rounds)
+                print(f"{backend:10s} batch {batch_size:3d} {run['ms_per_frame']:8.2f} ms/frame {run['fps']:8.1f} fps")
+                if reference is None:
+                    reference = run["results"]
+                elif batch_size == batch_sizes[0]:
+                    print(f"{'':10s} vs {args.backends.split(',')[0]}: {compare(reference, run['results'])}")
+        except FaceMeshError as e:
+            print(f"{backend:10s} failed: {e}")
+        finally:
+            pipeline.close()
+
+if __name__ == "__main__":
+    main()
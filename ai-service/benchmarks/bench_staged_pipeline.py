@@ -0,0 +1,82 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from ml_logic.pipeline_pool import FaceMeshPipelinePool
+from services.frame_processor import FrameProcessingService
+from services.staged_frame_service import StagedFrameService
+from services.tracking_sessions import TrackingSessionManager
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "corpus"
+
+def load_frames(corpus: Path, limit: int) -> List[bytes]:
+    frames = [path.read_bytes() for path in sorted(corpus.glob("*.jpg"))[:limit or None]]
+    if not frames:
+        raise SystemExit(f"No frames in {corpus}; run build_corpus.py first")
+    return frames
+
+def run_clients(service: FrameProcessingService, frames: List[bytes], clients: int, rounds: int) -> Dict:
+    def client(index: int) -> int:
+        student_id = f"bench-{index}"
+        count = 0
+        for _ in range(rounds):
+            for frame in frames[index::clients]:
+                service.process_frame_bytes(frame, "", student_id)
+                count += 1
+        return count
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        total = sum(executor.map(client, range(clients)))
+    elapsed = time.perf_counter() - started
+    return {"frames": total, "fps": total / elapsed, "ms_per_frame": elapsed / total * 1000.0}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the thread and staged frame services under concurrent clients")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--limit", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--decode-workers", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=4)
+    args = parser.parse_args()
+
+    frames = load_frames(args.corpus, args.limit)
+    print(f"{len(frames)} frames from {args.corpus}, {args.clients} clients")
+
+    backends = {
+        "thread": lambda: FrameProcessingService(
+            FaceMeshPipelinePool(args.pool_size),
+            TrackingSessionManager(max_sessions=args.clients, idle_ttl=300.0)
+        ),
+        "staged": lambda: StagedFrameService(
+            decode_workers=args.decode_workers,
+            inference_workers=args.pool_size,
+            queue_size=args.queue_size,
+            submit_timeout=30.0,
+            pipeline_pool=FaceMeshPipelinePool(args.pool_size),
+            tracking_sessions=TrackingSessionManager(max_sessions=args.clients, idle_ttl=300.0)
+        ),
+    }
+    for name, factory in backends.items():
+        service = factory()
+        try:
+            run_clients(service, frames[:args.clients], args.clients, 1)
+            run = run_clients(service, frames, args.clients, args.rounds)
+            print(f"{name:8s} {run['ms_per_frame']:8.2f} ms/frame {run['fps']:8.1f} fps")
+            for stage, stats in service.health().get("stages", {}).items():
+                print(
+                    f"{'':8s} {stage:10s} workers {stats['workers']:2d} utilization {stats['utilization']:6.1%} "
+                    f"busy {stats['busy_seconds']:6.2f}s blocked {stats['blocked_seconds']:6.2f}s"
+                )
+        finally:
+            service.close()
+
+if __name__ == "__main__":
+    main()
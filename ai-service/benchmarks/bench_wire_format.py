@@ -0,0 +1,72 @@
+import argparse
+import base64
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import cv2
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from fastapi.encoders import jsonable_encoder
+
+from endpoints.attention import AttentionResponse, FrameRequest, attention_payload, frame_from_request
+from endpoints.wire_format import frame_from_message, packb, parse_json_model, unpackb
+from utils.warmup_frames import encode_frames, synthetic_frames
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-frame wire cost of the JSON and MessagePack analyze contracts")
+    parser.add_argument("--image", default="")
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--number", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.image:
+        ok, encoded = cv2.imencode(".jpg", cv2.imread(args.image), [cv2.IMWRITE_JPEG_QUALITY, args.quality])
+        image = encoded.tobytes()
+    else:
+        image = encode_frames(synthetic_frames(1), quality=args.quality)[0]
+    result = {
+        "attention_label": "attentive",
+        "face_detected": True,
+        "status": "success",
+        "processing_timestamp": {"start": 1792345339.4800065, "end": 1792345339.5220335, "duration": 0.04202699661254883},
+        "cached": False,
+        "next_capture_interval": 0.25,
+    }
+    json_request = json.dumps({
+        "studentId": "student-0001",
+        "frameId": "000123",
+        "frameBase64": base64.b64encode(image).decode(),
+        "timestamp": "2026-10-18T09:00:00.000000+00:00",
+    }).encode()
+    msgpack_request = packb({
+        "studentId": "student-0001",
+        "frameId": "000123",
+        "frame": image,
+        "timestamp": "2026-10-18T09:00:00.000000+00:00",
+    })
+
+    def json_round_trip():
+        frame = frame_from_request(parse_json_model(json_request, FrameRequest))
+        base64.b64decode(frame.frame_base64, validate=True)
+        response = AttentionResponse(**attention_payload(frame.student_id, frame.frame_id, result))
+        return json.dumps(jsonable_encoder(response)).encode()
+
+    def msgpack_round_trip():
+        frame = frame_from_message(unpackb(msgpack_request))
+        return packb(attention_payload(frame.student_id, frame.frame_id, result))
+
+    cases = {"json + pydantic": (json_round_trip, len(json_request)), "msgpack": (msgpack_round_trip, len(msgpack_request))}
+    results = {}
+    for name, (fn, request_bytes) in cases.items():
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat)) / args.number
+        results[name] = best
+        print(f"{name:20s} {best * 1e6:8.1f} us/frame  request {request_bytes:7d} B  response {len(fn()):4d} B")
+    before, after = results.values()
+    print(f"{'speedup':20s} {before / after:8.2f}x")
+
+if __name__ == "__main__":
+    main()
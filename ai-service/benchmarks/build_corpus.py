@@ -0,0 +1,194 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from ml_logic.face_mesh_pipeline import FaceMeshPipeline
+from utils.gaze import landmarks_to_array
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "corpus"
+
+def parse_size(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+def iter_source_frames(source: Path, video_stride: int, max_frames: int) -> Iterator[Tuple[str, np.ndarray]]:
+    if source.is_dir():
+        for path in sorted(source.iterdir()):
+            yield from iter_source_frames(path, video_stride, max_frames)
+        return
+    if source.suffix.lower() in IMAGE_SUFFIXES:
+        frame = cv2.imread(str(source))
+        if frame is not None:
+            yield source.stem, frame
+        return
+    capture = cv2.VideoCapture(str(source))
+    index = emitted = 0
+    try:
+        while emitted < max_frames:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if index % video_stride == 0:
+                yield f"{source.stem}-{index:06d}", frame
+                emitted += 1
+            index += 1
+    finally:
+        capture.release()
+
+def iter_webcam_frames(device: int, count: int, interval: int) -> Iterator[Tuple[str, np.ndarray]]:
+    capture = cv2.VideoCapture(device)
+    if not capture.isOpened():
+        raise SystemExit(f"Could not open webcam device {device}")
+    index = emitted = 0
+    try:
+        while emitted < count:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if index % interval == 0:
+                yield f"webcam-{emitted:04d}", frame
+                emitted += 1
+            index += 1
+    finally:
+        capture.release()
+
+def synthetic_frames(sizes: List[Tuple[int, int]], count: int, seed: int) -> Iterator[Tuple[str, np.ndarray]]:
+    rng = np.random.default_rng(seed)
+    for width, height in sizes:
+        for i in range(count):
+            if i % 2:
+                frame = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+            else:
+                ramp = np.linspace(0, 255, width, dtype=np.float32)
+                frame = np.repeat(np.repeat(ramp[None, :, None], height, axis=0), 3, axis=2)
+                frame = (frame * rng.uniform(0.3, 1.0, size=3)).astype(np.uint8)
+            yield f"synthetic-{width}x{height}-{i:03d}", frame
+
+class FaceEditor:
+    def __init__(self):
+        import mediapipe as mp
+        self._face_mesh_module = mp.solutions.face_mesh
+        self._face_mesh = self._face_mesh_module.FaceMesh(static_image_mode=True, refine_landmarks=True)
+        self._eye_indices = [
+            sorted({i for connection in connections for i in connection})
+            for connections in (self._face_mesh_module.FACEMESH_LEFT_EYE, self._face_mesh_module.FACEMESH_RIGHT_EYE)
+        ]
+
+    def close(self) -> None:
+        self._face_mesh.close()
+
+    def landmarks(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        result = self._face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if not result.multi_face_landmarks:
+            return None
+        h, w = frame.shape[:2]
+        return landmarks_to_array(result.multi_face_landmarks[0])[:, :2] * (w, h)
+
+    def close_eyes(self, frame: np.ndarray, points: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        edited = frame.copy()
+        for indices in self._eye_indices:
+            eye = points[indices]
+            hull = cv2.convexHull(eye.astype(np.int32))
+            x, y, bw, bh = cv2.boundingRect(hull)
+            cheek = frame[min(h - 1, y + 2 * bh):min(h, y + 3 * bh), x:x + bw].reshape(-1, 3)
+            color = np.median(cheek, axis=0) if len(cheek) else frame[y:y + bh, x:x + bw].reshape(-1, 3).mean(axis=0)
+            mask = np.zeros((h, w), np.uint8)
+            cv2.fillConvexPoly(mask, hull, 255)
+            edited[cv2.dilate(mask, np.ones((5, 5), np.uint8)) > 0] = color
+            left = tuple(int(v) for v in eye[eye[:, 0].argmin()])
+            right = tuple(int(v) for v in eye[eye[:, 0].argmax()])
+            cv2.line(edited, left, right, (40, 40, 60), 2)
+        return cv2.GaussianBlur(edited, (3, 3), 0)
+
+    @staticmethod
+    def remove_face(frame: np.ndarray, points: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        x0, y0 = np.maximum(points.min(axis=0) - 0.15 * np.ptp(points, axis=0), 0).astype(int)
+        x1, y1 = np.minimum(points.max(axis=0) + 0.15 * np.ptp(points, axis=0), (w, h)).astype(int)
+        edited = frame.copy()
+        region = edited[y0:y1, x0:x1]
+        small = cv2.resize(region, (max(1, (x1 - x0) // 24), max(1, (y1 - y0) // 24)), interpolation=cv2.INTER_AREA)
+        edited[y0:y1, x0:x1] = cv2.resize(small, (x1 - x0, y1 - y0), interpolation=cv2.INTER_NEAREST)
+        return edited
+
+def classify(pipeline: FaceMeshPipeline, frame: np.ndarray) -> str:
+    result = pipeline.process(frame)
+    if not result.get("face_detected"):
+        return "no_face"
+    if result.get("face_features", {}).get("eyes_open") is False:
+        return "eyes_closed"
+    return "face"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build a replayable frame corpus for the load-test harness")
+    parser.add_argument("--source", action="append", default=[], help="Image, video or directory of recorded frames")
+    parser.add_argument("--webcam-frames", type=int, default=0, help="Record this many frames from a webcam")
+    parser.add_argument("--webcam-device", type=int, default=0)
+    parser.add_argument("--webcam-interval", type=int, default=5)
+    parser.add_argument("--video-stride", type=int, default=15)
+    parser.add_argument("--max-per-source", type=int, default=50)
+    parser.add_argument("--synthetic-sizes", default="640x480,1280x720")
+    parser.add_argument("--synthetic-count", type=int, default=4)
+    parser.add_argument("--no-variants", action="store_true", help="Skip eyes-closed and face-removed variants")
+    parser.add_argument("--quality", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    pipeline = FaceMeshPipeline(static_image_mode=True)
+    editor = FaceEditor()
+    manifest = []
+
+    def save(name: str, frame: np.ndarray, origin: str) -> None:
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, args.quality])
+        if not ok:
+            return
+        path = args.output / f"{name}.jpg"
+        path.write_bytes(encoded.tobytes())
+        manifest.append({
+            "file": path.name,
+            "origin": origin,
+            "category": classify(pipeline, frame),
+            "width": frame.shape[1],
+            "height": frame.shape[0],
+            "bytes": len(encoded),
+        })
+
+    recorded = [iter_source_frames(Path(source), args.video_stride, args.max_per_source) for source in args.source]
+    if args.webcam_frames:
+        recorded.append(iter_webcam_frames(args.webcam_device, args.webcam_frames, args.webcam_interval))
+    try:
+        for frames in recorded:
+            for name, frame in frames:
+                save(name, frame, "recorded")
+                if args.no_variants:
+                    continue
+                points = editor.landmarks(frame)
+                if points is not None:
+                    save(f"{name}-eyes-closed", editor.close_eyes(frame, points), "synthetic")
+                    save(f"{name}-no-face", editor.remove_face(frame, points), "synthetic")
+        sizes = [parse_size(size) for size in args.synthetic_sizes.split(",") if size]
+        for name, frame in synthetic_frames(sizes, args.synthetic_count, args.seed):
+            save(name, frame, "synthetic")
+    finally:
+        editor.close()
+        pipeline.close()
+
+    (args.output / "manifest.json").write_text(json.dumps({"frames": manifest}, indent=2))
+    categories = {}
+    for entry in manifest:
+        categories[entry["category"]] = categories.get(entry["category"], 0) + 1
+    print(f"Wrote {len(manifest)} frames to {args.output}: {categories}")
+
+if __name__ == "__main__":
+    main()
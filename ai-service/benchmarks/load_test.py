@@ -0,0 +1,308 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+sys.path.insert(0, str(APP_DIR))
+os.environ.setdefault("CALIBRATION_DB_PATH", "")
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "corpus"
+DEFAULT_RESULTS = Path(__file__).resolve().parent / "results"
+LEVELS = ("service", "app", "server")
+
+Send = Callable[["CorpusFrame", str, str], Awaitable[Tuple[int, bool]]]
+
+class CorpusFrame:
+    def __init__(self, name: str, category: str, origin: str, data: bytes):
+        self.name = name
+        self.category = category
+        self.origin = origin
+        self.data = data
+        self.base64 = base64.b64encode(data).decode("ascii")
+
+def load_corpus(path: Path) -> List[CorpusFrame]:
+    manifest = json.loads((path / "manifest.json").read_text())
+    frames = [
+        CorpusFrame(entry["file"], entry["category"], entry.get("origin", "recorded"), (path / entry["file"]).read_bytes())
+        for entry in manifest["frames"]
+    ]
+    if not frames:
+        raise SystemExit(f"Corpus at {path} is empty; run build_corpus.py first")
+    return frames
+
+def process_tree_cpu(pid: int) -> Optional[float]:
+    proc = Path("/proc")
+    if not proc.exists():
+        return time.process_time() if pid == os.getpid() else None
+    ticks = os.sysconf("SC_CLK_TCK")
+    children: Dict[int, List[int]] = {}
+    usage: Dict[int, float] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        fields = stat[stat.rindex(")") + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(entry.name))
+        usage[int(entry.name)] = (int(fields[11]) + int(fields[12])) / ticks
+    if pid not in usage:
+        return None
+    total, stack = 0.0, [pid]
+    while stack:
+        current = stack.pop()
+        total += usage.get(current, 0.0)
+        stack.extend(children.get(current, []))
+    return total
+
+def percentiles(latencies: List[float]) -> Dict[str, Optional[float]]:
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+    values = np.asarray(latencies) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(values.mean()),
+        "max_ms": float(values.max()),
+    }
+
+async def drive(
+    send: Send,
+    frames: List[CorpusFrame],
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    students: int,
+    cpu_pid: Optional[int]
+) -> Dict:
+    for i in range(warmup):
+        await send(frames[i % len(frames)], f"warmup-{i % students}", f"w{i}")
+
+    next_index = 0
+    latencies: List[float] = []
+    by_category: Dict[str, List[float]] = {}
+    statuses: Dict[str, int] = {}
+    cached = 0
+
+    async def worker() -> None:
+        nonlocal next_index, cached
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            frame = frames[index % len(frames)]
+            started = time.perf_counter()
+            status_code, was_cached = await send(frame, f"student-{index % students}", str(index))
+            elapsed = time.perf_counter() - started
+            statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+            if status_code == 200:
+                latencies.append(elapsed)
+                by_category.setdefault(frame.category, []).append(elapsed)
+                cached += was_cached
+
+    cpu_before = process_tree_cpu(cpu_pid) if cpu_pid else None
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    cpu_after = process_tree_cpu(cpu_pid) if cpu_pid else None
+
+    succeeded = len(latencies)
+    cpu_seconds = cpu_after - cpu_before if cpu_before is not None and cpu_after is not None else None
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "succeeded": succeeded,
+        "statuses": statuses,
+        "cached": cached,
+        "wall_seconds": wall,
+        "frames_per_second": succeeded / wall if wall else 0.0,
+        "cpu_seconds": cpu_seconds,
+        "cpu_ms_per_frame": cpu_seconds * 1000.0 / succeeded if cpu_seconds is not None and succeeded else None,
+        "latency": percentiles(latencies),
+        "by_category": {category: {"frames": len(values), **percentiles(values)} for category, values in sorted(by_category.items())},
+    }
+
+def frame_payload(frame: CorpusFrame, student_id: str, frame_id: str) -> Dict:
+    return {
+        "studentId": student_id,
+        "frameId": frame_id,
+        "frameBase64": frame.base64,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+async def run_service_level(frames: List[CorpusFrame], args, concurrency: int) -> Dict:
+    from core.initialization import ServiceInitializer
+    from ml_logic.face_mesh_pipeline import FaceMeshError
+    from ml_logic.pipeline_pool import PipelineUnavailableError
+
+    service = ServiceInitializer.create_attention_service()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def send(frame: CorpusFrame, student_id: str, frame_id: str) -> Tuple[int, bool]:
+        payload = frame_payload(frame, student_id, frame_id)
+        try:
+            result = await loop.run_in_executor(
+                executor,
+                service.analyze_frame_from_base64,
+                payload["studentId"],
+                payload["frameId"],
+                payload["frameBase64"],
+                payload["timestamp"]
+            )
+        except PipelineUnavailableError:
+            return 503, False
+        except FaceMeshError:
+            return 422, False
+        except ValueError:
+            return 400, False
+        return 200, bool(result.get("cached"))
+
+    try:
+        return await drive(send, frames, concurrency, args.requests, args.warmup, args.students, os.getpid())
+    finally:
+        executor.shutdown(wait=True)
+        service.close()
+
+async def run_http_level(send_client, frames: List[CorpusFrame], args, concurrency: int, cpu_pid: Optional[int]) -> Dict:
+    async def send(frame: CorpusFrame, student_id: str, frame_id: str) -> Tuple[int, bool]:
+        if args.raw:
+            response = await send_client.post(
+                "/api/attention/analyze-raw",
+                content=frame.data,
+                headers={"content-type": "image/jpeg", "x-student-id": student_id, "x-frame-id": frame_id}
+            )
+        else:
+            response = await send_client.post("/api/attention/analyze", json=frame_payload(frame, student_id, frame_id))
+        cached = response.status_code == 200 and bool(response.json().get("cached"))
+        return response.status_code, cached
+
+    return await drive(send, frames, concurrency, args.requests, args.warmup, args.students, cpu_pid)
+
+async def run_app_level(frames: List[CorpusFrame], args, concurrency: int) -> Dict:
+    import httpx
+    from core.initialization import init_app, shutdown_app
+    from main import create_application
+
+    app = create_application()
+    init_app(app)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            return await run_http_level(client, frames, args, concurrency, os.getpid())
+    finally:
+        await shutdown_app(app)
+
+async def run_server_level(frames: List[CorpusFrame], args, concurrency: int) -> Dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        return await run_http_level(client, frames, args, concurrency, args.server_pid)
+
+RUNNERS = {
+    "service": run_service_level,
+    "app": run_app_level,
+    "server": run_server_level,
+}
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=APP_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def service_config() -> Dict:
+    from core import config
+    return {
+        name: getattr(config, name) for name in dir(config)
+        if name.isupper() and isinstance(getattr(config, name), (int, float, str, bool))
+    }
+
+def print_run(level: str, run: Dict) -> None:
+    latency = run["latency"]
+    cpu = run["cpu_ms_per_frame"]
+
+    def fmt(value: Optional[float]) -> str:
+        return f"{value:8.1f}" if value is not None else "       -"
+
+    print(
+        f"{level:8s} c={run['concurrency']:<3d} ok={run['succeeded']:<5d} "
+        f"fps={run['frames_per_second']:7.1f} p50={fmt(latency['p50_ms'])} "
+        f"p95={fmt(latency['p95_ms'])} p99={fmt(latency['p99_ms'])} cpu/frame={fmt(cpu)} ms "
+        f"statuses={run['statuses']}"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a frame corpus against the attention service and record latency and throughput")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--level", action="append", choices=LEVELS, help="Repeatable; defaults to service and app")
+    parser.add_argument("--concurrency", default="1,4", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per run")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--students", type=int, default=8, help="Distinct student ids to spread frames over")
+    parser.add_argument("--raw", action="store_true", help="Use /analyze-raw instead of base64 JSON for HTTP levels")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server base URL for the server level")
+    parser.add_argument("--server-pid", type=int, help="Server process id, to report CPU per frame for the server level")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", type=Path, help="Result JSON path; defaults to results/<timestamp>.json")
+    args = parser.parse_args()
+
+    frames = load_corpus(args.corpus)
+    levels = args.level or ["service", "app"]
+    concurrencies = [int(value) for value in args.concurrency.split(",") if value]
+
+    runs = []
+    for level in levels:
+        for concurrency in concurrencies:
+            run = asyncio.run(RUNNERS[level](frames, args, concurrency))
+            run["level"] = level
+            runs.append(run)
+            print_run(level, run)
+
+    categories: Dict[str, int] = {}
+    for frame in frames:
+        categories[frame.category] = categories.get(frame.category, 0) + 1
+    created = datetime.now(timezone.utc)
+    report = {
+        "created": created.isoformat(),
+        "git_commit": git_commit(),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": service_config(),
+        "corpus": {"path": str(args.corpus), "frames": len(frames), "categories": categories},
+        "settings": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "students": args.students,
+            "raw": args.raw,
+            "url": args.url if "server" in levels else None,
+        },
+        "runs": runs,
+    }
+    output = args.output or DEFAULT_RESULTS / f"{created.strftime('%Y%m%dT%H%M%SZ')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Saved results to {output}")
+
+if __name__ == "__main__":
+    main()
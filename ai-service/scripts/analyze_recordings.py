@@ -0,0 +1,337 @@
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+VIDEO_SUFFIXES = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v", ".mpg", ".mpeg", ".wmv"}
+
+FRAME_COLUMNS = {
+    "recording": "string",
+    "student_id": "string",
+    "frame_index": "int",
+    "video_seconds": "float",
+    "status": "string",
+    "face_detected": "bool",
+    "eyes_closed": "bool",
+    "attention_label": "string",
+    "calibration_stored": "bool",
+    "landmark_motion": "float",
+    "processing_ms": "float",
+    "error": "string",
+}
+STUDENT_COLUMNS = {
+    "recording": "string",
+    "student_id": "string",
+    "status": "string",
+    "frames": "int",
+    "errors": "int",
+    "attentive_ratio": "float",
+    "no_face": "int",
+    "eyes_closed": "int",
+    "duration_seconds": "float",
+    "longest_attentive_streak": "int",
+    "longest_inattentive_streak": "int",
+    "processing_seconds": "float",
+    "error": "string",
+}
+
+def find_recordings(paths: List[Path]) -> List[Path]:
+    recordings = []
+    for path in paths:
+        if path.is_dir():
+            children = sorted(path.iterdir())
+            if any(child.suffix.lower() in IMAGE_SUFFIXES for child in children):
+                recordings.append(path)
+            recordings.extend(find_recordings([
+                child for child in children
+                if child.is_dir() or child.suffix.lower() in VIDEO_SUFFIXES
+            ]))
+        elif path.suffix.lower() in VIDEO_SUFFIXES:
+            recordings.append(path)
+        elif path.exists():
+            print(f"Skipping {path}: not a video file or frame directory", file=sys.stderr)
+        else:
+            raise SystemExit(f"No such file or directory: {path}")
+    return recordings
+
+def iter_frames(
+    recording: Path,
+    stride: int,
+    max_frames: int,
+    image_fps: float
+) -> Iterator[Tuple[int, float, np.ndarray]]:
+    if recording.is_dir():
+        images = sorted(child for child in recording.iterdir() if child.suffix.lower() in IMAGE_SUFFIXES)
+        for index in range(0, len(images), stride)[:max_frames or None]:
+            frame = cv2.imread(str(images[index]))
+            if frame is not None:
+                yield index, index / image_fps, frame
+        return
+
+    capture = cv2.VideoCapture(str(recording))
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video {recording}")
+    index = emitted = 0
+    try:
+        while not max_frames or emitted < max_frames:
+            if index % stride:
+                if not capture.grab():
+                    break
+            else:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                yield index, capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, frame
+                emitted += 1
+            index += 1
+    finally:
+        capture.release()
+
+class RowWriter:
+    def __init__(self, path: Path, columns: Dict[str, str], output_format: str, batch_rows: int = 4096):
+        self.path = path
+        self.columns = columns
+        self.output_format = output_format
+        self.batch_rows = batch_rows
+        self._rows: List[Dict] = []
+        if output_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self._pa = pa
+            types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_()}
+            schema = pa.schema([(column, types[kind]) for column, kind in columns.items()])
+            self._writer = pq.ParquetWriter(str(path), schema)
+        else:
+            self._file = open(path, "w", newline="")
+            self._writer = csv.DictWriter(self._file, fieldnames=list(columns))
+            self._writer.writeheader()
+
+    def write(self, row: Dict) -> None:
+        if self.output_format == "parquet":
+            self._rows.append(row)
+            if len(self._rows) >= self.batch_rows:
+                self.flush()
+        else:
+            self._writer.writerow(row)
+
+    def flush(self) -> None:
+        if self.output_format == "parquet" and self._rows:
+            table = self._pa.Table.from_pylist(self._rows, schema=self._writer.schema)
+            self._writer.write_table(table)
+            self._rows = []
+
+    def append_file(self, path: Path) -> None:
+        if self.output_format == "parquet":
+            import pyarrow.parquet as pq
+            self.flush()
+            part = pq.ParquetFile(str(path))
+            for group in range(part.num_row_groups):
+                self._writer.write_table(part.read_row_group(group))
+        else:
+            with open(path, newline="") as part:
+                next(part, None)
+                shutil.copyfileobj(part, self._file)
+
+    def close(self) -> None:
+        self.flush()
+        if self.output_format == "parquet":
+            self._writer.close()
+        else:
+            self._file.close()
+
+def student_id_for(recording: Path) -> str:
+    return recording.stem if recording.is_file() else recording.name
+
+def analyze_recording(task: Tuple[Path, Path, str, int, int, float, int]) -> Dict:
+    recording, part_path, output_format, stride, max_frames, image_fps, batch_size = task
+
+    from ml_logic.pipeline_pool import FaceMeshPipelinePool
+    from services.attention_aggregates import AttentionAggregate
+    from services.attention_analysis import AttentionAnalysisService
+    from services.frame_processor import FrameProcessingService, create_pipeline
+    from services.tracking_sessions import TrackingSessionManager
+    from core import config
+
+    student_id = student_id_for(recording)
+    service = AttentionAnalysisService(
+        frame_service=FrameProcessingService(
+            pipeline_pool=FaceMeshPipelinePool(
+                size=1,
+                pipeline_factory=lambda: create_pipeline(static_image_mode=True)
+            ),
+            tracking_sessions=TrackingSessionManager(
+                max_sessions=1,
+                idle_ttl=float("inf"),
+                pipeline_factory=lambda: create_pipeline(static_image_mode=False),
+                smoothing_window=config.EAR_SMOOTHING_WINDOW
+            )
+        )
+    )
+    aggregate = AttentionAggregate((), 1, 0.0)
+    writer = RowWriter(part_path, FRAME_COLUMNS, output_format)
+    errors = 0
+    failure = None
+    started = time.perf_counter()
+
+    def score(batch: List[Tuple[int, float, np.ndarray]]) -> List[Tuple[int, float, object]]:
+        encoded = []
+        for index, seconds, frame in batch:
+            ok, buffer = cv2.imencode(".bmp", frame)
+            encoded.append((index, seconds, buffer.data if ok else None))
+        if len(batch) == 1 or any(data is None for _, _, data in encoded):
+            outcomes = []
+            for index, seconds, data in encoded:
+                try:
+                    if data is None:
+                        raise ValueError("Failed to encode frame")
+                    outcomes.append((index, seconds, service.analyze_frame(student_id, str(index), data, f"{seconds:.3f}")))
+                except Exception as e:
+                    outcomes.append((index, seconds, e))
+            return outcomes
+        results = service.analyze_frame_batch(
+            student_id,
+            [(str(index), data, f"{seconds:.3f}") for index, seconds, data in encoded]
+        )
+        return [(index, seconds, result) for (index, seconds, _), result in zip(encoded, results)]
+
+    def frame_batches() -> Iterator[List[Tuple[int, float, np.ndarray]]]:
+        batch: List[Tuple[int, float, np.ndarray]] = []
+        for item in iter_frames(recording, stride, max_frames, image_fps):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    try:
+        for index, seconds, result in (outcome for batch in frame_batches() for outcome in score(batch)):
+            row = {"recording": str(recording), "student_id": student_id, "frame_index": index, "video_seconds": seconds}
+            if isinstance(result, Exception):
+                errors += 1
+                row.update({"status": "error", "error": str(result)})
+                writer.write(row)
+                continue
+            eyes_closed = bool(result.get("eyes_closed", False))
+            aggregate.record(seconds, result["attention_label"], result["face_detected"], eyes_closed)
+            row.update({
+                "status": result["status"],
+                "face_detected": result["face_detected"],
+                "eyes_closed": eyes_closed,
+                "attention_label": result["attention_label"],
+                "calibration_stored": bool(result.get("calibration_stored", False)),
+                "landmark_motion": result.get("landmark_motion"),
+                "processing_ms": result["processing_timestamp"]["duration"] * 1000.0,
+            })
+            writer.write(row)
+    except Exception as e:
+        failure = f"{type(e).__name__}: {e}"
+    finally:
+        writer.close()
+        service.close()
+
+    summary = aggregate.summary(aggregate.last_seen)
+    return {
+        "recording": str(recording),
+        "student_id": student_id,
+        "status": "ok" if failure is None else "failed",
+        "frames": summary["frames"],
+        "errors": errors,
+        "attentive_ratio": summary["attentiveRatio"],
+        "no_face": summary["noFace"],
+        "eyes_closed": summary["eyesClosed"],
+        "duration_seconds": summary["durationSeconds"],
+        "longest_attentive_streak": summary["longestAttentiveStreak"],
+        "longest_inattentive_streak": summary["longestInattentiveStreak"],
+        "processing_seconds": time.perf_counter() - started,
+        "error": failure,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Score recorded lecture videos or frame directories offline")
+    parser.add_argument("paths", nargs="+", type=Path, help="Video files, frame directories, or directories of recordings")
+    parser.add_argument("--output-dir", type=Path, default=Path("offline_results"))
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--stride", type=int, default=1, help="Analyze every Nth frame")
+    parser.add_argument("--max-frames", type=int, default=0, help="Frames per recording after stride; 0 means all")
+    parser.add_argument("--image-fps", type=float, default=1.0, help="Capture rate assumed for frame directories")
+    parser.add_argument(
+        "--batch-size", type=int, default=1,
+        help="Frames per landmark inference call; >1 runs static-image batches (pays off with LANDMARK_BACKEND=tflite)"
+    )
+    args = parser.parse_args()
+
+    if args.stride < 1:
+        raise SystemExit("--stride must be at least 1")
+    if args.batch_size < 1:
+        raise SystemExit("--batch-size must be at least 1")
+    if args.image_fps <= 0:
+        raise SystemExit("--image-fps must be positive")
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+
+    recordings = find_recordings(args.paths)
+    if not recordings:
+        raise SystemExit("No recordings found")
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=args.output_dir) as parts_dir:
+        tasks = [
+            (
+                recording, Path(parts_dir) / f"{i:06d}.{args.format}", args.format,
+                args.stride, args.max_frames, args.image_fps, args.batch_size
+            )
+            for i, recording in enumerate(recordings)
+        ]
+        frames = RowWriter(args.output_dir / f"frames.{args.format}", FRAME_COLUMNS, args.format)
+        students = RowWriter(args.output_dir / f"students.{args.format}", STUDENT_COLUMNS, args.format)
+        workers = max(1, min(args.workers, len(tasks)))
+        total_frames = 0
+        failed = []
+        try:
+            with get_context("spawn").Pool(workers) as pool:
+                for task, summary in zip(tasks, pool.imap(analyze_recording, tasks)):
+                    frames.append_file(task[1])
+                    task[1].unlink()
+                    students.write(summary)
+                    total_frames += summary["frames"] + summary["errors"]
+                    ratio = summary["attentive_ratio"]
+                    if summary["error"] is not None:
+                        failed.append(summary["recording"])
+                        print(f"{summary['student_id']}: failed after {summary['frames']} frames: {summary['error']}", file=sys.stderr)
+                        continue
+                    print(
+                        f"{summary['student_id']}: {summary['frames']} frames, "
+                        f"{summary['errors']} errors, attentive "
+                        f"{'n/a' if ratio is None else f'{ratio:.1%}'} "
+                        f"in {summary['processing_seconds']:.1f}s"
+                    )
+        finally:
+            frames.close()
+            students.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Analyzed {total_frames} frames from {len(recordings)} recordings in {elapsed:.1f}s "
+          f"({total_frames / elapsed:.1f} fps) -> {args.output_dir}")
+    if failed:
+        raise SystemExit(f"{len(failed)} of {len(recordings)} recordings failed: {', '.join(failed)}")
+
+if __name__ == "__main__":
+    main()
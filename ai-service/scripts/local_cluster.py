@@ -0,0 +1,55 @@
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+
+def spawn(module: str, port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module}:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=APP_DIR,
+        env={**os.environ, **env}
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run several ai-service replicas behind the student-affinity router")
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--base-port", type=int, default=8001)
+    parser.add_argument("--router-port", type=int, default=8080)
+    parser.add_argument("--data-dir", default="data/cluster")
+    args = parser.parse_args()
+
+    urls = []
+    processes = []
+    for i in range(args.replicas):
+        port = args.base_port + i
+        urls.append(f"http://127.0.0.1:{port}")
+        processes.append(spawn("main", port, {
+            "PORT": str(port),
+            "CALIBRATION_DB_PATH": os.path.join(args.data_dir, f"replica-{port}.sqlite3"),
+        }))
+    router = spawn("router_main", args.router_port, {"ROUTER_REPLICAS": ",".join(urls)})
+    processes.append(router)
+    print(f"Router on http://127.0.0.1:{args.router_port} -> {', '.join(urls)}", flush=True)
+
+    try:
+        while router.poll() is None:
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from endpoints import attention
+from services.admission import (
+    AdmissionOverflowError,
+    AdmissionScheduler,
+    FrameExpiredError,
+    FrameSupersededError,
+    parse_frame_timestamp,
+)
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=2)
+    yield pool
+    pool.shutdown(wait=True)
+
+def seconds_ago(seconds: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+def blocker():
+    release = threading.Event()
+    return release, lambda: release.wait(5) and "blocked"
+
+async def started(scheduler: AdmissionScheduler, *submissions):
+    tasks = []
+    for student_id, fn in submissions:
+        tasks.append(asyncio.ensure_future(scheduler.submit(student_id, None, fn)))
+        await asyncio.sleep(0)
+    return tasks
+
+def test_parse_frame_timestamp_assumes_utc_and_ignores_garbage():
+    assert parse_frame_timestamp("2024-01-01T00:00:00") == parse_frame_timestamp("2024-01-01T00:00:00+00:00")
+    assert parse_frame_timestamp("yesterday") is None
+    assert parse_frame_timestamp(None) is None
+
+def test_client_timestamps_are_ignored_by_default(executor):
+    scheduler = AdmissionScheduler(executor, max_concurrency=1, deadline=1.0)
+    assert asyncio.run(scheduler.submit("a", seconds_ago(30), lambda: "ok")) == "ok"
+    assert scheduler.stats()["clock_skew_clamped"] == 0
+
+def test_stale_trusted_frame_expires_before_queueing(executor):
+    scheduler = AdmissionScheduler(
+        executor, max_concurrency=1, deadline=1.0, trust_client_timestamps=True, max_clock_skew=10.0
+    )
+    with pytest.raises(FrameExpiredError):
+        asyncio.run(scheduler.submit("a", seconds_ago(5), lambda: "ok"))
+    assert scheduler.stats()["shed"]["expired"] == 1
+
+def test_client_clock_skew_is_clamped(executor):
+    scheduler = AdmissionScheduler(
+        executor, max_concurrency=1, deadline=2.0, trust_client_timestamps=True, max_clock_skew=0.5
+    )
+    assert asyncio.run(scheduler.submit("a", seconds_ago(60), lambda: "ok")) == "ok"
+    assert scheduler.stats()["clock_skew_clamped"] == 1
+
+def test_newer_frame_supersedes_queued_frame_for_same_student(executor):
+    async def scenario():
+        scheduler = AdmissionScheduler(executor, max_concurrency=2, deadline=0)
+        release, wait = blocker()
+        running, queued = await started(scheduler, ("a", wait), ("a", lambda: "stale"))
+        latest = asyncio.ensure_future(scheduler.submit("a", None, lambda: "latest"))
+        with pytest.raises(FrameSupersededError):
+            await queued
+        release.set()
+        assert await running == "blocked"
+        assert await latest == "latest"
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["shed"]["superseded"] == 1
+    assert stats["pending"] == 0 and stats["running"] == 0
+
+def test_full_queue_sheds_the_oldest_student(executor):
+    async def scenario():
+        scheduler = AdmissionScheduler(executor, max_concurrency=1, deadline=0, max_pending=1)
+        release, wait = blocker()
+        running, oldest = await started(scheduler, ("a", wait), ("b", lambda: "b"))
+        newest = asyncio.ensure_future(scheduler.submit("c", None, lambda: "c"))
+        with pytest.raises(AdmissionOverflowError):
+            await oldest
+        release.set()
+        assert await running == "blocked"
+        assert await newest == "c"
+        return scheduler.stats()
+
+    assert asyncio.run(scenario())["shed"]["overflow"] == 1
+
+def test_queued_frame_expires_while_waiting(executor):
+    async def scenario():
+        scheduler = AdmissionScheduler(executor, max_concurrency=1, deadline=0.2)
+        release, wait = blocker()
+        running, queued = await started(scheduler, ("a", wait), ("b", lambda: "b"))
+        await asyncio.sleep(0.3)
+        release.set()
+        assert await running == "blocked"
+        with pytest.raises(FrameExpiredError):
+            await queued
+
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize("error, status_code", [
+    (FrameExpiredError("late"), 408),
+    (FrameSupersededError("newer"), 409),
+    (AdmissionOverflowError("full"), 503),
+])
+def test_admission_errors_map_to_http_status(monkeypatch, error, status_code):
+    class RejectingScheduler:
+        async def submit(self, *args):
+            raise error
+
+    monkeypatch.setattr(attention, "_scheduler", RejectingScheduler())
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(attention.run_analysis(lambda *args: {}, "s1", "f1", b"", seconds_ago(0)))
+    assert raised.value.status_code == status_code
@@ -0,0 +1,131 @@
+from types import SimpleNamespace
+
+import pytest
+
+from services import attention_aggregates
+from services.attention_aggregates import AttentionAggregate, AttentionAggregator, RollingWindow
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(attention_aggregates, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+def test_rolling_window_drops_expired_buckets():
+    window = RollingWindow(10.0, buckets=5)
+    window.add(100.0, (1, 1, 0, 0))
+    window.add(101.9, (1, 0, 1, 0))
+    window.add(104.0, (1, 1, 0, 1))
+    assert window.totals(104.0) == [3, 2, 1, 1]
+    assert window.totals(109.9) == [3, 2, 1, 1]
+    assert window.totals(110.0) == [1, 1, 0, 1]
+    assert window.totals(114.0) == [0, 0, 0, 0]
+
+def test_rolling_window_resets_after_a_long_gap():
+    window = RollingWindow(10.0, buckets=5)
+    window.add(100.0, (1, 1, 0, 0))
+    window.add(1000.0, (1, 0, 0, 0))
+    assert window.totals(1000.0) == [1, 0, 0, 0]
+
+def test_aggregate_tracks_streaks_and_idle_time():
+    aggregate = AttentionAggregate((60.0,), 60, 0.0)
+    for now, label in ((1.0, "attentive"), (2.0, "attentive"), (3.0, "attentive"), (4.0, "inattentive"), (6.0, "inattentive")):
+        aggregate.record(now, label, True, False)
+    aggregate.record(7.0, "attentive", False, True)
+
+    summary = aggregate.summary(10.0)
+    assert summary["frames"] == 6
+    assert summary["attentiveRatio"] == pytest.approx(4 / 6)
+    assert summary["noFace"] == 1
+    assert summary["eyesClosed"] == 1
+    assert summary["durationSeconds"] == 10.0
+    assert summary["idleSeconds"] == 3.0
+    assert summary["streak"] == {"label": "attentive", "frames": 1, "seconds": 3.0}
+    assert summary["longestAttentiveStreak"] == 3
+    assert summary["longestInattentiveStreak"] == 2
+    assert summary["windows"][0]["frames"] == 6
+
+def test_empty_aggregate_has_no_ratio():
+    summary = AttentionAggregate((60.0,), 60, 5.0).summary(5.0)
+    assert summary["attentiveRatio"] is None
+    assert summary["streak"] == {"label": None, "frames": 0, "seconds": 0.0}
+
+def test_record_returns_current_streak(clock):
+    aggregator = AttentionAggregator()
+    assert [aggregator.record("a", None, "attentive", True, False) for _ in range(3)] == [1, 2, 3]
+    assert aggregator.record("a", None, "inattentive", True, False) == 1
+
+def test_class_counts_follow_latest_label_and_membership(clock):
+    aggregator = AttentionAggregator()
+    aggregator.record("a", "math", "attentive", True, False)
+    aggregator.record("b", "math", "inattentive", True, False)
+    clock.now += 1.0
+    aggregator.record("b", "math", "attentive", True, False)
+
+    summary = aggregator.class_summary("math")
+    assert summary["students"] == 2
+    assert summary["attentiveStudents"] == 2
+    assert summary["frames"] == 3
+    assert "streak" not in summary
+
+    aggregator.record("a", "physics", "inattentive", True, False)
+    assert aggregator.class_summary("math")["students"] == 1
+    assert aggregator.class_summary("math")["attentiveStudents"] == 1
+    assert aggregator.class_summary("physics")["attentiveStudents"] == 0
+
+    assert aggregator.end_student("b")
+    assert aggregator.class_summary("math") is None
+    assert not aggregator.end_student("b")
+
+def test_least_recently_seen_student_is_evicted(clock):
+    aggregator = AttentionAggregator(max_students=2)
+    aggregator.record("a", "math", "attentive", True, False)
+    aggregator.record("b", None, "attentive", True, False)
+    aggregator.record("a", "math", "attentive", True, False)
+    aggregator.record("c", None, "attentive", True, False)
+
+    assert aggregator.student_summary("b") is None
+    assert aggregator.student_summary("a")["frames"] == 2
+    assert aggregator.stats()["evicted"] == 1
+
+    aggregator.record("d", None, "attentive", True, False)
+    assert aggregator.student_summary("a") is None
+    assert aggregator.class_summary("math") is None
+    assert aggregator.stats()["students"] == 2
+
+def test_idle_students_expire_on_sweep(clock):
+    aggregator = AttentionAggregator(idle_ttl=60.0, sweep_interval=10.0)
+    aggregator.record("a", "math", "attentive", True, False)
+    clock.now += 30.0
+    aggregator.record("b", "math", "attentive", True, False)
+
+    clock.now += 40.0
+    summary = aggregator.student_summary("a")
+    assert summary["idleSeconds"] == 70.0
+    assert summary["durationSeconds"] == 70.0
+
+    aggregator.record("b", "math", "inattentive", True, False)
+    assert aggregator.student_summary("a") is None
+    assert aggregator.class_summary("math")["students"] == 1
+    assert aggregator.stats()["evicted"] == 1
+
+def test_windows_report_recent_activity_only(clock):
+    aggregator = AttentionAggregator(windows=(300.0, 60.0), buckets=60)
+    aggregator.record("a", None, "attentive", True, False)
+    clock.now += 120.0
+    aggregator.record("a", None, "inattentive", False, False)
+
+    windows = aggregator.student_summary("a")["windows"]
+    assert [window["seconds"] for window in windows] == [60.0, 300.0]
+    assert windows[0]["frames"] == 1
+    assert windows[0]["attentiveRatio"] == 0.0
+    assert windows[0]["noFace"] == 1
+    assert windows[1]["frames"] == 2
+    assert windows[1]["attentiveRatio"] == 0.5
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from ml_logic.attention_classifier import (
+    IRIS_FEATURE_KEYS,
+    AttentionClassifier,
+    CalibrationTable,
+    FeatureBatch,
+)
+from services.attention_analysis import AttentionAnalysisService
+
+def random_frames(count: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for row in (np.round(rng.uniform(-0.6, 0.6, size=(count, 4)) * 20) / 20).tolist():
+        features = {key: None if rng.random() < 0.1 else value for key, value in zip(IRIS_FEATURE_KEYS, row)}
+        features['eyes_open'] = [True, True, False, None][rng.integers(4)]
+        detected = bool(rng.random() > 0.1)
+        frames.append({'face_detected': detected, 'face_features': features if rng.random() > 0.05 else {}})
+    return frames
+
+def random_calibration(rng):
+    if rng.random() < 0.4:
+        return None
+    left, right = (np.round(rng.uniform(0.0, 0.6, size=2) * 20) / 20).tolist()
+    return (None if rng.random() < 0.2 else left, None if rng.random() < 0.2 else right)
+
+def test_classify_batch_matches_the_scalar_path():
+    classifier = AttentionClassifier()
+    rng = np.random.default_rng(5)
+    frames = random_frames(2000)
+    calibrations = [random_calibration(rng) for _ in frames]
+    features = [frame['face_features'] for frame in frames]
+    detected = [frame['face_detected'] for frame in frames]
+
+    expected = [
+        classifier.classify_attention(feature, face_detected=flag, calibration_data=calibration)
+        for feature, flag, calibration in zip(features, detected, calibrations)
+    ]
+    actual = classifier.labels(classifier.classify_batch(
+        FeatureBatch.from_features(features, face_detected=detected),
+        CalibrationTable.from_calibrations(calibrations)
+    )).tolist()
+    assert actual == expected
+    assert 0 < expected.count("attentive") < len(expected)
+
+def test_mismatched_columns_are_rejected():
+    with pytest.raises(ValueError):
+        FeatureBatch(np.zeros(2), np.zeros(2), np.zeros(2), np.zeros(3))
+    with pytest.raises(ValueError):
+        AttentionClassifier().classify_batch(
+            FeatureBatch.from_features([{}]),
+            CalibrationTable.from_calibrations([None, None])
+        )
+
+class ReplayFrameService:
+    def __init__(self, frames):
+        self.frames = frames
+        self.position = 0
+
+    def process_frame_bytes(self, image_data, timestamp, student_id=None):
+        frame = self.frames[self.position]
+        self.position += 1
+        return {**frame, 'stage_timings': {}}
+
+    def process_frame_batch(self, images, timestamps, student_id=None):
+        frames = [{**frame, 'stage_timings': {}} for frame in self.frames[self.position:self.position + len(images)]]
+        self.position += len(images)
+        return [ValueError("corrupt") if index == 3 else frame for index, frame in enumerate(frames)]
+
+    def end_student_session(self, student_id):
+        return False
+
+    def close(self):
+        pass
+
+def labels_by_frame(results):
+    return [
+        None if isinstance(result, Exception) else (
+            result["attention_label"], result.get("calibration_stored", False), result.get("eyes_closed", False)
+        )
+        for result in results
+    ]
+
+def test_frame_batches_label_like_single_frames():
+    frames = random_frames(40, seed=11)
+    batched = AttentionAnalysisService(frame_service=ReplayFrameService(frames))
+    single = AttentionAnalysisService(frame_service=ReplayFrameService(frames[:3] + frames[4:]))
+    try:
+        results = batched.analyze_frame_batch("s1", [(str(index), b"", "") for index in range(len(frames))])
+        expected = [single.analyze_frame("s1", str(index), b"", "") for index in range(len(frames) - 1)]
+        assert isinstance(results.pop(3), Exception)
+        assert labels_by_frame(results) == labels_by_frame(expected)
+        assert sum(result.get("calibration_stored", False) for result in results) == 1
+    finally:
+        batched.close()
+        single.close()
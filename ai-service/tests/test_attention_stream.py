@@ -0,0 +1,32 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from endpoints.attention_stream import create_attention_stream_router, parse_stream_message
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(create_attention_stream_router(), prefix="/api/attention")
+    app.state.attention_service = object()
+    return TestClient(app)
+
+@pytest.mark.parametrize("text", ["[]", "null", '"x"', "3"])
+def test_non_object_frames_are_rejected(text):
+    with pytest.raises(ValueError, match="JSON object"):
+        parse_stream_message({"text": text}, "s1", 1)
+
+def test_binary_frames_need_a_default_student():
+    with pytest.raises(ValueError):
+        parse_stream_message({"bytes": b"\x00"}, None, 1)
+    frame = parse_stream_message({"bytes": b"\x00"}, "s1", 7, "c1")
+    assert (frame.student_id, frame.frame_id, frame.class_id, frame.frame_bytes) == ("s1", "7", "c1", b"\x00")
+
+def test_bad_messages_get_an_error_reply_and_keep_the_socket_open(client):
+    with client.websocket_connect("/api/attention/stream?studentId=s1") as websocket:
+        for text in ("[]", "null", "{not json", '{"frameBase64": 5}'):
+            websocket.send_text(text)
+            reply = websocket.receive_json()
+            assert reply["type"] == "error" and reply["statusCode"] == 400
+        websocket.send_text('"x"')
+        assert websocket.receive_json()["detail"] == "Frame message must be a JSON object"
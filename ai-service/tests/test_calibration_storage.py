@@ -0,0 +1,92 @@
+import sqlite3
+import time
+
+from services.calibration_storage import CalibrationStorageService
+
+def test_in_memory_store_keeps_the_first_calibration():
+    storage = CalibrationStorageService()
+    assert storage.store_calibration("a", 0.1, 0.2)
+    assert not storage.store_calibration("a", 0.3, 0.4)
+    assert not storage.store_calibration("b", None, None)
+    assert storage.get_calibration("a") == (0.1, 0.2)
+    assert not storage.stats()["persistent"]
+    storage.close()
+
+def test_calibrations_survive_a_restart(tmp_path):
+    db_path = str(tmp_path / "nested" / "calibrations.sqlite3")
+    storage = CalibrationStorageService(db_path=db_path, flush_interval=0.01)
+    storage.store_calibration("a", 0.1, None)
+    storage.store_calibration("b", None, -0.2)
+    storage.close()
+    assert storage.stats()["written"] == 2
+
+    reopened = CalibrationStorageService(db_path=db_path, flush_interval=0.01)
+    try:
+        assert reopened.get_calibration("a") == (0.1, None)
+        assert reopened.get_calibration("b") == (None, -0.2)
+        assert not reopened.store_calibration("a", 0.5, 0.5)
+    finally:
+        reopened.close()
+
+def test_export_and_import_round_trip():
+    source = CalibrationStorageService()
+    source.store_calibration("a", 0.1, 0.2)
+    source.store_calibration("b", 0.3, 0.4)
+    target = CalibrationStorageService()
+    assert target.import_calibrations(source.export_calibrations(["b", "missing"])) == 1
+    assert target.export_calibrations() == [("b", 0.3, 0.4)]
+
+class FlakyConnection:
+    def __init__(self, conn: sqlite3.Connection, failures: int):
+        self.conn = conn
+        self.failures = failures
+
+    def __enter__(self):
+        return self.conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self.conn.__exit__(*exc_info)
+
+    def executemany(self, sql, rows):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return self.conn.executemany(sql, rows)
+
+    def close(self):
+        self.conn.close()
+
+def wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+def test_failed_writes_are_retried(tmp_path):
+    db_path = str(tmp_path / "calibrations.sqlite3")
+    storage = CalibrationStorageService(db_path=db_path, flush_interval=0.01, max_retry_delay=0.05)
+    storage._conn = FlakyConnection(storage._conn, failures=3)
+    storage.store_calibration("a", 0.1, 0.2)
+    assert wait_for(lambda: storage.stats()["write_errors"] == 3)
+    storage.store_calibration("b", 0.3, 0.4)
+    assert wait_for(lambda: storage.stats()["written"] == 2)
+    assert storage.stats()["retry_delay"] == 0.0
+    storage.close()
+
+    reopened = CalibrationStorageService(db_path=db_path)
+    try:
+        assert reopened.get_calibration("a") == (0.1, 0.2)
+        assert reopened.get_calibration("b") == (0.3, 0.4)
+    finally:
+        reopened.close()
+
+def test_close_gives_up_on_a_failing_database(tmp_path):
+    storage = CalibrationStorageService(db_path=str(tmp_path / "calibrations.sqlite3"), flush_interval=0.01)
+    storage._conn = FlakyConnection(storage._conn, failures=1000)
+    storage.store_calibration("a", 0.1, 0.2)
+    assert wait_for(lambda: storage.stats()["write_errors"] >= 1)
+    storage.close()
+    assert storage.stats()["dropped"] == 1
+    assert storage.stats()["written"] == 0
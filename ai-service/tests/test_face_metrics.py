@@ -0,0 +1,21 @@
+import random
+
+import pytest
+
+from utils.face_metrics import EyeMetrics
+
+def test_smooth_ear_matches_window_mean():
+    rng = random.Random(7)
+    metrics = EyeMetrics(smoothing_window=5)
+    for _ in range(1000):
+        left, right = metrics.smooth_ear(rng.uniform(0.0, 0.4), rng.uniform(0.0, 0.4))
+        assert left == pytest.approx(sum(metrics.left_ear_history) / len(metrics.left_ear_history))
+        assert right == pytest.approx(sum(metrics.right_ear_history) / len(metrics.right_ear_history))
+    assert len(metrics.left_ear_history) == 5
+
+def test_smooth_ear_warms_up_over_partial_window():
+    metrics = EyeMetrics(smoothing_window=3)
+    assert metrics.smooth_ear(0.3, 0.1) == pytest.approx((0.3, 0.1))
+    assert metrics.smooth_ear(0.1, 0.1) == pytest.approx((0.2, 0.1))
+    assert metrics.smooth_ear(0.2, 0.4) == pytest.approx((0.2, 0.2))
+    assert metrics.smooth_ear(0.6, 0.1) == pytest.approx((0.3, 0.2))
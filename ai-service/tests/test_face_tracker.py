@@ -0,0 +1,97 @@
+import pytest
+
+from ml_logic.face_tracker import FaceTracker, Seat, SeatMap
+
+LEFT = (0.10, 0.20, 0.30, 0.50)
+RIGHT = (0.60, 0.20, 0.80, 0.50)
+
+def shifted(bbox, dx):
+    return (bbox[0] + dx, bbox[1], bbox[2] + dx, bbox[3])
+
+def test_tracks_follow_overlapping_boxes_across_frames():
+    tracker = FaceTracker(min_iou=0.3)
+    left, right = tracker.update([LEFT, RIGHT])
+    assert left.track_id != right.track_id
+
+    moved = tracker.update([shifted(RIGHT, 0.02), shifted(LEFT, 0.02)])
+    assert [track.track_id for track in moved] == [right.track_id, left.track_id]
+    assert moved[1].bbox == shifted(LEFT, 0.02)
+    assert moved[1].hits == 2
+    assert tracker.stats() == {"tracks": 2, "created": 2, "expired": 0}
+
+def test_box_below_min_iou_starts_a_new_track():
+    tracker = FaceTracker(min_iou=0.5)
+    (first,) = tracker.update([LEFT])
+    (second,) = tracker.update([shifted(LEFT, 0.15)])
+    assert second.track_id != first.track_id
+    assert len(tracker) == 2
+
+def test_each_track_matches_at_most_one_box():
+    tracker = FaceTracker(min_iou=0.3)
+    (track,) = tracker.update([LEFT])
+    near, nearer = tracker.update([shifted(LEFT, 0.05), shifted(LEFT, 0.01)])
+    assert nearer is track
+    assert near.track_id != track.track_id
+
+def test_tracks_expire_after_max_misses():
+    tracker = FaceTracker(max_misses=2)
+    (track,) = tracker.update([LEFT])
+    tracker.update([])
+    tracker.update([])
+    assert len(tracker) == 1
+    assert track.misses == 2
+
+    (resumed,) = tracker.update([LEFT])
+    assert resumed is track
+    assert resumed.misses == 0
+
+    for _ in range(3):
+        tracker.update([])
+    assert len(tracker) == 0
+    assert tracker.stats()["expired"] == 1
+    (fresh,) = tracker.update([LEFT])
+    assert fresh.track_id != track.track_id
+
+def test_tracks_keep_their_own_smoothing_state():
+    tracker = FaceTracker(smoothing_window=3)
+    left, right = tracker.update([LEFT, RIGHT])
+    left.eye_metrics.smooth_ear(0.3, 0.3)
+    assert len(right.eye_metrics.left_ear_history) == 0
+    assert left.eye_metrics.left_ear_history.maxlen == 3
+
+def test_seat_rejects_boxes_outside_the_unit_square():
+    with pytest.raises(ValueError):
+        Seat("s1", "alice", (0.5, 0.2, 0.4, 0.6))
+    with pytest.raises(ValueError):
+        Seat("s1", "alice", (0.0, 0.0, 1.2, 0.5))
+
+def test_seat_map_rejects_duplicates():
+    with pytest.raises(ValueError):
+        SeatMap([Seat("s1", "alice", (0.0, 0.0, 0.5, 0.5)), Seat("s1", "bob", (0.5, 0.0, 1.0, 0.5))])
+    with pytest.raises(ValueError):
+        SeatMap([Seat("s1", "alice", (0.0, 0.0, 0.5, 0.5)), Seat("s2", "alice", (0.5, 0.0, 1.0, 0.5))])
+
+def test_seat_lookup_uses_the_box_center():
+    seats = SeatMap([Seat("s1", "alice", (0.0, 0.0, 0.5, 1.0)), Seat("s2", "bob", (0.5, 0.0, 1.0, 1.0))])
+    assert seats.seat_for(LEFT).student_id == "alice"
+    assert seats.seat_for(RIGHT).student_id == "bob"
+    assert SeatMap([Seat("s1", "alice", (0.0, 0.0, 0.05, 0.05))]).seat_for(LEFT) is None
+
+def test_assign_reports_absent_students_and_prefers_established_tracks():
+    seats = SeatMap([
+        Seat("s1", "alice", (0.0, 0.0, 0.5, 1.0)),
+        Seat("s2", "bob", (0.5, 0.0, 1.0, 1.0)),
+        Seat("s3", "carol", (0.0, 0.0, 0.05, 0.05)),
+    ])
+    tracker = FaceTracker()
+    tracker.update([LEFT])
+    established, newcomer = tracker.update([LEFT, shifted(LEFT, 0.12)])
+
+    absent = seats.assign(tracker.tracks())
+    assert absent == ["bob", "carol"]
+    assert (established.seat_id, established.student_id) == ("s1", "alice")
+    assert newcomer.seat_id is None and newcomer.student_id is None
+
+    (moved,) = tracker.update([RIGHT])
+    assert seats.assign([moved]) == ["alice", "carol"]
+    assert moved.student_id == "bob"
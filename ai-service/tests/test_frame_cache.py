@@ -0,0 +1,100 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from services.frame_cache import FrameResultCache
+
+FACE = (0.25, 0.25, 0.75, 0.75)
+
+def encode(frame: np.ndarray) -> bytes:
+    ok, buffer = cv2.imencode(".png", frame)
+    assert ok
+    return buffer.tobytes()
+
+@pytest.fixture
+def frame() -> np.ndarray:
+    rng = np.random.default_rng(7)
+    blocks = rng.integers(0, 256, size=(16, 16), dtype=np.uint8)
+    return cv2.resize(blocks, (256, 256), interpolation=cv2.INTER_NEAREST)
+
+def test_exact_frame_is_a_hit_and_other_frames_miss(frame):
+    cache = FrameResultCache(ttl=5.0)
+    result, key = cache.lookup("a", encode(frame))
+    assert result is None
+    cache.store("a", key, {"label": "attentive"})
+    assert cache.lookup("a", encode(frame))[0] == {"label": "attentive"}
+    assert cache.lookup("b", encode(frame))[0] is None
+    assert cache.lookup("a", encode(255 - frame))[0] is None
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["misses"]) == (1, 3)
+    assert stats["hit_ratio"] == pytest.approx(0.25)
+
+def test_entries_expire_after_ttl(frame):
+    cache = FrameResultCache(ttl=0.01)
+    _, key = cache.lookup("a", encode(frame))
+    cache.store("a", key, {})
+    time.sleep(0.05)
+    assert cache.lookup("a", encode(frame))[0] is None
+    assert cache.stats()["expired"] == 1
+
+def test_least_recent_students_are_dropped(frame):
+    cache = FrameResultCache(ttl=5.0, max_students=1)
+    for student_id in ("a", "b"):
+        cache.store(student_id, cache.lookup(student_id, encode(frame))[1], {})
+    assert cache.stats()["entries"] == 1
+    assert cache.lookup("a", encode(frame))[0] is None
+
+def test_invalidate_drops_the_student(frame):
+    cache = FrameResultCache(ttl=5.0)
+    cache.store("a", cache.lookup("a", encode(frame))[1], {})
+    cache.invalidate("a")
+    assert cache.lookup("a", encode(frame))[0] is None
+
+def test_near_duplicates_miss_by_default(frame):
+    cache = FrameResultCache(ttl=5.0)
+    original = encode(frame)
+    cache.store("a", cache.lookup("a", original)[1], {}, original, FACE)
+    nudged = frame.copy()
+    nudged[-1, -1] ^= 1
+    assert cache.lookup("a", encode(nudged))[0] is None
+    assert cache.stats()["phash_ttl"] is None
+
+def test_near_duplicate_matching_only_looks_at_the_eye_band(frame):
+    cache = FrameResultCache(ttl=5.0, phash_max_distance=2, phash_ttl=5.0)
+    original = encode(frame)
+    cache.store("a", cache.lookup("a", original)[1], {"label": "attentive"}, original, FACE)
+
+    outside = frame.copy()
+    outside[200:, :] = 255 - outside[200:, :]
+    assert cache.lookup("a", encode(outside))[0] == {"label": "attentive"}
+
+    eyes = frame.copy()
+    eyes[96:128, 64:192] = 255 - eyes[96:128, 64:192]
+    assert cache.lookup("a", encode(eyes))[0] is None
+    assert cache.stats()["perceptual_hits"] == 1
+
+def test_near_duplicates_need_a_detected_face(frame):
+    cache = FrameResultCache(ttl=5.0, phash_max_distance=2, phash_ttl=5.0)
+    original = encode(frame)
+    cache.store("a", cache.lookup("a", original)[1], {}, original, None)
+    nudged = frame.copy()
+    nudged[-1, -1] ^= 1
+    assert cache.lookup("a", encode(nudged))[0] is None
+
+def test_near_duplicate_hits_use_the_shorter_ttl(frame):
+    cache = FrameResultCache(ttl=5.0, phash_max_distance=2, phash_ttl=0.01)
+    original = encode(frame)
+    cache.store("a", cache.lookup("a", original)[1], {}, original, FACE)
+    time.sleep(0.05)
+    nudged = frame.copy()
+    nudged[-1, -1] ^= 1
+    assert cache.lookup("a", encode(nudged))[0] is None
+    assert cache.lookup("a", original)[0] == {}
+
+def test_eye_region_is_the_upper_middle_of_the_face():
+    assert FrameResultCache.eye_region(None) is None
+    x0, y0, x1, y1 = FrameResultCache.eye_region((0.0, 0.0, 1.0, 1.0))
+    assert (x0, x1) == (0.0, 1.0)
+    assert y0 == pytest.approx(0.2) and y1 == pytest.approx(0.55)
@@ -0,0 +1,60 @@
+import pytest
+
+from services.hash_ring import ConsistentHashRing
+
+KEYS = [f"student-{index}" for index in range(2000)]
+
+def owners(ring: ConsistentHashRing):
+    return {key: ring.owner(key) for key in KEYS}
+
+def test_empty_ring_has_no_owner():
+    assert ConsistentHashRing().owner("student-1") is None
+
+def test_rejects_zero_virtual_nodes():
+    with pytest.raises(ValueError):
+        ConsistentHashRing(virtual_nodes=0)
+
+def test_owner_is_stable_and_independent_of_insertion_order():
+    ring = ConsistentHashRing(["a", "b", "c"])
+    assert owners(ring) == owners(ConsistentHashRing(["c", "a", "b"]))
+    assert owners(ring) == owners(ring)
+
+def test_keys_spread_across_nodes():
+    counts = {}
+    for owner in owners(ConsistentHashRing(["a", "b", "c", "d"])).values():
+        counts[owner] = counts.get(owner, 0) + 1
+    assert set(counts) == {"a", "b", "c", "d"}
+    assert min(counts.values()) > len(KEYS) / 4 * 0.6
+
+def test_adding_a_node_only_moves_keys_to_it():
+    ring = ConsistentHashRing(["a", "b", "c"])
+    before = owners(ring)
+    assert ring.add("d")
+    after = owners(ring)
+    moved = [key for key in KEYS if before[key] != after[key]]
+    assert all(after[key] == "d" for key in moved)
+    assert 0 < len(moved) < len(KEYS) / 4 * 1.5
+
+def test_removing_a_node_only_moves_its_keys():
+    ring = ConsistentHashRing(["a", "b", "c", "d"])
+    before = owners(ring)
+    assert ring.remove("b")
+    after = owners(ring)
+    for key in KEYS:
+        if before[key] != "b":
+            assert after[key] == before[key]
+        else:
+            assert after[key] in {"a", "c", "d"}
+
+def test_duplicate_add_and_missing_remove_are_no_ops():
+    ring = ConsistentHashRing(["a"])
+    assert not ring.add("a")
+    assert not ring.remove("z")
+    assert ring.nodes == ["a"] and len(ring) == 1 and "a" in ring
+
+def test_copy_is_independent():
+    ring = ConsistentHashRing(["a", "b"])
+    clone = ring.copy()
+    clone.add("c")
+    assert "c" not in ring
+    assert owners(ring) == owners(ConsistentHashRing(["a", "b"]))
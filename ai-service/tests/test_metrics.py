@@ -0,0 +1,56 @@
+import math
+
+import pytest
+
+from core.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+def test_counter_names_must_carry_the_total_suffix():
+    with pytest.raises(ValueError):
+        Counter("eyecue_frames", "Frames")
+
+def test_counter_exposition_uses_the_full_name():
+    registry = MetricsRegistry()
+    frames = registry.register(Counter("demo_frames_total", "Frames seen", ("face_detected",)))
+    frames.inc("true")
+    frames.inc("true", amount=2)
+    assert registry.render().splitlines() == [
+        "# HELP demo_frames_total Frames seen",
+        "# TYPE demo_frames_total counter",
+        'demo_frames_total{face_detected="true"} 3.0',
+    ]
+
+def test_label_values_are_escaped_and_arity_is_checked():
+    errors = Counter("demo_errors_total", "Errors", ("type",))
+    errors.inc('bad "quote"\\n')
+    assert errors.render()[-1] == 'demo_errors_total{type="bad \\"quote\\"\\\\n"} 1.0'
+    errors.inc()
+    with pytest.raises(ValueError):
+        errors.render()
+
+def test_histogram_buckets_are_cumulative():
+    latency = Histogram("demo_seconds", "Latency", ("stage",), buckets=(0.1, 0.01))
+    for value in (0.005, 0.01, 0.05, 3.0):
+        latency.observe(value, "decode")
+    assert latency.render()[2:] == [
+        'demo_seconds_bucket{stage="decode",le="0.01"} 2.0',
+        'demo_seconds_bucket{stage="decode",le="0.1"} 3.0',
+        'demo_seconds_bucket{stage="decode",le="+Inf"} 4.0',
+        'demo_seconds_sum{stage="decode"} 3.065',
+        'demo_seconds_count{stage="decode"} 4.0',
+    ]
+
+def test_function_gauges_and_collectors_run_at_render_time():
+    registry = MetricsRegistry()
+    depth = registry.register(Gauge("demo_depth", "Depth"))
+    ratio = registry.register(Gauge("demo_ratio", "Ratio", function=lambda: math.inf))
+    registry.add_collector(lambda: depth.set(4))
+    lines = registry.render().splitlines()
+    assert "demo_depth 4.0" in lines
+    assert "demo_ratio +Inf" in lines
+    assert ratio.value() == math.inf
+
+def test_duplicate_registration_is_rejected():
+    registry = MetricsRegistry()
+    registry.register(Gauge("demo_depth", "Depth"))
+    with pytest.raises(ValueError):
+        registry.register(Gauge("demo_depth", "Depth"))
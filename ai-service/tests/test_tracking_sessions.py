@@ -0,0 +1,154 @@
+import time
+
+import numpy as np
+import pytest
+
+from ml_logic.face_mesh_pipeline import FaceMeshInferenceError
+from ml_logic.pipeline_pool import PipelineUnavailableError
+from services.tracking_sessions import TrackingSessionManager
+
+class FakePipeline:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.closed = False
+        self.frames = 0
+
+    def process(self, frame_bgr, eye_metrics=None):
+        if self.fail:
+            raise FaceMeshInferenceError("boom")
+        self.frames += 1
+        return static_pool(frame_bgr, eye_metrics)
+
+    def close(self):
+        self.closed = True
+
+class Factory:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.pipelines = []
+
+    def __call__(self):
+        pipeline = FakePipeline(self.fail)
+        self.pipelines.append(pipeline)
+        return pipeline
+
+FRAME = np.zeros((120, 120, 3), dtype=np.uint8)
+
+def static_pool(frame_bgr, eye_metrics):
+    eye_metrics.smooth_ear(0.3, 0.3)
+    return {"face_detected": True}
+
+def manager(factory, max_sessions=2, idle_ttl=60.0, sweep_interval=60.0, **kwargs):
+    return TrackingSessionManager(
+        max_sessions=max_sessions, idle_ttl=idle_ttl, pipeline_factory=factory, sweep_interval=sweep_interval,
+        smoothing_window=10, **kwargs
+    )
+
+def process(sessions: TrackingSessionManager, student_id: str):
+    with sessions.session(student_id) as session:
+        return session.process(FRAME, static_pool)
+
+def test_rejects_empty_capacity():
+    with pytest.raises(ValueError):
+        TrackingSessionManager(max_sessions=0, idle_ttl=1.0)
+
+def test_session_is_reused_and_builds_its_graph_lazily():
+    factory = Factory()
+    sessions = manager(factory)
+    with sessions.session("a") as session:
+        assert not session.has_pipeline
+    assert sessions.stats()["graphs"] == 0
+    process(sessions, "a")
+    process(sessions, "a")
+    assert len(factory.pipelines) == 1 and factory.pipelines[0].frames == 2
+    assert sessions.stats()["created"] == 1
+    assert sessions.stats()["graphs"] == 1
+
+def test_least_recently_used_idle_session_is_evicted():
+    factory = Factory()
+    sessions = manager(factory)
+    process(sessions, "a")
+    process(sessions, "b")
+    process(sessions, "a")
+    process(sessions, "c")
+    stats = sessions.stats()
+    assert stats["active_sessions"] == 2 and stats["evicted_lru"] == 1 and stats["graphs"] == 2
+    assert factory.pipelines[1].closed
+    assert not factory.pipelines[0].closed
+
+def test_overflow_when_every_session_is_busy():
+    sessions = manager(Factory(), max_sessions=1)
+    with sessions.session("a") as busy:
+        assert busy is not None
+        with sessions.session("b") as session:
+            assert session is None
+    assert sessions.stats()["overflow"] == 1
+
+def test_idle_sessions_expire_on_sweep():
+    factory = Factory()
+    sessions = manager(factory, idle_ttl=0.01, sweep_interval=0.0)
+    process(sessions, "a")
+    time.sleep(0.05)
+    process(sessions, "b")
+    stats = sessions.stats()
+    assert stats["evicted_ttl"] == 1 and stats["active_sessions"] == 1
+    assert factory.pipelines[0].closed
+
+def test_failed_session_is_dropped_after_release():
+    factory = Factory(fail=True)
+    sessions = manager(factory)
+    with pytest.raises(FaceMeshInferenceError):
+        process(sessions, "a")
+    assert sessions.stats()["active_sessions"] == 0
+    assert factory.pipelines[0].closed
+
+def test_end_session_skips_busy_sessions():
+    sessions = manager(Factory())
+    with sessions.session("a"):
+        assert not sessions.end_session("a")
+    assert sessions.end_session("a")
+    assert not sessions.end_session("a")
+
+def test_close_releases_graphs_and_refuses_new_sessions():
+    factory = Factory()
+    sessions = manager(factory)
+    process(sessions, "a")
+    sessions.close()
+    assert factory.pipelines[0].closed
+    with sessions.session("b") as session:
+        assert session is None
+
+def test_students_beyond_the_graph_cap_keep_their_smoothing_history():
+    factory = Factory()
+    sessions = manager(factory, max_sessions=64, max_graphs=2)
+    students = [f"student-{index}" for index in range(30)]
+    for _ in range(5):
+        for student_id in students:
+            process(sessions, student_id)
+    for student_id in students:
+        with sessions.session(student_id) as session:
+            assert len(session.eye_metrics.left_ear_history) == 5
+            assert session.frames == 5
+    stats = sessions.stats()
+    assert len(factory.pipelines) == 2 and stats["graphs"] == 2
+    assert stats["evicted_lru"] == 0 and stats["created"] == 30
+    assert stats["graph_fallbacks"] > 0
+
+def test_idle_graphs_are_handed_to_the_next_student():
+    factory = Factory()
+    sessions = manager(factory, max_graphs=1, graph_ttl=0.01, sweep_interval=0.0)
+    process(sessions, "a")
+    time.sleep(0.05)
+    process(sessions, "b")
+    assert factory.pipelines[0].closed and factory.pipelines[1].frames == 1
+    stats = sessions.stats()
+    assert stats["graphs_released"] == 1 and stats["graphs"] == 1 and stats["active_sessions"] == 2
+    with sessions.session("a") as session:
+        assert not session.has_pipeline
+        assert len(session.eye_metrics.left_ear_history) == 1
+
+def test_session_without_a_graph_needs_a_fallback():
+    sessions = manager(Factory(), max_graphs=0)
+    with sessions.session("a") as session:
+        with pytest.raises(PipelineUnavailableError):
+            session.process(FRAME)
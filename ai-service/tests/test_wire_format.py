@@ -0,0 +1,114 @@
+import msgpack
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from endpoints.wire_format import (
+    MSGPACK_MEDIA_TYPE,
+    accepted_media_types,
+    decode_msgpack,
+    frame_from_message,
+    is_msgpack_request,
+    parse_json_model,
+    render,
+)
+
+class Frame(BaseModel):
+    studentId: str
+    frameId: str
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+
+    @app.post("/frames")
+    async def frames(request: Request):
+        body = await request.body()
+        if is_msgpack_request(request):
+            payload = decode_msgpack(body)
+        else:
+            payload = parse_json_model(body, Frame).model_dump()
+        return render(request, payload)
+
+    return TestClient(app)
+
+def test_parse_json_model_rejects_non_utf8_body():
+    with pytest.raises(HTTPException) as error:
+        parse_json_model(b"\xff\xd8\xff\xe0 not json", Frame)
+    assert error.value.status_code == 400
+
+def test_binary_body_sent_as_json_is_a_400(client):
+    response = client.post("/frames", content=b"\xff\xd8\xff\xe0\x00\x10JFIF", headers={"content-type": "application/json"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "There was an error parsing the body"}
+
+def test_malformed_json_is_a_422_with_body_location(client):
+    response = client.post("/frames", content=b'{"studentId": "s1"', headers={"content-type": "application/json"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body"]
+
+def test_invalid_field_is_reported_under_body(client):
+    response = client.post("/frames", json={"studentId": 1, "frameId": "f1"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "studentId"]
+
+def test_msgpack_request_gets_msgpack_response(client):
+    response = client.post(
+        "/frames",
+        content=msgpack.packb({"studentId": "s1", "frameId": "f1"}),
+        headers={"content-type": MSGPACK_MEDIA_TYPE}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert msgpack.unpackb(response.content) == {"studentId": "s1", "frameId": "f1"}
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/json", "application/json"),
+    ("application/msgpack", MSGPACK_MEDIA_TYPE),
+    ("application/json;q=0.5, application/x-msgpack", MSGPACK_MEDIA_TYPE),
+    ("application/msgpack;q=0.2, application/json", "application/json"),
+    ("application/msgpack;q=0", "application/json"),
+])
+def test_accept_header_negotiation(client, accept, expected):
+    response = client.post("/frames", json={"studentId": "s1", "frameId": "f1"}, headers={"accept": accept})
+    assert response.headers["content-type"].startswith(expected)
+
+def test_accepted_media_types_treats_bad_quality_as_zero():
+    assert accepted_media_types("application/msgpack;q=abc, text/html") == {
+        "application/msgpack": 0.0,
+        "text/html": 1.0,
+    }
+
+@pytest.mark.parametrize("body, detail", [
+    (b"\xc1", "Request body must be valid MessagePack"),
+    (msgpack.packb([1, 2, 3]), "Request body must be a MessagePack map"),
+])
+def test_decode_msgpack_errors_are_400(body, detail):
+    with pytest.raises(HTTPException) as error:
+        decode_msgpack(body)
+    assert error.value.status_code == 400
+    assert error.value.detail == detail
+
+def test_frame_from_message_accepts_bytes_and_integer_frame_ids():
+    frame = frame_from_message({"studentId": "s1", "frameId": 7, "frame": b"\x00\x01"})
+    assert frame.frame_id == "7"
+    assert frame.frame_bytes == b"\x00\x01"
+    assert frame.frame_base64 is None
+    assert frame.timestamp
+
+def test_frame_from_message_accepts_base64():
+    frame = frame_from_message({"studentId": "s1", "frameId": "f1", "frameBase64": "AAE=", "classId": "c1"})
+    assert frame.frame_base64 == "AAE="
+    assert frame.class_id == "c1"
+
+@pytest.mark.parametrize("message", [
+    [],
+    {"studentId": 1, "frameId": "f1", "frame": b""},
+    {"studentId": "s1", "frameId": True, "frame": b""},
+    {"studentId": "s1", "frameId": "f1", "classId": 3, "frame": b""},
+    {"studentId": "s1", "frameId": "f1"},
+])
+def test_frame_from_message_rejects_malformed_frames(message):
+    with pytest.raises(ValueError):
+        frame_from_message(message)